@@ -0,0 +1,97 @@
+package com.koxudaxi.localDataApi;
+
+import java.math.BigDecimal;
+import java.sql.ResultSet;
+import java.sql.SQLException;
+
+/**
+ * Reads rows of a ResultSet into one array per column, so that a client
+ * calling through JNI (e.g. JPype) fetches a batch of rows in a single call
+ * instead of a call per cell.
+ * <p>
+ * It only depends on java.sql, so that the class can be put on the classpath
+ * of any JVM without the runtime of the application.
+ */
+public final class ColumnReader {
+    /** ResultSet.getObject() into an Object[] */
+    public static final int OBJECT = 0;
+    /** ResultSet.getLong() into a long[] */
+    public static final int LONG = 1;
+    /** ResultSet.getDouble() into a double[] */
+    public static final int DOUBLE = 2;
+    /** ResultSet.getBoolean() into a boolean[] */
+    public static final int BOOLEAN = 3;
+    /** ResultSet.getBigDecimal() into an Object[] of a Long without a scale, a Double otherwise */
+    public static final int DECIMAL = 4;
+
+    private ColumnReader() {
+    }
+
+    /** Columns of the rows read by a call, of which a null of a primitive column is flagged in nulls */
+    public static final class Columns {
+        public final int size;
+        public final Object[] values;
+        public final boolean[][] nulls;
+
+        Columns(int size, Object[] values, boolean[][] nulls) {
+            this.size = size;
+            this.values = values;
+            this.nulls = nulls;
+        }
+    }
+
+    /** Read up to size rows whose columns are read as kinds, in the order of the columns */
+    public static Columns read(ResultSet resultSet, int[] kinds, int size) throws SQLException {
+        Object[] values = new Object[kinds.length];
+        boolean[][] nulls = new boolean[kinds.length][];
+        for (int index = 0; index < kinds.length; index++) {
+            values[index] = createColumn(kinds[index], size);
+            nulls[index] = new boolean[size];
+        }
+        int count = 0;
+        while (count < size && resultSet.next()) {
+            for (int index = 0; index < kinds.length; index++) {
+                readValue(resultSet, index + 1, kinds[index], values[index], count);
+                nulls[index][count] = resultSet.wasNull();
+            }
+            count++;
+        }
+        return new Columns(count, values, nulls);
+    }
+
+    private static Object createColumn(int kind, int size) {
+        switch (kind) {
+            case LONG:
+                return new long[size];
+            case DOUBLE:
+                return new double[size];
+            case BOOLEAN:
+                return new boolean[size];
+            default:
+                return new Object[size];
+        }
+    }
+
+    private static void readValue(ResultSet resultSet, int column, int kind, Object values, int row)
+            throws SQLException {
+        switch (kind) {
+            case LONG:
+                ((long[]) values)[row] = resultSet.getLong(column);
+                break;
+            case DOUBLE:
+                ((double[]) values)[row] = resultSet.getDouble(column);
+                break;
+            case BOOLEAN:
+                ((boolean[]) values)[row] = resultSet.getBoolean(column);
+                break;
+            case DECIMAL:
+                BigDecimal decimal = resultSet.getBigDecimal(column);
+                ((Object[]) values)[row] = decimal == null
+                        ? null
+                        : decimal.scale() == 0 ? (Object) decimal.longValue() : (Object) decimal.doubleValue();
+                break;
+            default:
+                ((Object[]) values)[row] = resultSet.getObject(column);
+        }
+    }
+}
@@ -0,0 +1,41 @@
+package com.koxudaxi.localDataApi
+
+import kotlin.test.*
+import java.sql.DriverManager
+
+class ColumnReaderTest {
+    @Test
+    fun testRead() {
+        DriverManager.getConnection("jdbc:h2:mem:").use { connection ->
+            val statement = connection.createStatement()
+            statement.execute("CREATE TABLE TEST (ID BIGINT, PRICE DOUBLE, FLAG BOOLEAN, AMOUNT DECIMAL(10, 2), NAME VARCHAR(10))")
+            statement.execute("INSERT INTO TEST VALUES (1, 1.5, TRUE, 10, 'a'), (2, NULL, NULL, 2.00, NULL), (3, 3.5, FALSE, NULL, 'c')")
+            val resultSet = statement.executeQuery("SELECT ID, PRICE, FLAG, CAST(AMOUNT AS DECIMAL(10, 0)), AMOUNT, NAME FROM TEST ORDER BY ID")
+            val kinds = intArrayOf(
+                ColumnReader.LONG,
+                ColumnReader.DOUBLE,
+                ColumnReader.BOOLEAN,
+                ColumnReader.DECIMAL,
+                ColumnReader.DECIMAL,
+                ColumnReader.OBJECT
+            )
+
+            val first = ColumnReader.read(resultSet, kinds, 2)
+            assertEquals(2, first.size)
+            assertTrue(longArrayOf(1, 2).contentEquals(first.values[0] as LongArray))
+            assertEquals(1.5, (first.values[1] as DoubleArray)[0])
+            assertTrue(booleanArrayOf(false, true).contentEquals(first.nulls[1]))
+            assertTrue(booleanArrayOf(false, true).contentEquals(first.nulls[2]))
+            assertEquals(listOf<Any?>(10L, 2L), (first.values[3] as Array<*>).toList())
+            assertEquals(listOf<Any?>(10.0, 2.0), (first.values[4] as Array<*>).toList())
+            assertEquals(listOf<Any?>("a", null), (first.values[5] as Array<*>).toList())
+
+            val second = ColumnReader.read(resultSet, kinds, 2)
+            assertEquals(1, second.size)
+            assertEquals(3L, (second.values[0] as LongArray)[0])
+            assertFalse((second.values[2] as BooleanArray)[0])
+            assertTrue(second.nulls[3][0])
+            assertEquals(0, ColumnReader.read(resultSet, kinds, 2).size)
+        }
+    }
+}
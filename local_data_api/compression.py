@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import os
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from local_data_api.exceptions import BadRequestException
+from local_data_api.worker import send_exception
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# compress responses for clients accepting gzip, br or zstd
+COMPRESSION: bool = os.environ.get('COMPRESSION', '1') == '1'
+# bytes of a response below which it is sent as it is
+COMPRESSION_MINIMUM_SIZE: int = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '1024'))
+# bytes of a compressed request body, before or after decompressing it, over
+# which the request is refused
+COMPRESSION_MAX_REQUEST_SIZE: int = int(
+    os.environ.get('COMPRESSION_MAX_REQUEST_SIZE', str(64 * 1024 * 1024))
+)
+GZIP_LEVEL: int = 6
+# bytes of input fed to a decompressor at a time when it cannot limit its output
+DECOMPRESSION_CHUNK_SIZE: int = 1024
+
+
+class Encoder:
+    """Compress a response chunk by chunk, flushing each chunk to the client"""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+
+class GzipEncoder(Encoder):
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self) -> None:
+        self._compressor: Any = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        compressed: bytes = self._compressor.process(data)
+        flushed: bytes = self._compressor.flush()
+        return compressed + flushed
+
+    def finish(self) -> bytes:
+        compressed: bytes = self._compressor.finish()
+        return compressed
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self) -> None:
+        self._compressor: Any = zstandard.ZstdCompressor().compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        compressed: bytes = self._compressor.compress(data)
+        flushed: bytes = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return compressed + flushed
+
+    def finish(self) -> bytes:
+        compressed: bytes = self._compressor.flush()
+        return compressed
+
+
+def check_request_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        raise BadRequestException(f'Request body exceeds the limit of {max_size} bytes')
+
+
+def decompress_gzip(data: bytes, max_size: int) -> bytes:
+    # a zlib or a gzip header
+    decompressor: Any = zlib.decompressobj(47)
+    body: bytes = decompressor.decompress(data, max_size + 1)
+    check_request_size(len(body), max_size)
+    if not decompressor.eof:
+        raise zlib.error('Incomplete or truncated stream')
+    return body
+
+
+def decompress_brotli(data: bytes, max_size: int) -> bytes:
+    decompressor: Any = brotli.Decompressor()
+    chunks: List[bytes] = []
+    size: int = 0
+    for start in range(0, len(data), DECOMPRESSION_CHUNK_SIZE):
+        chunk: bytes = decompressor.process(
+            data[start : start + DECOMPRESSION_CHUNK_SIZE]
+        )
+        size += len(chunk)
+        check_request_size(size, max_size)
+        chunks.append(chunk)
+    if not decompressor.is_finished():
+        raise brotli.error('Incomplete or truncated stream')
+    return b''.join(chunks)
+
+
+def decompress_zstd(data: bytes, max_size: int) -> bytes:
+    decompressor: Any = zstandard.ZstdDecompressor().decompressobj()
+    chunks: List[bytes] = []
+    size: int = 0
+    for start in range(0, len(data), DECOMPRESSION_CHUNK_SIZE):
+        chunk: bytes = decompressor.decompress(
+            data[start : start + DECOMPRESSION_CHUNK_SIZE]
+        )
+        size += len(chunk)
+        check_request_size(size, max_size)
+        chunks.append(chunk)
+        if decompressor.eof:
+            break
+    if not decompressor.eof:
+        raise zstandard.ZstdError('Incomplete or truncated stream')
+    return b''.join(chunks)
+
+
+# in order of preference when a client accepts several of them
+ENCODERS: Dict[str, Callable[[], Encoder]] = {
+    **({'zstd': ZstdEncoder} if zstandard else {}),
+    **({'br': BrotliEncoder} if brotli else {}),
+    'gzip': GzipEncoder,
+}
+DECODERS: Dict[str, Callable[[bytes, int], bytes]] = {
+    **({'zstd': decompress_zstd} if zstandard else {}),
+    **({'br': decompress_brotli} if brotli else {}),
+    'gzip': decompress_gzip,
+    'deflate': decompress_gzip,
+}
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        quality: float = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding.lower()] = quality
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Return the most preferred encoding of the client which is supported"""
+    encodings: Dict[str, float] = parse_accept_encoding(accept_encoding)
+    candidates: List[Tuple[float, int, str]] = [
+        (encodings.get(encoding, encodings.get('*', 0.0)), -index, encoding)
+        for index, encoding in enumerate(ENCODERS)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+class Compression:
+    """
+    Compress responses with the encoding negotiated by Accept-Encoding and
+    decompress request bodies sent with a Content-Encoding.
+
+    Responses smaller than `minimum_size` are sent as they are. A streamed
+    response is compressed chunk by chunk and each chunk is flushed, so the
+    client can decode records as they arrive. A request body which is larger
+    than `max_request_size`, compressed or not, is refused.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        max_request_size: int = COMPRESSION_MAX_REQUEST_SIZE,
+    ):
+        self.app: ASGIApp = app
+        self.minimum_size: int = minimum_size
+        self.max_request_size: int = max_request_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers: Headers = Headers(scope=scope)
+        content_encoding: str = headers.get('content-encoding', 'identity').lower()
+        if content_encoding != 'identity':
+            try:
+                scope, receive = await self.decompress_request(
+                    scope, receive, content_encoding, self.max_request_size
+                )
+            except BadRequestException as e:
+                await send_exception(send, e)
+                return
+
+        encoding: Optional[str] = negotiate_encoding(headers.get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressionResponder(
+            self.app, ENCODERS[encoding], encoding, self.minimum_size
+        )(scope, receive, send)
+
+    @staticmethod
+    async def decompress_request(
+        scope: Scope, receive: Receive, content_encoding: str, max_size: int
+    ) -> Tuple[Scope, Receive]:
+        decoder: Optional[Callable[[bytes, int], bytes]] = DECODERS.get(
+            content_encoding
+        )
+        if decoder is None:
+            raise BadRequestException(
+                f'Unsupported Content-Encoding: {content_encoding}'
+            )
+        chunks: List[bytes] = []
+        size: int = 0
+        while True:
+            message: Message = await receive()
+            chunk: bytes = message.get('body', b'')
+            size += len(chunk)
+            check_request_size(size, max_size)
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        try:
+            body: bytes = decoder(b''.join(chunks), max_size)
+        except BadRequestException:
+            raise
+        except Exception:
+            raise BadRequestException(
+                f'Invalid request body for Content-Encoding: {content_encoding}'
+            )
+
+        received: bool = False
+
+        async def replay() -> Message:
+            nonlocal received
+            if received:
+                return await receive()
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        # forwarded and routed as a plain request from here on
+        raw_headers: List[Tuple[bytes, bytes]] = [
+            (key, value)
+            for key, value in scope['headers']
+            if key not in (b'content-encoding', b'content-length')
+        ]
+        raw_headers.append((b'content-length', str(len(body)).encode()))
+        return {**scope, 'headers': raw_headers}, replay
+
+
+class CompressionResponder:
+    def __init__(
+        self,
+        app: ASGIApp,
+        encoder: Callable[[], Encoder],
+        encoding: str,
+        minimum_size: int,
+    ):
+        self.app: ASGIApp = app
+        self.create_encoder: Callable[[], Encoder] = encoder
+        self.encoding: str = encoding
+        self.minimum_size: int = minimum_size
+        self.send: Send = send_nothing
+        self.start_message: Message = {}
+        self.encoder: Optional[Encoder] = None
+        self.started: bool = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            # the headers depend on the first chunk of the body
+            self.start_message = message
+            return
+        if message['type'] != 'http.response.body':  # pragma: no cover
+            await self.send(message)
+            return
+
+        body: bytes = message.get('body', b'')
+        more_body: bool = message.get('more_body', False)
+        if not self.started:
+            self.started = True
+            headers: MutableHeaders = MutableHeaders(
+                raw=self.start_message.setdefault('headers', [])
+            )
+            if 'content-encoding' in headers or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                # compressed by the worker which served a forwarded request
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.encoder = self.create_encoder()
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if more_body:
+                del headers['Content-Length']
+                body = self.encoder.compress(body)
+            else:
+                body = self.encoder.compress(body) + self.encoder.finish()
+                headers['Content-Length'] = str(len(body))
+            await self.send(self.start_message)
+            await self.send({**message, 'body': body})
+            return
+
+        if self.encoder is None:
+            await self.send(message)
+            return
+        body = self.encoder.compress(body)
+        if not more_body:
+            body += self.encoder.finish()
+        await self.send({**message, 'body': body})
+
+
+async def send_nothing(message: Message) -> None:  # pragma: no cover
+    raise RuntimeError('The response is not started')
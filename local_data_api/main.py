@@ -1,10 +1,46 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+from contextvars import copy_context
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from fastapi import FastAPI
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.types import Receive, Scope, Send
 
+from local_data_api.compression import COMPRESSION, Compression
 from local_data_api.exceptions import DataAPIException
+from local_data_api.metrics import (
+    REQUEST_LABELS,
+    SERVER_TIMING,
+    Labels,
+    ServerTiming,
+    collect_metrics,
+    format_metrics,
+    measure,
+    merge_metrics,
+    track_request,
+)
 from local_data_api.models import (
     BatchExecuteStatementRequests,
     BatchExecuteStatementResponse,
@@ -13,6 +49,7 @@ from local_data_api.models import (
     CommitTransactionRequest,
     CommitTransactionResponse,
     ExecuteSqlRequest,
+    ExecuteSqlResponse,
     ExecuteStatementRequests,
     ExecuteStatementResponse,
     RollbackTransactionRequest,
@@ -20,62 +57,312 @@ from local_data_api.models import (
     TransactionStatus,
     UpdateResult,
 )
-from local_data_api.resources.resource import Resource, get_resource
+from local_data_api.resources.cache import RESULT_CACHE
+from local_data_api.resources.query import (
+    get_identifiers,
+    get_written_tables,
+    is_cacheable_query,
+    split_statements,
+)
+from local_data_api.resources.resource import (
+    MAX_RESULT_SIZE,
+    STREAMING_FETCH_SIZE,
+    Resource,
+    add_transaction_tables,
+    dump_response,
+    get_executor,
+    get_resource,
+    get_transaction_tables,
+)
 from local_data_api.settings import setup
+from local_data_api.worker import (
+    WORKER_ROUTING,
+    WorkerRouter,
+    list_worker_tags,
+    request_worker,
+    start_worker_server,
+    stop_worker_server,
+)
+
+T = TypeVar('T')
+
+ARROW_STREAM_MEDIA_TYPE: str = 'application/vnd.apache.arrow.stream'
 
 app = FastAPI()
 
 setup()
 
+if SERVER_TIMING:
+    # inside WorkerRouter, so the worker serving a request times it
+    app.add_middleware(ServerTiming)
+
+if WORKER_ROUTING:
+    app.add_middleware(WorkerRouter)
+
+if COMPRESSION:
+    # outside WorkerRouter, so a forwarded request is already decompressed
+    app.add_middleware(Compression)
+
+worker_server: Optional[asyncio.AbstractServer] = None
+
+
+@app.on_event('startup')
+async def start_worker() -> None:
+    global worker_server
+    if WORKER_ROUTING:
+        worker_server = await start_worker_server(app)
+
+
+@app.on_event('shutdown')
+async def stop_worker() -> None:
+    if worker_server is not None:
+        await stop_worker_server(worker_server)
+
+
+async def run_in_executor(
+    resource_arn: str, func: Callable[..., T], *args: Any, stream: bool = False
+) -> T:
+    """
+    Run blocking driver work on the executor of the resource, or on the one of
+    its streams for work on the connection of a stream
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        get_executor(resource_arn, stream), partial(copy_context().run, func, *args)
+    )
+
 
-@app.post("/ExecuteSql")
-def execute_sql(request: ExecuteSqlRequest) -> None:
-    raise NotImplementedError
+def create_json_response(content: Any) -> Response:
+    with measure('serialize'):
+        if isinstance(content, dict):
+            return Response(dump_response(content), media_type='application/json')
+        return JSONResponse(content)
+
+
+async def _collect_worker_metrics() -> List[List[Dict[str, Any]]]:
+    """Collect the metrics of the other workers, skipping those which have gone"""
+
+    async def collect(worker_tag: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            status, body = await request_worker(
+                worker_tag, 'GET', '/metrics', 'scope=worker'
+            )
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return None
+        return json.loads(body) if status == 200 else None
+
+    collected = await asyncio.gather(*map(collect, list_worker_tags()))
+    return [metrics for metrics in collected if metrics is not None]
+
+
+@app.get("/metrics")
+async def metrics(scope: str = '') -> Response:
+    # another worker collecting the metrics of this one
+    if scope == 'worker':
+        return JSONResponse(collect_metrics())
+    collected: List[List[Dict[str, Any]]] = [collect_metrics()]
+    if WORKER_ROUTING:
+        collected.extend(await _collect_worker_metrics())
+    return PlainTextResponse(
+        format_metrics(merge_metrics(collected)),
+        media_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+@app.post("/ExecuteSql", response_model=ExecuteSqlResponse)
+async def execute_sql(request: ExecuteSqlRequest) -> Response:
+    with track_request('ExecuteSql', request.dbClusterOrInstanceArn):
+        return create_json_response(
+            await run_in_executor(request.dbClusterOrInstanceArn, _execute_sql, request)
+        )
 
 
 @app.post("/BeginTransaction", response_model=BeginTransactionResponse)
-def begin_statement(request: BeginTransactionRequest) -> BeginTransactionResponse:
+async def begin_statement(
+    request: BeginTransactionRequest,
+) -> BeginTransactionResponse:
+    with track_request('BeginTransaction', request.resourceArn):
+        return await run_in_executor(request.resourceArn, _begin_statement, request)
+
+
+@app.post("/CommitTransaction", response_model=CommitTransactionResponse)
+async def commit_transaction(
+    request: CommitTransactionRequest,
+) -> CommitTransactionResponse:
+    with track_request('CommitTransaction', request.resourceArn):
+        return await run_in_executor(request.resourceArn, _commit_transaction, request)
+
+
+@app.post("/RollbackTransaction", response_model=RollbackTransactionResponse)
+async def rollback_transaction(
+    request: RollbackTransactionRequest,
+) -> RollbackTransactionResponse:
+    with track_request('RollbackTransaction', request.resourceArn):
+        return await run_in_executor(
+            request.resourceArn, _rollback_transaction, request
+        )
+
+
+@app.post(
+    "/Execute",
+    response_model=ExecuteStatementResponse,
+    response_model_exclude_unset=True,
+)
+async def execute_statement(
+    request: ExecuteStatementRequests, http_request: Request
+) -> Response:
+    # the response is built from plain dicts and bypasses response_model
+    with track_request('Execute', request.resourceArn):
+        if _accepts_arrow(http_request.headers.get('accept', '')):
+            result: Union[Dict[str, Any], bytes] = await run_in_executor(
+                request.resourceArn, _execute_arrow, request
+            )
+            if isinstance(result, bytes):
+                return Response(result, media_type=ARROW_STREAM_MEDIA_TYPE)
+            return create_json_response(result)
+        if STREAMING_FETCH_SIZE:
+            return await _stream_statement(request)
+        return create_json_response(
+            await run_in_executor(request.resourceArn, _execute_statement, request)
+        )
+
+
+@app.post(
+    "/BatchExecute",
+    response_model=BatchExecuteStatementResponse,
+    response_model_exclude_unset=True,
+)
+async def batch_execute_statement(
+    request: BatchExecuteStatementRequests,
+) -> BatchExecuteStatementResponse:
+    with track_request('BatchExecute', request.resourceArn):
+        return await run_in_executor(
+            request.resourceArn, _batch_execute_statement, request
+        )
+
+
+def _begin_statement(request: BeginTransactionRequest) -> BeginTransactionResponse:
     resource: Resource = get_resource(
         request.resourceArn, request.secretArn, database=request.database
     )
-    transaction_id: str = resource.begin()
+    try:
+        transaction_id: str = resource.begin()
+    except BaseException:
+        resource.close()
+        raise
 
     return BeginTransactionResponse(transactionId=transaction_id)
 
 
-@app.post("/CommitTransaction", response_model=CommitTransactionResponse)
-def commit_transaction(request: CommitTransactionRequest) -> CommitTransactionResponse:
+def _commit_transaction(request: CommitTransactionRequest) -> CommitTransactionResponse:
     resource: Resource = get_resource(
         request.resourceArn, request.secretArn, request.transactionId
     )
-    resource.commit()
-    resource.close()
+    written_tables: Optional[FrozenSet[str]] = get_transaction_tables(
+        request.transactionId
+    )
+    try:
+        resource.commit()
+    finally:
+        # the transaction ends even if the commit fails
+        resource.close()
+    if RESULT_CACHE.enabled and written_tables != frozenset():
+        # the changes are visible to other requests from now on
+        RESULT_CACHE.invalidate(written_tables)
     return CommitTransactionResponse(
         transactionStatus=TransactionStatus.transaction_committed
     )
 
 
-@app.post("/RollbackTransaction", response_model=RollbackTransactionResponse)
-def rollback_transaction(
+def _rollback_transaction(
     request: RollbackTransactionRequest,
 ) -> RollbackTransactionResponse:
     resource: Resource = get_resource(
         request.resourceArn, request.secretArn, request.transactionId
     )
-    resource.rollback()
-    resource.close()
+    try:
+        resource.rollback()
+    finally:
+        resource.close()
 
     return RollbackTransactionResponse(
         transactionStatus=TransactionStatus.rollback_complete
     )
 
 
-@app.post(
-    "/Execute",
-    response_model=ExecuteStatementResponse,
-    response_model_exclude_unset=True,
-)
-def execute_statement(request: ExecuteStatementRequests) -> ExecuteStatementResponse:
+def _execute_sql(request: ExecuteSqlRequest) -> Dict[str, Any]:
+    resource: Optional[Resource] = None
+    try:
+        resource = get_resource(
+            request.dbClusterOrInstanceArn,
+            request.awsSecretStoreArn,
+            database=request.database,
+        )
+        # all statements of the script run in a single transaction
+        resource.autocommit_off()
+        results: List[Dict[str, Any]] = resource.execute_sql(request.sqlStatements)
+        resource.commit()
+        if RESULT_CACHE.enabled:
+            _invalidate_result_cache(
+                None, *split_statements(request.sqlStatements, resource.DIALECT)
+            )
+        return {'sqlStatementResults': results}
+    finally:
+        if resource:
+            resource.release()
+
+
+def _get_parameters(request: ExecuteStatementRequests) -> Optional[Dict[str, Any]]:
+    if not request.parameters:
+        return None
+    return {parameter.name: parameter.valid_value for parameter in request.parameters}
+
+
+def _get_cache_key(request: ExecuteStatementRequests) -> Optional[Hashable]:
+    """Return the key of the result of a request in RESULT_CACHE, if it is cached"""
+    if (
+        not RESULT_CACHE.enabled
+        or request.transactionId
+        or not is_cacheable_query(request.sql)
+    ):
+        return None
+    return (
+        request.resourceArn,
+        request.secretArn,
+        request.database,
+        request.sql.strip(),
+        request.includeResultMetadata,
+        request.formatRecordsAs,
+        json.dumps(_get_parameters(request), sort_keys=True, default=str),
+    )
+
+
+def _invalidate_result_cache(transaction_id: Optional[str], *statements: str) -> None:
+    """Drop cached results of the tables changed by statements which succeeded"""
+    if not RESULT_CACHE.enabled:
+        return
+    tables: Optional[FrozenSet[str]] = frozenset()
+    for statement in statements:
+        statement_tables: Optional[FrozenSet[str]] = get_written_tables(statement)
+        if tables is None or statement_tables is None:
+            tables = None
+        else:
+            tables |= statement_tables
+    if tables == frozenset():
+        return
+    RESULT_CACHE.invalidate(tables)
+    if transaction_id:
+        # other requests see the changes once the transaction commits
+        add_transaction_tables(transaction_id, tables)
+
+
+def _execute_statement(request: ExecuteStatementRequests) -> Dict[str, Any]:
+    cache_key: Optional[Hashable] = _get_cache_key(request)
+    generation: int = RESULT_CACHE.generation
+    if cache_key is not None:
+        cached: Optional[Dict[str, Any]] = RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
     resource: Optional[Resource] = None
     try:
         resource = get_resource(
@@ -88,34 +375,161 @@ def execute_statement(request: ExecuteStatementRequests) -> ExecuteStatementResp
         if not resource.transaction_id:
             resource.autocommit_off()
 
-        if request.parameters:
-            parameters: Optional[Dict[str, Any]] = {
-                parameter.name: parameter.valid_value
-                for parameter in request.parameters
-            }
-        else:
-            parameters = None
-
-        response: ExecuteStatementResponse = resource.execute(
+        response: Dict[str, Any] = resource.execute_as_dict(
             request.sql,
-            parameters,
+            _get_parameters(request),
             include_result_metadata=request.includeResultMetadata,
+            format_records_as=request.formatRecordsAs,
+            max_result_size=MAX_RESULT_SIZE,
         )
 
         if not resource.transaction_id:
             resource.commit()
+        if cache_key is not None:
+            RESULT_CACHE.put(
+                cache_key, response, get_identifiers(request.sql), generation
+            )
+        else:
+            _invalidate_result_cache(resource.transaction_id, request.sql)
         return response
     finally:
-        if resource and not resource.transaction_id:
-            resource.close()
+        if resource:
+            resource.release()
+
+
+def _accepts_arrow(accept: str) -> bool:
+    """Whether an Accept header asks for records as an Arrow IPC stream"""
+    for media_range in accept.split(','):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        if media_type.lower() == ARROW_STREAM_MEDIA_TYPE:
+            return not any(
+                name.strip() == 'q' and not value.strip().strip('0.')
+                for name, _, value in (param.partition('=') for param in params)
+            )
+    return False
 
 
-@app.post(
-    "/BatchExecute",
-    response_model=BatchExecuteStatementResponse,
-    response_model_exclude_unset=True,
-)
-def batch_execute_statement(
+def _execute_arrow(request: ExecuteStatementRequests) -> Union[Dict[str, Any], bytes]:
+    resource: Optional[Resource] = None
+    try:
+        resource = get_resource(
+            request.resourceArn,
+            request.secretArn,
+            request.transactionId,
+            request.database,
+        )
+
+        if not resource.transaction_id:
+            resource.autocommit_off()
+
+        result: Union[Dict[str, Any], bytes] = resource.execute_arrow(
+            request.sql, _get_parameters(request), max_result_size=MAX_RESULT_SIZE
+        )
+
+        if not resource.transaction_id:
+            resource.commit()
+        if isinstance(result, dict):
+            _invalidate_result_cache(resource.transaction_id, request.sql)
+        return result
+    finally:
+        if resource:
+            resource.release()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """A streaming response which runs `on_close` however the response ends"""
+
+    def __init__(
+        self,
+        content: AsyncIterator[str],
+        on_close: Callable[[], Awaitable[None]],
+        media_type: str,
+    ):
+        super().__init__(content, media_type=media_type)
+        self.on_close: Callable[[], Awaitable[None]] = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
+
+
+async def _stream_statement(request: ExecuteStatementRequests) -> Response:
+    resource, result = await run_in_executor(
+        request.resourceArn, _execute_stream, request
+    )
+    if isinstance(result, dict):
+        return create_json_response(result)
+    first_chunk, chunks = result
+    # chunks are fetched after the endpoint returns, outside of track_request
+    labels: Labels = REQUEST_LABELS.get()
+
+    async def stream() -> AsyncIterator[str]:
+        REQUEST_LABELS.set(labels)
+        yield first_chunk
+        while True:
+            chunk: Optional[str] = await run_in_executor(
+                request.resourceArn, next, chunks, None, stream=True
+            )
+            if chunk is None:
+                break
+            yield chunk
+
+    async def close() -> None:
+        await run_in_executor(
+            request.resourceArn, _close_stream, resource, chunks, stream=True
+        )
+
+    return ClosingStreamingResponse(stream(), close, media_type='application/json')
+
+
+def _execute_stream(
+    request: ExecuteStatementRequests,
+) -> Tuple[Resource, Union[Dict[str, Any], Tuple[str, Generator[str, None, None]]]]:
+    resource: Optional[Resource] = None
+    try:
+        resource = get_resource(
+            request.resourceArn,
+            request.secretArn,
+            request.transactionId,
+            request.database,
+        )
+
+        if not resource.transaction_id:
+            resource.autocommit_off()
+
+        result = resource.execute_stream(
+            request.sql,
+            _get_parameters(request),
+            include_result_metadata=request.includeResultMetadata,
+            fetch_size=STREAMING_FETCH_SIZE,
+            format_records_as=request.formatRecordsAs,
+        )
+        if isinstance(result, dict):
+            if not resource.transaction_id:
+                resource.commit()
+            _invalidate_result_cache(resource.transaction_id, request.sql)
+            resource.release()
+            return resource, result
+        # start the chunks so that closing them also closes the cursor
+        return resource, (next(result), result)
+    except BaseException:
+        if resource:
+            resource.release()
+        raise
+
+
+def _close_stream(resource: Resource, chunks: Generator[str, None, None]) -> None:
+    try:
+        chunks.close()
+        if not resource.transaction_id:
+            resource.commit()
+    finally:
+        resource.release()
+
+
+def _batch_execute_statement(
     request: BatchExecuteStatementRequests,
 ) -> BatchExecuteStatementResponse:
     resource: Optional[Resource] = None
@@ -127,37 +541,34 @@ def batch_execute_statement(
             request.database,
         )
 
-        update_results: List[UpdateResult] = []
-
         if not resource.transaction_id:
             resource.autocommit_off()
 
         if not request.parameterSets:
-            response: BatchExecuteStatementResponse = BatchExecuteStatementResponse(
-                updateResults=update_results
-            )
+            update_results: List[UpdateResult] = []
         else:
-            for parameter_set in request.parameterSets:
-                parameters: Dict[str, Any] = {
-                    parameter.name: parameter.valid_value for parameter in parameter_set
-                }
-                result: ExecuteStatementResponse = resource.execute(
-                    request.sql, parameters
-                )
-
-                if result.generatedFields:
-                    update_results.append(
-                        UpdateResult(generatedFields=result.generatedFields)
-                    )
+            update_results = resource.batch_execute(
+                request.sql,
+                [
+                    {
+                        parameter.name: parameter.valid_value
+                        for parameter in parameter_set
+                    }
+                    for parameter_set in request.parameterSets
+                ],
+            )
 
-            response = BatchExecuteStatementResponse(updateResults=update_results)
+        response: BatchExecuteStatementResponse = BatchExecuteStatementResponse(
+            updateResults=update_results
+        )
 
         if not resource.transaction_id:
             resource.commit()
+        _invalidate_result_cache(resource.transaction_id, request.sql)
         return response
     finally:
-        if resource and not resource.transaction_id:
-            resource.close()
+        if resource:
+            resource.release()
 
 
 @app.exception_handler(DataAPIException)
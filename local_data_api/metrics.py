@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from local_data_api.exceptions import DataAPIException
+
+# add a Server-Timing header with the time of each phase to responses
+SERVER_TIMING: bool = os.environ.get('SERVER_TIMING', '0') == '1'
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+Labels = Tuple[str, ...]
+# the suffix of the name, the label names, the label values and the value
+Sample = Tuple[str, Sequence[str], Sequence[str], float]
+
+# seconds, from a cheap statement on a local database to a slow query
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# the endpoint and the resource arn of the request being served
+REQUEST_LABELS: ContextVar[Labels] = ContextVar('REQUEST_LABELS', default=('', ''))
+
+# seconds spent in each phase of the request being served, when it is traced
+REQUEST_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    'REQUEST_TIMINGS', default=None
+)
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs: str = ','.join(
+        f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return f'{{{pairs}}}'
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_metric(
+    name: str, documentation: str, type_: str, samples: Iterable[Sample]
+) -> List[str]:
+    lines: List[str] = [
+        f'# HELP {name} {documentation}',
+        f'# TYPE {name} {type_}',
+    ]
+    for suffix, names, values, value in samples:
+        lines.append(
+            f'{name}{suffix}{format_labels(names, values)} {format_value(value)}'
+        )
+    return lines
+
+
+REGISTRY: List[Metric] = []
+
+
+class Metric:
+    TYPE: str
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        registry: List[Metric] = REGISTRY,
+    ):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: Tuple[str, ...] = tuple(label_names)
+        self._lock: threading.Lock = threading.Lock()
+        registry.append(self)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return format_metric(self.name, self.documentation, self.TYPE, self.samples())
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        registry: List[Metric] = REGISTRY,
+    ):
+        super().__init__(name, documentation, label_names, registry)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values: List[Tuple[Labels, float]] = list(self._values.items())
+        for labels, value in values:
+            yield '', self.label_names, labels, value
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: List[Metric] = REGISTRY,
+    ):
+        super().__init__(name, documentation, label_names, registry)
+        self.buckets: Tuple[float, ...] = (*buckets, float('inf'))
+        # non cumulative counts of each bucket, the sum and the count
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index: int = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(labels) or self._values.setdefault(
+                labels, ([0] * len(self.buckets), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values: List[Tuple[Labels, List[int], float]] = [
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            ]
+        names: Tuple[str, ...] = (*self.label_names, 'le')
+        for labels, counts, total in values:
+            cumulative: int = 0
+            for bucket, count in zip(self.buckets, counts):
+                cumulative += count
+                yield '_bucket', names, (*labels, format_value(bucket)), cumulative
+            yield '_sum', self.label_names, labels, total
+            yield '_count', self.label_names, labels, cumulative
+
+
+class Gauge(Metric):
+    """A gauge whose values are collected from the application when scraped"""
+
+    TYPE = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+        registry: List[Metric] = REGISTRY,
+    ):
+        super().__init__(name, documentation, label_names, registry)
+        self.collect: Callable[[], Iterable[Tuple[Labels, float]]] = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self.collect():
+            yield '', self.label_names, labels, value
+
+
+class CollectedCounter(Gauge):
+    """A counter whose values are collected from the application when scraped"""
+
+    TYPE = 'counter'
+
+
+REQUESTS: Counter = Counter(
+    'local_data_api_requests_total',
+    'Requests by endpoint, resource and status code',
+    ['endpoint', 'resource', 'status'],
+)
+REQUEST_DURATION: Histogram = Histogram(
+    'local_data_api_request_duration_seconds',
+    'Time to serve a request',
+    ['endpoint', 'resource'],
+)
+PHASE_DURATION: Histogram = Histogram(
+    'local_data_api_phase_duration_seconds',
+    'Time spent in each phase of serving a request',
+    ['endpoint', 'resource', 'phase'],
+)
+
+
+def collect_metrics(registry: List[Metric] = REGISTRY) -> List[Dict[str, Any]]:
+    """Take the samples of all metrics as JSON, which workers send to each other"""
+    return [
+        {
+            'name': metric.name,
+            'documentation': metric.documentation,
+            'type': metric.TYPE,
+            'samples': [
+                [suffix, list(names), list(values), value]
+                for suffix, names, values, value in metric.samples()
+            ],
+        }
+        for metric in registry
+    ]
+
+
+def merge_metrics(collected: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Add up the metrics collected from worker processes. Counters and histograms
+    count what each worker served, and gauges what each worker holds, so the
+    sums are the values of the whole server.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for metrics in collected:
+        for metric in metrics:
+            target: Optional[Dict[str, Any]] = merged.get(metric['name'])
+            if target is None:
+                target = merged[metric['name']] = {**metric, 'samples': {}}
+            samples: Dict[Tuple[str, Labels, Labels], float] = target['samples']
+            for suffix, names, values, value in metric['samples']:
+                key: Tuple[str, Labels, Labels] = suffix, tuple(names), tuple(values)
+                samples[key] = samples.get(key, 0) + value
+    return [
+        {
+            **metric,
+            'samples': [
+                [suffix, list(names), list(values), value]
+                for (suffix, names, values), value in metric['samples'].items()
+            ],
+        }
+        for metric in merged.values()
+    ]
+
+
+def format_metrics(metrics: List[Dict[str, Any]]) -> str:
+    """Format collected metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(
+            format_metric(
+                metric['name'],
+                metric['documentation'],
+                metric['type'],
+                metric['samples'],
+            )
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def render_metrics(registry: List[Metric] = REGISTRY) -> str:
+    """Render all metrics of this process in the Prometheus text exposition format"""
+    return format_metrics(collect_metrics(registry))
+
+
+@contextmanager
+def track_request(endpoint: str, resource_arn: str) -> Iterator[None]:
+    """Count and time a request, labelling the phases measured while serving it"""
+    token = REQUEST_LABELS.set((endpoint, resource_arn))
+    start: float = perf_counter()
+    status: int = 200
+    try:
+        yield
+    except DataAPIException as e:
+        status = e.status_code
+        raise
+    except BaseException:
+        status = 500
+        raise
+    finally:
+        REQUEST_DURATION.observe(perf_counter() - start, endpoint, resource_arn)
+        REQUESTS.inc(endpoint, resource_arn, str(status))
+        REQUEST_LABELS.reset(token)
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    start: float = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed: float = perf_counter() - start
+        PHASE_DURATION.observe(elapsed, *REQUEST_LABELS.get(), phase)
+        timings: Optional[Dict[str, float]] = REQUEST_TIMINGS.get()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    return ', '.join(
+        f'{phase};dur={elapsed * 1000:.3f}' for phase, elapsed in timings.items()
+    )
+
+
+class ServerTiming:
+    """
+    Report the time spent in each phase of a request in a Server-Timing
+    header and a debug log line. `total` is the time until the response
+    starts, so chunks of a streamed response are not included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # the executor threads get a copy of the context sharing this dict
+        timings: Dict[str, float] = {}
+        token = REQUEST_TIMINGS.set(timings)
+        start: float = perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                timings['total'] = perf_counter() - start
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'server-timing', format_server_timing(timings).encode()),
+                ]
+                logger.debug(
+                    json.dumps(
+                        {
+                            'path': scope['path'],
+                            'status': message['status'],
+                            'timings': {
+                                phase: round(elapsed * 1000, 3)
+                                for phase, elapsed in timings.items()
+                            },
+                        }
+                    )
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUEST_TIMINGS.reset(token)
@@ -54,6 +54,11 @@ class ExecuteSqlRequest(BaseModel):
     schema_: Optional[str] = Field_(None, alias='schema')
 
 
+class RecordsFormatType(Enum):
+    NONE = 'NONE'
+    JSON = 'JSON'
+
+
 class ExecuteStatementRequests(BaseModel):
     resourceArn: str
     secretArn: str
@@ -64,6 +69,7 @@ class ExecuteStatementRequests(BaseModel):
     parameters: Optional[List[SqlParameter]]
     schema_: Optional[str] = Field_(None, alias='schema')
     transactionId: Optional[str]
+    formatRecordsAs: RecordsFormatType = RecordsFormatType.NONE
 
     @validator('transactionId', pre=True)
     def validate_transaction_id(cls, v: Any) -> Any:
@@ -94,6 +100,41 @@ class ExecuteStatementResponse(BaseModel):
     generatedFields: Optional[List[Field]]
     records: Optional[List[List[Field]]]
     columnMetadata: Optional[List[ColumnMetadata]]
+    formattedRecords: Optional[str]
+
+
+class Value(BaseModel):
+    bigIntValue: Optional[int]
+    bitValue: Optional[bool]
+    blobValue: Optional[str]  # Type: Base64-encoded binary data object
+    doubleValue: Optional[float]
+    intValue: Optional[int]
+    isNull: Optional[bool]
+    realValue: Optional[float]
+    stringValue: Optional[str]
+
+
+class Record(BaseModel):
+    values: List[Value]
+
+
+class ResultSetMetadata(BaseModel):
+    columnCount: int
+    columnMetadata: List[ColumnMetadata]
+
+
+class ResultFrame(BaseModel):
+    records: List[Record]
+    resultSetMetadata: ResultSetMetadata
+
+
+class SqlStatementResult(BaseModel):
+    numberOfRecordsUpdated: int
+    resultFrame: Optional[ResultFrame]
+
+
+class ExecuteSqlResponse(BaseModel):
+    sqlStatementResults: List[SqlStatementResult]
 
 
 class BeginTransactionRequest(BaseModel):
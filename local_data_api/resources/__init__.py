@@ -1,7 +1,20 @@
-from local_data_api.resources.jdbc.mysql import MySQLJDBC
-from local_data_api.resources.jdbc.postgres import PostgreSQLJDBC
-from local_data_api.resources.mysql import MySQL
-from local_data_api.resources.postgres import PostgresSQL
-from local_data_api.resources.sqlite import SQLite
+from typing import TYPE_CHECKING, Type
+
+from local_data_api.resources.resource import get_resource_class
+
+if TYPE_CHECKING:  # pragma: no cover
+    from local_data_api.resources.jdbc.mysql import MySQLJDBC
+    from local_data_api.resources.jdbc.postgres import PostgreSQLJDBC
+    from local_data_api.resources.mysql import MySQL
+    from local_data_api.resources.postgres import PostgresSQL
+    from local_data_api.resources.resource import Resource
+    from local_data_api.resources.sqlite import SQLite
 
 __all__ = ['MySQL', 'PostgresSQL', 'SQLite', 'MySQLJDBC', 'PostgreSQLJDBC']
+
+
+def __getattr__(name: str) -> Type['Resource']:
+    # engines are imported on first use, with their drivers
+    if name in __all__:
+        return get_resource_class(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
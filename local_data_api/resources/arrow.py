@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, List, Sequence
+
+from local_data_api.exceptions import BadRequestException
+from local_data_api.models import ColumnMetadata
+from local_data_api.resources.resource import JDBCType, dump_column_metadata_set
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# rows of a record batch in an Arrow IPC stream
+ARROW_BATCH_SIZE: int = int(os.environ.get('ARROW_BATCH_SIZE', '65536'))
+
+BOOLEAN_TYPES: List[JDBCType] = [JDBCType.BIT, JDBCType.BOOLEAN]
+INTEGER_TYPES: List[JDBCType] = [
+    JDBCType.TINYINT,
+    JDBCType.SMALLINT,
+    JDBCType.INTEGER,
+    JDBCType.BIGINT,
+]
+FLOAT_TYPES: List[JDBCType] = [JDBCType.FLOAT, JDBCType.REAL, JDBCType.DOUBLE]
+BINARY_TYPES: List[JDBCType] = [
+    JDBCType.BINARY,
+    JDBCType.VARBINARY,
+    JDBCType.LONGVARBINARY,
+    JDBCType.BLOB,
+]
+# decimals are left to the type of the values, anything else is a string like
+# the stringValue of a Field
+INFERRED_TYPES: List[JDBCType] = [JDBCType.NUMERIC, JDBCType.DECIMAL]
+
+
+def require_pyarrow() -> None:
+    if pyarrow is None:
+        raise BadRequestException('Arrow results require pyarrow to be installed')
+
+
+def get_arrow_type(column_metadata: ColumnMetadata) -> Any:
+    """Return the Arrow type of a column, None to infer it from the values"""
+    try:
+        jdbc_type: JDBCType = JDBCType(column_metadata.type)
+    except ValueError:
+        return None
+    if jdbc_type in BOOLEAN_TYPES:
+        return pyarrow.bool_()
+    if jdbc_type in INTEGER_TYPES:
+        return pyarrow.int64()
+    if jdbc_type in FLOAT_TYPES:
+        return pyarrow.float64()
+    if jdbc_type in BINARY_TYPES:
+        return pyarrow.binary()
+    if jdbc_type in INFERRED_TYPES:
+        return None
+    return pyarrow.string()
+
+
+def create_arrow_array(values: Sequence[Any], arrow_type: Any) -> Any:
+    """
+    Build an array of a type, or of the type of the values for None. Values of
+    several types, which a column of SQLite may hold, fall back to strings.
+    """
+    if arrow_type is not None and pyarrow.types.is_string(arrow_type):
+        values = [
+            value if value is None or isinstance(value, str) else str(value)
+            for value in values
+        ]
+    try:
+        return pyarrow.array(values, type=arrow_type)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        if arrow_type is not None:
+            raise
+    return create_arrow_array(values, pyarrow.string())
+
+
+def get_column_name(column_metadata: ColumnMetadata, index: int) -> str:
+    return column_metadata.label or column_metadata.name or f'column{index}'
+
+
+def create_arrow_schema(
+    column_metadata_set: List[ColumnMetadata], arrays: List[Any]
+) -> Any:
+    """
+    The fields of the schema carry the JSON of their ColumnMetadata in the
+    `columnMetadata` key of their metadata.
+    """
+    return pyarrow.schema(
+        [
+            pyarrow.field(
+                get_column_name(column_metadata, index),
+                array.type,
+                nullable=column_metadata.nullable != 0,
+                metadata={'columnMetadata': json.dumps(metadata)},
+            )
+            for index, (column_metadata, metadata, array) in enumerate(
+                zip(
+                    column_metadata_set,
+                    dump_column_metadata_set(column_metadata_set),
+                    arrays,
+                )
+            )
+        ]
+    )
+
+
+def create_record_batch(
+    rows: Sequence[Sequence[Any]],
+    column_metadata_set: List[ColumnMetadata],
+    schema: Any = None,
+) -> Any:
+    """
+    Build a record batch column by column from rows of a cursor. The types of
+    its columns are those of `schema`, else they are taken from the column
+    metadata and the values.
+    """
+    columns: List[Sequence[Any]] = (
+        list(zip(*rows)) if rows else [[] for _ in column_metadata_set]
+    )
+    arrays: List[Any] = []
+    for index, (column_metadata, values) in enumerate(
+        zip(column_metadata_set, columns)
+    ):
+        if schema is None:
+            arrays.append(create_arrow_array(values, get_arrow_type(column_metadata)))
+            continue
+        try:
+            arrays.append(create_arrow_array(values, schema.field(index).type))
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            raise BadRequestException(
+                f'Column {get_column_name(column_metadata, index)} has values '
+                f'of another type than {schema.field(index).type} of its first '
+                f'{ARROW_BATCH_SIZE} rows, which can not change in an Arrow '
+                f'stream; cast the column in the statement'
+            )
+    return pyarrow.RecordBatch.from_arrays(
+        arrays,
+        schema=schema
+        if schema is not None
+        else create_arrow_schema(column_metadata_set, arrays),
+    )
+
+
+class ArrowStreamWriter:
+    """
+    Write rows to an Arrow IPC stream a batch at a time, so that the rows of a
+    result are never all held at once. The schema is that of the first batch,
+    so an inferred type is taken from the values of the first rows.
+    """
+
+    def __init__(self, column_metadata_set: List[ColumnMetadata]):
+        self.column_metadata_set: List[ColumnMetadata] = column_metadata_set
+        self.schema: Any = None
+        self.sink: Any = pyarrow.BufferOutputStream()
+        self.writer: Any = None
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> int:
+        """Write the rows as a record batch and return the size of the stream"""
+        batch: Any = create_record_batch(rows, self.column_metadata_set, self.schema)
+        if self.writer is None:
+            self.schema = batch.schema
+            self.writer = pyarrow.ipc.new_stream(self.sink, self.schema)
+        self.writer.write_batch(batch)
+        size: int = self.sink.tell()
+        return size
+
+    def getvalue(self) -> bytes:
+        """Close the stream and return its bytes"""
+        if self.writer is None:
+            # the schema of an empty result
+            self.write([])
+        self.writer.close()
+        data: bytes = self.sink.getvalue().to_pybytes()
+        return data
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Set
+
+from local_data_api.metrics import CollectedCounter, Gauge
+from local_data_api.resources.resource import dump_response
+from local_data_api.worker import get_worker_count
+
+# bytes of JSON responses kept by the result cache, 0 disables it
+RESULT_CACHE_SIZE: int = int(os.environ.get('RESULT_CACHE_SIZE', '0'))
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def get_result_cache_size(max_size: int = RESULT_CACHE_SIZE) -> int:
+    """
+    Return the size of the result cache, which is disabled with several workers.
+
+    Each worker process has a cache of its own, and a write served by one
+    worker cannot invalidate the results cached by the others.
+    """
+    if max_size > 0 and get_worker_count() > 1:
+        logger.warning(
+            'RESULT_CACHE_SIZE is ignored as more than one worker may run, '
+            'set WEB_CONCURRENCY=1 to cache results'
+        )
+        return 0
+    return max_size
+
+
+@dataclass
+class CachedResult:
+    response: Dict[str, Any]
+    size: int
+    identifiers: FrozenSet[str]
+
+
+class ResultCache:
+    """
+    LRU cache of responses of read queries bounded by the size of their JSON.
+
+    A result is indexed on every word of its query, so changing a table
+    drops all results which may have read it. Results computed while a table
+    was invalidated are not stored, as they may predate the change.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE):
+        self.max_size: int = max_size
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        # incremented by every invalidation
+        self.generation: int = 0
+        self._results: OrderedDict[Hashable, CachedResult] = OrderedDict()
+        self._index: Dict[str, Set[Hashable]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result: Optional[CachedResult] = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result.response
+
+    def put(
+        self,
+        key: Hashable,
+        response: Dict[str, Any],
+        identifiers: FrozenSet[str],
+        generation: int,
+    ) -> None:
+        """Store a response computed when the cache was at `generation`"""
+        size: int = len(dump_response(response))
+        if size > self.max_size:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._results:
+                self._remove(key)
+            self._results[key] = CachedResult(response, size, identifiers)
+            self.size += size
+            for identifier in identifiers:
+                self._index.setdefault(identifier, set()).add(key)
+            while self.size > self.max_size:
+                self._remove(next(iter(self._results)))
+                self.evictions += 1
+
+    def invalidate(self, tables: Optional[Iterable[str]]) -> None:
+        """Drop results which may have read the tables, all results for None"""
+        with self._lock:
+            self.generation += 1
+            if tables is None:
+                self.invalidations += len(self._results)
+                self._results.clear()
+                self._index.clear()
+                self.size = 0
+                return
+            for table in tables:
+                for key in list(self._index.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._index.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def _remove(self, key: Hashable) -> None:
+        result: CachedResult = self._results.pop(key)
+        self.size -= result.size
+        for identifier in result.identifiers:
+            keys: Set[Hashable] = self._index[identifier]
+            keys.discard(key)
+            if not keys:
+                del self._index[identifier]
+
+
+RESULT_CACHE: ResultCache = ResultCache(get_result_cache_size())
+
+RESULT_CACHE_LOOKUPS: CollectedCounter = CollectedCounter(
+    'local_data_api_result_cache_lookups_total',
+    'Lookups of the result cache by whether they hit',
+    ['result'],
+    lambda: [(('hit',), RESULT_CACHE.hits), (('miss',), RESULT_CACHE.misses)],
+)
+RESULT_CACHE_REMOVALS: CollectedCounter = CollectedCounter(
+    'local_data_api_result_cache_removals_total',
+    'Results removed from the result cache by reason',
+    ['reason'],
+    lambda: [
+        (('eviction',), RESULT_CACHE.evictions),
+        (('invalidation',), RESULT_CACHE.invalidations),
+    ],
+)
+RESULT_CACHE_BYTES: Gauge = Gauge(
+    'local_data_api_result_cache_bytes',
+    'Bytes of JSON responses in the result cache',
+    [],
+    lambda: [((), RESULT_CACHE.size)],
+)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import re
+from base64 import b64encode
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# a Field of the Data API as a plain dict with only the set value
+FieldEncoder = Callable[[Any], Dict[str, Any]]
+RecordEncoder = Callable[[Sequence[Any]], List[Dict[str, Any]]]
+# a value of formattedRecords, which is serialized as it is
+JSONValueEncoder = Callable[[Any], Any]
+RecordFormatter = Callable[[Sequence[Any]], Dict[str, Any]]
+
+DATETIME_FORMAT: re.Pattern = re.compile(r'^[^.]+(\.\d{3}|$)')
+
+
+def format_datetime(value: Any) -> str:
+    return DATETIME_FORMAT.match(str(value)).group()  # type: ignore
+
+
+def encode_null(_: Any = None) -> Dict[str, Any]:
+    return {'isNull': True}
+
+
+def encode_boolean(value: Any) -> Dict[str, Any]:
+    return {'booleanValue': value}
+
+
+def encode_long(value: Any) -> Dict[str, Any]:
+    return {'longValue': value}
+
+
+def encode_double(value: Any) -> Dict[str, Any]:
+    return {'doubleValue': value}
+
+
+def encode_string(value: Any) -> Dict[str, Any]:
+    return {'stringValue': value}
+
+
+def encode_blob(value: Any) -> Dict[str, Any]:
+    return {'blobValue': b64encode(value).decode()}
+
+
+def encode_datetime(value: Any) -> Dict[str, Any]:
+    return {'stringValue': format_datetime(value)}
+
+
+# keys of a Value of ExecuteSql which differ from the keys of a Field
+SQL_VALUE_KEYS: Dict[str, str] = {
+    'longValue': 'bigIntValue',
+    'booleanValue': 'bitValue',
+}
+
+
+def encode_sql_value(field: Dict[str, Any]) -> Dict[str, Any]:
+    return {SQL_VALUE_KEYS.get(key, key): value for key, value in field.items()}
+
+
+VALUE_ENCODERS: Dict[type, FieldEncoder] = {}
+
+
+def get_value_encoder(type_: type) -> Optional[FieldEncoder]:
+    """Return the encoder of values of a python type, None if it is unsupported"""
+    try:
+        return VALUE_ENCODERS[type_]
+    except KeyError:
+        pass
+    encoder: Optional[FieldEncoder]
+    # keep the same precedence as Resource.get_field_from_value
+    if issubclass(type_, bool):
+        encoder = encode_boolean
+    elif issubclass(type_, str):
+        encoder = encode_string
+    elif type_.__name__ == 'datetime':
+        encoder = encode_datetime
+    elif issubclass(type_, int):
+        encoder = encode_long
+    elif issubclass(type_, float):
+        encoder = encode_double
+    elif issubclass(type_, bytes):
+        encoder = encode_blob
+    else:
+        return None
+    VALUE_ENCODERS[type_] = encoder
+    return encoder
+
+
+def encode_value(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return encode_null()
+    encoder: Optional[FieldEncoder] = get_value_encoder(type(value))
+    if encoder is None:
+        raise Exception(f'unsupported type {type(value)}: {value} ')
+    return encoder(value)
+
+
+def create_column_encoder() -> FieldEncoder:
+    """
+    Return an encoder for the values of a column.
+    The encoder is resolved on the first value and only looked up again
+    when the type of values changes, e.g. with SQLite's dynamic typing.
+    """
+    column_type: Optional[type] = None
+    column_encoder: FieldEncoder = encode_value
+
+    def encode(value: Any) -> Dict[str, Any]:
+        nonlocal column_type, column_encoder
+        if value is None:
+            return encode_null()
+        if type(value) is not column_type:
+            encoder: Optional[FieldEncoder] = get_value_encoder(type(value))
+            if encoder is None:
+                return encode_value(value)
+            column_type, column_encoder = type(value), encoder
+        return column_encoder(value)
+
+    return encode
+
+
+def override_by_value_type(
+    encoder: FieldEncoder, get_override: Callable[[type], Optional[FieldEncoder]]
+) -> FieldEncoder:
+    """
+    Wrap an encoder with encoders picked by the type of values.
+    `get_override` is called once per type and None falls back to `encoder`.
+    """
+    encoders: Dict[type, FieldEncoder] = {}
+
+    def encode(value: Any) -> Dict[str, Any]:
+        type_encoder: Optional[FieldEncoder] = encoders.get(type(value))
+        if type_encoder is None:
+            type_encoder = encoders[type(value)] = get_override(type(value)) or encoder
+        return type_encoder(value)
+
+    return encode
+
+
+def create_record_encoder(column_encoders: Sequence[FieldEncoder]) -> RecordEncoder:
+    def encode_record(row: Sequence[Any]) -> List[Dict[str, Any]]:
+        return [encode(value) for encode, value in zip(column_encoders, row)]
+
+    return encode_record
+
+
+def format_field(field: Dict[str, Any]) -> Any:
+    """Return the value of a Field for formattedRecords"""
+    for key, value in field.items():
+        if key == 'isNull':
+            return None
+        return value
+    return None  # pragma: no cover
+
+
+def format_as_is(value: Any) -> Any:
+    return value
+
+
+def format_blob(value: Any) -> str:
+    return b64encode(value).decode()
+
+
+JSON_VALUE_ENCODERS: Dict[type, JSONValueEncoder] = {}
+
+
+def get_json_value_encoder(type_: type) -> Optional[JSONValueEncoder]:
+    """
+    Return the encoder of values of a python type for formattedRecords,
+    None if it is unsupported. Values are rendered like the value of their Field,
+    and decimals like the stringValue of a DECIMAL column of JDBC resources.
+    """
+    try:
+        return JSON_VALUE_ENCODERS[type_]
+    except KeyError:
+        pass
+    encoder: Optional[JSONValueEncoder]
+    if issubclass(type_, (bool, str, int, float)):
+        encoder = format_as_is
+    elif type_.__name__ == 'datetime':
+        encoder = format_datetime
+    elif issubclass(type_, Decimal):
+        encoder = str
+    elif issubclass(type_, bytes):
+        encoder = format_blob
+    else:
+        return None
+    JSON_VALUE_ENCODERS[type_] = encoder
+    return encoder
+
+
+def create_json_column_encoder() -> JSONValueEncoder:
+    """The counterpart of create_column_encoder() for formattedRecords"""
+    column_type: Optional[type] = None
+    column_encoder: JSONValueEncoder = format_as_is
+
+    def encode(value: Any) -> Any:
+        nonlocal column_type, column_encoder
+        if value is None:
+            return None
+        if type(value) is not column_type:
+            encoder: Optional[JSONValueEncoder] = get_json_value_encoder(type(value))
+            if encoder is None:
+                raise Exception(f'unsupported type {type(value)}: {value} ')
+            column_type, column_encoder = type(value), encoder
+        return column_encoder(value)
+
+    return encode
+
+
+def create_record_formatter(
+    labels: Sequence[str], column_encoders: Sequence[JSONValueEncoder]
+) -> RecordFormatter:
+    """Return a function turning a row into an object of formattedRecords"""
+    columns: List[Any] = list(zip(labels, column_encoders))
+
+    def format_record(row: Sequence[Any]) -> Dict[str, Any]:
+        return {label: encode(value) for (label, encode), value in zip(columns, row)}
+
+    return format_record
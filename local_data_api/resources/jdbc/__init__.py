@@ -1,19 +1,49 @@
 from __future__ import annotations
 
+import os
+import re
+import threading
 from abc import ABC, abstractmethod
-from base64 import b64encode
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple, Union
 
 import jaydebeapi
 from sqlalchemy import text
 from sqlalchemy.engine import Dialect
 
 from local_data_api.exceptions import BadRequestException
-from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
-from local_data_api.resources.resource import JDBCType, Resource
+from local_data_api.metrics import measure
+from local_data_api.models import ColumnMetadata, Field, RecordsFormatType, UpdateResult
+from local_data_api.resources.encoder import (
+    FieldEncoder,
+    JSONValueEncoder,
+    RecordEncoder,
+    RecordFormatter,
+    create_column_encoder,
+    create_json_column_encoder,
+    create_record_encoder,
+    create_record_formatter,
+    encode_blob,
+    encode_datetime,
+    encode_null,
+    format_field,
+)
+from local_data_api.resources.query import INSERT_KEYWORDS, QUERY_CACHE, ParsedQuery
+from local_data_api.resources.resource import (
+    STREAMING_FETCH_SIZE,
+    JDBCType,
+    Resource,
+    RowFetcher,
+)
 
 if TYPE_CHECKING:  # pragma: no cover
-    from local_data_api.resources.resource import Connection, ConnectionMaker
+    from local_data_api.resources.pool import ConnectionPool
+    from local_data_api.resources.resource import (
+        Connection,
+        ConnectionMaker,
+        Jconn,
+        JStatement,
+    )
 
 # https://docs.aws.amazon.com/AmazonRDS/latest/AuroraUserGuide/data-api.html
 """
@@ -36,6 +66,96 @@ BLOB = [JDBCType.BLOB, JDBCType.BINARY, JDBCType.LONGVARBINARY, JDBCType.VARBINA
 TIMESTAMP = [JDBCType.TIMESTAMP, JDBCType.TIMESTAMP_WITH_TIMEZONE]
 
 
+# values are coerced as the Field model did when it was built from them
+def encode_jdbc_long(value: Any) -> Dict[str, Any]:
+    return {'longValue': value if type(value) is int else int(value)}
+
+
+def encode_jdbc_double(value: Any) -> Dict[str, Any]:
+    return {'doubleValue': value if type(value) is float else float(value)}
+
+
+def encode_jdbc_string(value: Any) -> Dict[str, Any]:
+    return {'stringValue': value if isinstance(value, str) else str(value)}
+
+
+def encode_jdbc_boolean(value: Any) -> Dict[str, Any]:
+    return {'booleanValue': bool(value)}
+
+
+def encode_jdbc_blob(value: Any) -> Dict[str, Any]:
+    if isinstance(value, str):  # pragma: no cover
+        value = value.encode()
+    return encode_blob(value)
+
+
+JDBC_TYPE_ENCODERS: Dict[JDBCType, FieldEncoder] = {
+    **{type_: encode_jdbc_long for type_ in LONG},
+    **{type_: encode_jdbc_double for type_ in DOUBLE},
+    **{type_: encode_jdbc_string for type_ in STRING},
+    **{type_: encode_jdbc_boolean for type_ in BOOLEAN},
+    **{type_: encode_datetime for type_ in TIMESTAMP},
+    **{type_: encode_jdbc_blob for type_ in BLOB},
+}
+
+
+@lru_cache(maxsize=None)
+def get_jdbc_type_encoder(jdbc_type: Optional[int]) -> Optional[FieldEncoder]:
+    """Return the encoder of a JDBC type, None to encode by the type of values"""
+    if not jdbc_type:
+        return None
+    try:
+        return JDBC_TYPE_ENCODERS.get(JDBCType(jdbc_type))
+    except ValueError:
+        return None
+
+
+# seconds to wait for Connection.isValid() when validating a pooled connection
+JDBC_VALIDATION_TIMEOUT: int = 5
+
+# rows fetched per round trip by the JDBC driver, 0 keeps the driver's default
+JDBC_FETCH_SIZE: int = int(os.environ.get('JDBC_FETCH_SIZE', '0'))
+
+# reads rows into an array per column in one call, when it is on JVM_CLASSPATH
+COLUMN_READER_CLASS: str = 'com.koxudaxi.localDataApi.ColumnReader'
+# rows read by a call of ColumnReader.read()
+COLUMN_READER_BATCH_SIZE: int = int(os.environ.get('COLUMN_READER_BATCH_SIZE', '1000'))
+
+# the constants of ColumnReader reading a column like a converter of jaydebeapi
+COLUMN_OBJECT: int = 0
+COLUMN_LONG: int = 1
+COLUMN_DOUBLE: int = 2
+COLUMN_BOOLEAN: int = 3
+COLUMN_DECIMAL: int = 4
+COLUMN_READER_KINDS: Dict[Any, int] = {
+    jaydebeapi._unknownSqlTypeConverter: COLUMN_OBJECT,
+    getattr(jaydebeapi, '_to_int'): COLUMN_LONG,
+    getattr(jaydebeapi, '_to_double'): COLUMN_DOUBLE,
+    getattr(jaydebeapi, '_to_boolean'): COLUMN_BOOLEAN,
+    getattr(jaydebeapi, '_to_decimal'): COLUMN_DECIMAL,
+}
+# kinds read into arrays of primitives, whose nulls are flagged apart
+PRIMITIVE_COLUMNS: Tuple[int, ...] = (COLUMN_LONG, COLUMN_DOUBLE, COLUMN_BOOLEAN)
+
+# options of the JVM, e.g. '-Xmx512m -XX:+UseSerialGC -XX:TieredStopAtLevel=1'
+JVM_OPTIONS: List[str] = os.environ.get('JVM_OPTIONS', '').split()
+# jars and directories added to the classpath after the JAR_PATH of the driver
+JVM_CLASSPATH: List[str] = [
+    path for path in os.environ.get('JVM_CLASSPATH', '').split(os.pathsep) if path
+]
+
+# connections of executor threads may be the first ones
+JVM_LOCK: threading.Lock = threading.Lock()
+
+# java.sql.Statement.RETURN_GENERATED_KEYS
+RETURN_GENERATED_KEYS: int = 1
+
+GENERATED_KEY_TYPES: Tuple[int, ...] = tuple(type_.value for type_ in LONG)
+
+# statements returning rows themselves instead of generated keys
+RETURNING: re.Pattern = re.compile(r'\bRETURNING\b', re.IGNORECASE)
+
+
 def _fixed_to_datetime(rs: Any, col: Any) -> Optional[str]:  # pragma: no cover
     """
     jaydebeapi has a bug that can't be parsed datetime correctly.
@@ -67,6 +187,105 @@ def attach_thread_to_jvm() -> None:
         )
 
 
+@lru_cache(maxsize=None)
+def load_column_reader() -> Any:
+    """Return the ColumnReader class, None unless it is on the classpath"""
+    import jpype
+
+    try:
+        return jpype.JClass(COLUMN_READER_CLASS)
+    except Exception:
+        return None
+
+
+def get_column_reader() -> Any:
+    import jpype
+
+    if not jpype.isJVMStarted():
+        return None
+    return load_column_reader()
+
+
+def read_column(values: Any, nulls: Any, kind: int, size: int) -> List[Any]:
+    """Convert the first `size` values of a Java array of ColumnReader"""
+    if kind not in PRIMITIVE_COLUMNS:
+        return list(values[:size])
+    # the buffer of a primitive array is copied at once
+    column: List[Any] = memoryview(values)[:size].tolist()
+    is_null: List[Any] = memoryview(nulls)[:size].tolist()
+    if any(is_null):
+        return [None if null else value for value, null in zip(column, is_null)]
+    return column
+
+
+def create_column_fetcher(
+    column_reader: Any, result_set: Any, kinds: List[int]
+) -> RowFetcher:
+    """Fetch rows with ColumnReader, which reads a batch of rows in one JPype call"""
+
+    def fetch(size: Optional[int]) -> List[Tuple[Any, ...]]:
+        rows: List[Tuple[Any, ...]] = []
+        while size is None or len(rows) < size:
+            batch_size: int = (
+                COLUMN_READER_BATCH_SIZE
+                if size is None
+                else min(size - len(rows), COLUMN_READER_BATCH_SIZE)
+            )
+            columns: Any = column_reader.read(result_set, kinds, batch_size)
+            count: int = columns.size
+            rows.extend(
+                zip(
+                    *[
+                        read_column(
+                            columns.values[index], columns.nulls[index], kind, count
+                        )
+                        for index, kind in enumerate(kinds)
+                    ]
+                )
+            )
+            if count < batch_size:
+                break
+        return rows
+
+    return fetch
+
+
+def start_jvm(
+    jars: Union[List[str], str, None] = None,
+    libs: Union[List[str], str, None] = None,
+    options: List[str] = JVM_OPTIONS,
+    classpath: List[str] = JVM_CLASSPATH,
+) -> None:
+    """
+    Start the JVM with `options` unless it is running, as jaydebeapi does on
+    the first connection which has no way to pass options to the JVM
+    """
+    import jpype
+
+    with JVM_LOCK:
+        if jpype.isJVMStarted():
+            return
+        args: List[str] = list(options)
+        class_path: List[str] = [
+            *([jars] if isinstance(jars, str) else jars or []),
+            *classpath,
+            *getattr(jaydebeapi, '_get_classpath')(),
+        ]
+        if class_path:
+            args.append(f'-Djava.class.path={os.pathsep.join(class_path)}')
+        if libs:
+            args.append(
+                '-Djava.library.path='
+                + (libs if isinstance(libs, str) else os.pathsep.join(libs))
+            )
+        jpype.startJVM(
+            jpype.getDefaultJVMPath(),
+            *args,
+            ignoreUnrecognized=True,
+            convertStrings=True,
+        )
+
+
 def connection_maker(
     jclassname: str,
     url: str,
@@ -75,6 +294,7 @@ def connection_maker(
     libs: Union[List[str], str] = None,
 ) -> ConnectionMaker:
     def connect(database: Optional[str] = None, **kwargs):  # type: ignore
+        start_jvm(jars, libs)
         attach_thread_to_jvm()
         return jaydebeapi.connect(
             jclassname, url + database if database else url, driver_args, jars, libs
@@ -87,42 +307,69 @@ class JDBC(Resource, ABC):
     JDBC_NAME: str
     DRIVER: str
     DIALECT: Dialect
+    PARAMSTYLE = 'qmark'
+    # inserts report the keys generated by the driver as generatedFields
+    SUPPORTS_GENERATED_KEYS: bool = False
+    # driver property setting the default fetch size of statements
+    FETCH_SIZE_PROPERTY: Optional[str] = None
 
-    def __init__(self, connection: Connection, transaction_id: Optional[str] = None):
-        if transaction_id:
-            attach_thread_to_jvm()
-        super().__init__(connection, transaction_id)
+    def __init__(
+        self,
+        connection: Connection,
+        transaction_id: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
+        # executor threads run statements with or without a transaction
+        attach_thread_to_jvm()
+        super().__init__(connection, transaction_id, pool)
+        self._generated_keys: List[int] = []
+
+    @classmethod
+    def reset_connection(cls, connection: Connection) -> None:
+        # pooled connections stay in manual commit mode, and every call is a
+        # round trip, so only roll back what a request left open
+        if getattr(connection, 'in_transaction', False):
+            connection.jconn.rollback()
+            setattr(connection, 'in_transaction', False)
+
+    @classmethod
+    def ping(cls, connection: Connection) -> bool:
+        try:
+            return bool(connection.jconn.isValid(JDBC_VALIDATION_TIMEOUT))
+        except Exception:
+            return False
 
     def get_field_from_value(self, value: Any) -> Field:
         return super().get_field_from_value(value)
 
-    @abstractmethod
     def get_filed_from_jdbc_type(self, value: Any, jdbc_type: Optional[int]) -> Field:
-        type_: Optional[JDBCType] = None
-        if jdbc_type:
-            try:
-                type_ = JDBCType(jdbc_type)
-            except ValueError:
-                pass
-        if type_:
+        return Field(**self.create_column_encoder(jdbc_type)(value))
+
+    def create_column_encoder(self, jdbc_type: Optional[int]) -> FieldEncoder:
+        """Return the encoder of a column chosen once from its JDBC type"""
+        type_encoder: Optional[FieldEncoder] = get_jdbc_type_encoder(jdbc_type)
+        if type_encoder is None:
+            return create_column_encoder()
+
+        def encode(value: Any) -> Dict[str, Any]:
+            if value is None:
+                return encode_null()
+            return type_encoder(value)
+
+        return encode
+
+    def create_json_column_encoder(self, jdbc_type: Optional[int]) -> JSONValueEncoder:
+        """Return the encoder of a column for formattedRecords"""
+        type_encoder: Optional[FieldEncoder] = get_jdbc_type_encoder(jdbc_type)
+        if type_encoder is None:
+            return create_json_column_encoder()
+
+        def encode(value: Any) -> Any:
             if value is None:
-                return Field(isNull=True)
-            elif type_ in LONG:
-                return Field(longValue=value)
-            elif type_ in DOUBLE:
-                return Field(doubleValue=value)
-            elif type_ in STRING:
-                return Field(stringValue=value)
-            elif type_ in BOOLEAN:
-                return Field(booleanValue=value)
-            elif type_ in TIMESTAMP:
-                return Field(stringValue=self._format_datetime(value))
-            elif type_ in BLOB:
-                if isinstance(value, str):  # pragma: no cover
-                    value = value.encode()
-                return Field(blobValue=b64encode(value))
-
-        return self.get_field_from_value(value)
+                return None
+            return format_field(type_encoder(value))
+
+        return encode
 
     def create_column_metadata_set(
         self, cursor: jaydebeapi.Cursor
@@ -148,79 +395,250 @@ class JDBC(Resource, ABC):
             for i in range(1, meta.getColumnCount() + 1)
         ]
 
-    def autocommit_off(self) -> None:  # pragma: no cover
-        self.connection.jconn.setAutoCommit(False)
+    def autocommit_off(self) -> None:
+        if getattr(self.connection, 'autocommit', True):
+            self.connection.jconn.setAutoCommit(False)
+            setattr(self.connection, 'autocommit', False)
+        setattr(self.connection, 'in_transaction', True)
+
+    def commit(self) -> None:
+        super().commit()
+        setattr(self.connection, 'in_transaction', False)
+
+    def rollback(self) -> None:
+        super().rollback()
+        setattr(self.connection, 'in_transaction', False)
+
+    def returns_generated_keys(self, sql: str) -> bool:
+        """Whether the driver is asked for the keys generated by a statement"""
+        return (
+            self.SUPPORTS_GENERATED_KEYS
+            and QUERY_CACHE.get(self.DIALECT, sql).keyword in INSERT_KEYWORDS
+            and not RETURNING.search(sql)
+        )
 
-    @staticmethod
-    @abstractmethod
-    def reset_generated_id(cursor: jaydebeapi.Cursor) -> None:
-        raise NotImplementedError
+    def last_generated_id(self, cursor: jaydebeapi.Cursor) -> int:
+        return self._generated_keys[0] if self._generated_keys else 0
 
-    @staticmethod
-    @abstractmethod
-    def last_generated_id(cursor: jaydebeapi.Cursor) -> int:
-        raise NotImplementedError
+    def execute_cursor(
+        self,
+        cursor: jaydebeapi.Cursor,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._generated_keys = []
+        returns_generated_keys: bool = self.returns_generated_keys(sql)
+        if not returns_generated_keys and not JDBC_FETCH_SIZE:
+            super().execute_cursor(cursor, sql, params)
+            return
+
+        with measure('compile'):
+            operation, *parameters = (
+                self.create_statement(sql, params) if params else (str(text(sql)),)
+            )
+        # jaydebeapi.Cursor.execute() with a statement returning generated keys,
+        # or fetching JDBC_FETCH_SIZE rows per round trip
+        cursor._close_last()
+        statement: JStatement = self.prepare_statement(
+            operation, returns_generated_keys
+        )
+        if JDBC_FETCH_SIZE:
+            statement.setFetchSize(JDBC_FETCH_SIZE)
+        cursor._prep = statement
+        cursor._set_stmt_parms(statement, parameters[0] if parameters else ())
+        try:
+            with measure('execute'):
+                is_result_set: bool = statement.execute()
+        except Exception:
+            jaydebeapi._handle_sql_exception()
+        if is_result_set:
+            result_set: Any = statement.getResultSet()
+            cursor._rs = result_set
+            cursor._meta = result_set.getMetaData()
+            cursor.rowcount = -1
+        else:
+            cursor.rowcount = statement.getUpdateCount()
+        if returns_generated_keys:
+            self._generated_keys = self.get_generated_keys(statement)
+
+    def create_row_fetcher(self, cursor: jaydebeapi.Cursor) -> RowFetcher:
+        """
+        Fetch rows from the ResultSet with the converters of the columns looked
+        up once, while jaydebeapi queries the column count and the type of every
+        cell through JPype for each row.
+
+        When ColumnReader is on the classpath and reads every column like its
+        converter, a batch of rows is read in one call instead.
+        """
+        result_set: Any = getattr(cursor, '_rs')
+        meta: Any = getattr(cursor, '_meta')
+        converters: Dict[int, Any] = getattr(cursor, '_converters')
+        columns: List[Tuple[int, Any]] = [
+            (
+                column,
+                converters.get(
+                    meta.getColumnType(column), jaydebeapi._unknownSqlTypeConverter
+                ),
+            )
+            for column in range(1, meta.getColumnCount() + 1)
+        ]
+        column_reader: Any = get_column_reader()
+        kinds: List[Optional[int]] = [
+            COLUMN_READER_KINDS.get(convert) for _, convert in columns
+        ]
+        if column_reader is not None and None not in kinds:
+            return create_column_fetcher(column_reader, result_set, kinds)  # type: ignore
+
+        def fetch(size: Optional[int]) -> List[Tuple[Any, ...]]:
+            rows: List[Tuple[Any, ...]] = []
+            while (size is None or len(rows) < size) and result_set.next():
+                rows.append(
+                    tuple([convert(result_set, column) for column, convert in columns])
+                )
+            return rows
+
+        return fetch
+
+    def create_record_converter(
+        self, cursor: jaydebeapi.Cursor, include_result_metadata: bool = False
+    ) -> Tuple[RecordEncoder, Optional[List[ColumnMetadata]]]:
+        column_metadata_set = self.create_column_metadata_set(cursor)
+        encode_record: RecordEncoder = create_record_encoder(
+            [
+                self.create_column_encoder(column_metadata.type)
+                for column_metadata in column_metadata_set
+            ]
+        )
+        if include_result_metadata:
+            return encode_record, column_metadata_set
+        return encode_record, None
+
+    def create_record_formatter(self, cursor: jaydebeapi.Cursor) -> RecordFormatter:
+        column_metadata_set = self.create_column_metadata_set(cursor)
+        return create_record_formatter(
+            [column_metadata.label or '' for column_metadata in column_metadata_set],
+            [
+                self.create_json_column_encoder(column_metadata.type)
+                for column_metadata in column_metadata_set
+            ],
+        )
 
-    def execute(
+    def execute_stream(
         self,
         sql: str,
         params: Optional[Dict[str, Any]] = None,
         include_result_metadata: bool = False,
-    ) -> ExecuteStatementResponse:
+        fetch_size: int = STREAMING_FETCH_SIZE,
+        format_records_as: RecordsFormatType = RecordsFormatType.NONE,
+    ) -> Union[Dict[str, Any], Generator[str, None, None]]:
+        result = super().execute_stream(
+            sql, params, include_result_metadata, fetch_size, format_records_as
+        )
+        if isinstance(result, dict):
+            return result
+        return self._attach_chunks(result)
+
+    @staticmethod
+    def _attach_chunks(
+        chunks: Generator[str, None, None]
+    ) -> Generator[str, None, None]:
+        """Attach the thread fetching each chunk to the JVM"""
+        try:
+            while True:
+                attach_thread_to_jvm()
+                try:
+                    chunk: str = next(chunks)
+                except StopIteration:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+
+    def batch_execute(
+        self, sql: str, parameter_sets: List[Dict[str, Any]]
+    ) -> List[UpdateResult]:
+        parsed_query: ParsedQuery = QUERY_CACHE.get(self.DIALECT, sql)
+        if not parsed_query.supports_paramstyle(self.PARAMSTYLE):
+            # a `?` of the text would be a parameter of a PreparedStatement
+            return super().batch_execute(sql, parameter_sets)
+        returns_generated_keys: bool = self.returns_generated_keys(sql)
+        jconn: Jconn = self.connection.jconn
         try:
-            cursor: Optional[jaydebeapi.Cursor] = None
+            statement: Optional[JStatement] = None
             try:
-                cursor = self.connection.cursor()
-
-                self.reset_generated_id(cursor)
-                if params:
-                    cursor.execute(self.create_query(sql, params))
-                else:
-                    cursor.execute(str(text(sql)))
-                if cursor.description:
-                    column_metadata_set = self.create_column_metadata_set(cursor)
-                    response = ExecuteStatementResponse(
-                        numberOfRecordsUpdated=0,
-                        records=[
-                            [
-                                self.get_filed_from_jdbc_type(
-                                    column, column_metadata.type
-                                )
-                                for column, column_metadata in zip(
-                                    row, column_metadata_set
-                                )
-                            ]
-                            for row in cursor.fetchall()
-                        ],
+                # a Statement batching the SQL of each set returns no keys
+                if (
+                    self.NATIVE_BINDING and parsed_query.bind_names
+                ) or returns_generated_keys:
+                    statement = self.prepare_statement(
+                        parsed_query.to_paramstyle(self.PARAMSTYLE),
+                        returns_generated_keys,
                     )
-                    if include_result_metadata:
-                        response.columnMetadata = column_metadata_set
-                    return response
+                    for parameters in parameter_sets:
+                        for index, value in enumerate(
+                            parsed_query.bind(parameters, self.PARAMSTYLE), 1
+                        ):
+                            statement.setObject(index, value)
+                        statement.addBatch()
                 else:
-                    rowcount: int = cursor.rowcount
-                    last_generated_id: int = self.last_generated_id(cursor)
-                    generated_fields: List[Field] = []
-                    if last_generated_id > 0:
-                        generated_fields.append(
-                            self.get_field_from_value(last_generated_id)
-                        )
-                    return ExecuteStatementResponse(
-                        numberOfRecordsUpdated=rowcount,
-                        generatedFields=generated_fields,
-                    )
+                    statement = jconn.createStatement()
+                    for parameters in parameter_sets:
+                        statement.addBatch(self.create_query(sql, parameters))
+                with measure('execute'):
+                    statement.executeBatch()
+                generated_keys: List[int] = (
+                    self.get_generated_keys(statement) if returns_generated_keys else []
+                )
             finally:
-                if cursor:  # pragma: no cover
-                    cursor.close()
-
-        except jaydebeapi.DatabaseError as e:
-            message: str = 'Unknown'
-            if len(getattr(e, 'args', [])):
-                message = e.args[0]
-                if len(getattr(e.args[0], 'args', [])):
-                    message = e.args[0].args[0]
-                    if getattr(e.args[0].args[0], 'cause', None):
-                        message = e.args[0].args[0].cause.message
-            raise BadRequestException(str(message))
+                if statement:  # pragma: no cover
+                    statement.close()
+        except BadRequestException:
+            raise
+        except Exception as e:
+            # JPype raises java.sql.SQLException without jaydebeapi's wrapping
+            raise BadRequestException(
+                self.get_error_message(jaydebeapi.DatabaseError(e))
+            )
+
+        return [
+            UpdateResult(generatedFields=[self.get_field_from_value(key)])
+            for key in generated_keys
+            if key > 0
+        ]
+
+    def prepare_statement(
+        self, sql: str, return_generated_keys: bool = False
+    ) -> JStatement:
+        if return_generated_keys:
+            return self.connection.jconn.prepareStatement(sql, RETURN_GENERATED_KEYS)
+        return self.connection.jconn.prepareStatement(sql)
+
+    @staticmethod
+    def get_generated_keys(statement: JStatement) -> List[int]:
+        generated_keys: List[int] = []
+        result_set = statement.getGeneratedKeys()
+        try:
+            # a driver may return whole rows, of which only an integral id is a key
+            if result_set.next() and (
+                result_set.getMetaData().getColumnType(1) in GENERATED_KEY_TYPES
+            ):
+                generated_keys.append(int(result_set.getLong(1)))
+                while result_set.next():
+                    generated_keys.append(int(result_set.getLong(1)))
+        finally:
+            result_set.close()
+        return generated_keys
+
+    @staticmethod
+    def get_error_message(e: Exception) -> str:
+        message: Any = 'Unknown'
+        if len(getattr(e, 'args', [])):
+            message = e.args[0]
+            if len(getattr(e.args[0], 'args', [])):
+                message = e.args[0].args[0]
+                if getattr(e.args[0].args[0], 'cause', None):
+                    message = e.args[0].args[0].cause.message
+        return str(message)
 
     @classmethod
     def create_connection_maker(
@@ -237,9 +655,13 @@ class JDBC(Resource, ABC):
         if not engine_kwargs or 'JAR_PATH' not in engine_kwargs:
             raise Exception('Not Found JAR_PATH in settings')
 
+        driver_args: Dict[str, Any] = {"user": user_name, "password": password}
+        if JDBC_FETCH_SIZE and cls.FETCH_SIZE_PROPERTY:
+            driver_args[cls.FETCH_SIZE_PROPERTY] = str(JDBC_FETCH_SIZE)
+
         return connection_maker(
             cls.DRIVER,
             url,
-            {"user": user_name, "password": password},
+            driver_args,
             engine_kwargs['JAR_PATH'],
         )
@@ -1,30 +1,34 @@
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 from sqlalchemy.dialects import mysql
 from sqlalchemy.engine import Dialect
 
-from local_data_api.models import Field
-from local_data_api.resources.jdbc import JDBC, jaydebeapi
+from local_data_api.resources.encoder import FieldEncoder, override_by_value_type
+from local_data_api.resources.jdbc import JDBC
 from local_data_api.resources.resource import register_resource_type
 
 
+def encode_big_integer(value: Any) -> Dict[str, Any]:
+    return {'longValue': int(str(value))}
+
+
+@lru_cache(maxsize=None)
+def get_big_integer_encoder(type_: type) -> Optional[FieldEncoder]:
+    if type_.__name__.endswith('BigInteger'):
+        return encode_big_integer
+    return None
+
+
 @register_resource_type
 class MySQLJDBC(JDBC):
     DRIVER = 'org.mariadb.jdbc.Driver'
     JDBC_NAME = 'jdbc:mariadb'
     DIALECT: Dialect = mysql.dialect(paramstyle='named')
+    SUPPORTS_GENERATED_KEYS = True
+    FETCH_SIZE_PROPERTY = 'defaultFetchSize'
 
-    @staticmethod
-    def reset_generated_id(cursor: jaydebeapi.Cursor) -> None:
-        cursor.execute('SELECT LAST_INSERT_ID(NULL)')
-
-    @staticmethod
-    def last_generated_id(cursor: jaydebeapi.Cursor) -> int:
-        cursor.execute("SELECT LAST_INSERT_ID()")
-        return int(str(cursor.fetchone()[0]))
-
-    def get_filed_from_jdbc_type(self, value: Any, jdbc_type: Optional[int]) -> Field:
-        if type(value).__name__.endswith('BigInteger'):
-            return Field(longValue=int(str(value)))
-        else:
-            return super().get_filed_from_jdbc_type(value, jdbc_type)
+    def create_column_encoder(self, jdbc_type: Optional[int]) -> FieldEncoder:
+        return override_by_value_type(
+            super().create_column_encoder(jdbc_type), get_big_integer_encoder
+        )
@@ -1,10 +1,11 @@
-from typing import Any, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import Dialect
 
-from local_data_api.models import Field
-from local_data_api.resources.jdbc import JDBC, jaydebeapi
+from local_data_api.resources.encoder import FieldEncoder, override_by_value_type
+from local_data_api.resources.jdbc import JDBC
 from local_data_api.resources.resource import register_resource_type
 
 PG_TYPES: Tuple[str, ...] = (
@@ -21,23 +22,25 @@ PG_TYPES: Tuple[str, ...] = (
 )
 
 
+def encode_pg_type(value: Any) -> Dict[str, Any]:
+    return {'stringValue': str(value)}
+
+
+@lru_cache(maxsize=None)
+def get_pg_type_encoder(type_: type) -> Optional[FieldEncoder]:
+    if type_.__name__.endswith(PG_TYPES):
+        return encode_pg_type
+    return None
+
+
 @register_resource_type
 class PostgreSQLJDBC(JDBC):
     DRIVER = 'org.postgresql.Driver'
     JDBC_NAME = 'jdbc:postgresql'
     DIALECT: Dialect = postgresql.dialect(paramstyle='named')
+    FETCH_SIZE_PROPERTY = 'defaultRowFetchSize'
 
-    @staticmethod
-    def reset_generated_id(cursor: jaydebeapi.Cursor) -> None:
-        pass
-
-    @staticmethod
-    def last_generated_id(cursor: jaydebeapi.Cursor) -> int:
-        return 0
-
-    def get_filed_from_jdbc_type(self, value: Any, jdbc_type: Optional[int]) -> Field:
-        type_ = type(value)
-        for pg_type in PG_TYPES:
-            if type_.__name__.endswith(pg_type):
-                return Field(stringValue=str(value))
-        return super().get_filed_from_jdbc_type(value, jdbc_type)
+    def create_column_encoder(self, jdbc_type: Optional[int]) -> FieldEncoder:
+        return override_by_value_type(
+            super().create_column_encoder(jdbc_type), get_pg_type_encoder
+        )
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import struct
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
 import pymysql
-from pymysql.constants import FIELD_TYPE
+from pymysql.constants import COMMAND, FIELD_TYPE, SERVER_STATUS
+from pymysql.cursors import RE_INSERT_VALUES
 from pymysql.protocol import FieldDescriptorPacket
 from sqlalchemy.dialects import mysql
 
-from local_data_api.models import ColumnMetadata, Field
+from local_data_api.metrics import measure
+from local_data_api.models import ColumnMetadata, Field, UpdateResult
+from local_data_api.resources.query import INSERT_KEYWORDS, ParsedQuery, get_identifiers
 from local_data_api.resources.resource import Resource, register_resource_type
 
 if TYPE_CHECKING:  # pragma: no cover
-    from local_data_api.resources.resource import ConnectionMaker, Cursor
+    from local_data_api.resources.resource import Connection, ConnectionMaker, Cursor
+
+# COM_SET_OPTION options
+MYSQL_OPTION_MULTI_STATEMENTS_ON: int = 0
+MYSQL_OPTION_MULTI_STATEMENTS_OFF: int = 1
+
+# characters of a statement sent for several parameter sets of a batch, as
+# pymysql's executemany() splits multi-row INSERTs
+MAX_BATCH_STATEMENT_LENGTH: int = pymysql.cursors.Cursor.max_stmt_length
 
 FIELD_TYPE_MAP: Dict[int, str] = {
     getattr(FIELD_TYPE, k): k for k in dir(FIELD_TYPE) if not k.startswith('_')
@@ -39,6 +51,33 @@ def create_column_metadata(
     )
 
 
+def split_batch(prefix: str, items: List[str], separator: str) -> Iterator[List[str]]:
+    """Split items into the parts of statements under MAX_BATCH_STATEMENT_LENGTH"""
+    chunk: List[str] = []
+    length: int = len(prefix)
+    for item in items:
+        if chunk and length + len(separator) + len(item) > MAX_BATCH_STATEMENT_LENGTH:
+            yield chunk
+            chunk, length = [], len(prefix)
+        chunk.append(item)
+        length += len(separator) + len(item)
+    if chunk:
+        yield chunk
+
+
+def set_multi_statements(connection: Connection, enabled: bool) -> None:
+    """Allow statements separated by semicolons on a connection, like the client flag"""
+    option: int = (
+        MYSQL_OPTION_MULTI_STATEMENTS_ON
+        if enabled
+        else MYSQL_OPTION_MULTI_STATEMENTS_OFF
+    )
+    getattr(connection, '_execute_command')(
+        COMMAND.COM_SET_OPTION, struct.pack('<H', option)
+    )
+    getattr(connection, '_read_packet')()
+
+
 @register_resource_type
 class MySQL(Resource):
     def autocommit_off(self) -> None:  # pragma: no cover
@@ -49,6 +88,22 @@ class MySQL(Resource):
         return [create_column_metadata(f) for f in getattr(cursor, '_result').fields]
 
     DIALECT = mysql.dialect(paramstyle='named')
+    PARAMSTYLE = 'pyformat'
+
+    @classmethod
+    def reset_connection(cls, connection: Connection) -> None:
+        # ROLLBACK is a round trip, so skip it when no transaction is open
+        server_status: int = getattr(connection, 'server_status')
+        if server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            connection.rollback()
+
+    @classmethod
+    def ping(cls, connection: Connection) -> bool:
+        try:
+            getattr(connection, 'ping')(reconnect=False)
+        except Exception:
+            return False
+        return True
 
     @classmethod
     def create_connection_maker(
@@ -78,5 +133,100 @@ class MySQL(Resource):
 
         return connect
 
+    def create_stream_cursor(self, sql: str) -> Cursor:
+        # an unbuffered cursor reads rows from the socket as they are fetched
+        return self.connection.cursor(pymysql.cursors.SSCursor)
+
+    def execute_batch_cursor(
+        self,
+        cursor: Cursor,
+        parsed_query: ParsedQuery,
+        sql: str,
+        parameter_sets: List[Dict[str, Any]],
+    ) -> List[UpdateResult]:
+        """
+        Send a batch in as few statements as possible: an INSERT of a row of
+        placeholders as multi-row INSERTs, other statements separated by
+        semicolons.
+        """
+        if len(parameter_sets) < 2:
+            return super().execute_batch_cursor(
+                cursor, parsed_query, sql, parameter_sets
+            )
+        query: str = parsed_query.to_paramstyle(self.PARAMSTYLE)
+        mogrify = getattr(cursor, 'mogrify')
+        if parsed_query.keyword == 'INSERT':
+            match = RE_INSERT_VALUES.match(query)
+            # ids can't be counted for rows which are skipped or updated
+            if (
+                match
+                and not match.group(3).strip()
+                and 'ignore' not in get_identifiers(sql)
+            ):
+                prefix, values = match.group(1, 2)
+                return self.insert_rows(
+                    cursor,
+                    prefix,
+                    [
+                        mogrify(values, parsed_query.bind(parameters, self.PARAMSTYLE))
+                        for parameters in parameter_sets
+                    ],
+                )
+        if parsed_query.keyword in INSERT_KEYWORDS:
+            return super().execute_batch_cursor(
+                cursor, parsed_query, sql, parameter_sets
+            )
+        statements: List[str] = [
+            mogrify(query, parsed_query.bind(parameters, self.PARAMSTYLE))
+            for parameters in parameter_sets
+        ]
+        set_multi_statements(self.connection, True)
+        try:
+            for chunk in split_batch('', statements, ';\n'):
+                with measure('execute'):
+                    cursor.execute(';\n'.join(chunk))
+                    while getattr(cursor, 'nextset')():
+                        pass
+        finally:
+            set_multi_statements(self.connection, False)
+        return []
+
+    def insert_rows(
+        self, cursor: Cursor, prefix: str, rows: List[str]
+    ) -> List[UpdateResult]:
+        """
+        Insert rows with multi-row INSERTs, of which MySQL reports the first
+        generated id. The ids of a statement are consecutive.
+        """
+        update_results: List[UpdateResult] = []
+        for chunk in split_batch(prefix, rows, ','):
+            with measure('execute'):
+                cursor.execute(prefix + ','.join(chunk))
+            first_id: int = cursor.lastrowid
+            if first_id > 0:
+                update_results.extend(
+                    UpdateResult(generatedFields=[self.get_field_from_value(id_)])
+                    for id_ in range(first_id, first_id + len(chunk))
+                )
+        return update_results
+
+    def execute_script(
+        self, cursor: Cursor, statements: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Send all statements in one round trip and read a result set of each"""
+        if len(statements) < 2:
+            return super().execute_script(cursor, statements)
+        set_multi_statements(self.connection, True)
+        try:
+            with measure('execute'):
+                cursor.execute(';\n'.join(statements))
+            results: List[Dict[str, Any]] = [self.create_sql_statement_result(cursor)]
+            while getattr(cursor, 'nextset')():
+                results.append(self.create_sql_statement_result(cursor))
+            return results
+        finally:
+            # ExecuteStatement runs a single statement as Aurora does
+            set_multi_statements(self.connection, False)
+
     def get_field_from_value(self, value: Any) -> Field:
         return super().get_field_from_value(value)
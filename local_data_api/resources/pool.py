@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, List, Optional, Tuple
+
+from local_data_api.exceptions import ServiceUnavailableError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from local_data_api.resources.resource import Connection
+
+POOL_MIN_SIZE: int = int(os.environ.get('POOL_MIN_SIZE', '0'))
+POOL_MAX_SIZE: int = int(os.environ.get('POOL_MAX_SIZE', '10'))
+POOL_TIMEOUT: float = float(os.environ.get('POOL_TIMEOUT', '30'))
+POOL_IDLE_TIMEOUT: float = float(os.environ.get('POOL_IDLE_TIMEOUT', '300'))
+POOL_VALIDATION_INTERVAL: float = float(
+    os.environ.get('POOL_VALIDATION_INTERVAL', '30')
+)
+
+
+class ConnectionPool:
+    """
+    A bounded pool of connections for a single resource and database.
+
+    Idle connections are handed out LIFO so that the hottest connections are
+    reused and the coldest ones age out. Connections which have been idle for
+    longer than `validation_interval` are pinged before being handed out, and
+    connections which have been idle for longer than `idle_timeout` are closed
+    on acquire and release as long as the pool keeps at least `min_size`
+    connections.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Connection],
+        reset: Callable[[Connection], None],
+        ping: Callable[[Connection], bool],
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        validation_interval: float = POOL_VALIDATION_INTERVAL,
+    ):
+        self._connect: Callable[[], Connection] = connect
+        self._reset: Callable[[Connection], None] = reset
+        self._ping: Callable[[Connection], bool] = ping
+        self.min_size: int = min_size
+        self.max_size: int = max_size
+        self.timeout: float = timeout
+        self.idle_timeout: float = idle_timeout
+        self.validation_interval: float = validation_interval
+        self._idle: Deque[Tuple[Connection, float]] = deque()
+        self._size: int = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._size - len(self._idle)
+
+    def acquire(self) -> Connection:
+        deadline: float = time.monotonic() + self.timeout
+        while True:
+            connection, last_used = self._checkout(deadline)
+            if connection is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._forget()
+                    raise
+            recently_used: bool = (
+                time.monotonic() - last_used < self.validation_interval
+            )
+            if recently_used or self._ping(connection):
+                return connection
+            self.discard(connection)
+
+    def release(self, connection: Connection) -> None:
+        try:
+            self._reset(connection)
+        except Exception:
+            self.discard(connection)
+            return
+        with self._condition:
+            # evict here too, so that a pool shrinks once the load goes down
+            expired: List[Connection] = self._evict_idle()
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+        for expired_connection in expired:
+            self._close(expired_connection)
+
+    def discard(self, connection: Connection) -> None:
+        self._close(connection)
+        self._forget()
+
+    def close(self) -> None:
+        with self._condition:
+            connections: List[Connection] = [c for c, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(connections)
+            self._condition.notify_all()
+        for connection in connections:
+            self._close(connection)
+
+    def _checkout(self, deadline: float) -> Tuple[Optional[Connection], float]:
+        expired: List[Connection] = []
+        try:
+            with self._condition:
+                while True:
+                    expired.extend(self._evict_idle())
+                    if self._idle:
+                        return self._idle.pop()
+                    if self._size < self.max_size:
+                        self._size += 1
+                        return None, 0.0
+                    remaining: float = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ServiceUnavailableError(
+                            f'Timeout waiting for a connection: '
+                            f'all {self.max_size} connections are in use'
+                        )
+                    self._condition.wait(remaining)
+        finally:
+            for connection in expired:
+                self._close(connection)
+
+    def _evict_idle(self) -> List[Connection]:
+        expired: List[Connection] = []
+        now: float = time.monotonic()
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] > self.idle_timeout
+        ):
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        return expired
+
+    def _forget(self) -> None:
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _close(connection: Connection) -> None:
+        try:
+            connection.close()
+        except Exception:  # pragma: no cover
+            pass
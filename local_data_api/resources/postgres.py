@@ -3,14 +3,27 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import psycopg2
+import psycopg2.extras
 from psycopg2._psycopg import Column
 from sqlalchemy.dialects import postgresql
 
-from local_data_api.models import ColumnMetadata, Field
+from local_data_api.metrics import measure
+from local_data_api.models import ColumnMetadata, Field, UpdateResult
+from local_data_api.resources.query import (
+    WRITE_IDENTIFIERS,
+    ParsedQuery,
+    get_identifiers,
+    get_statement_keyword,
+)
 from local_data_api.resources.resource import Resource, register_resource_type
 
 if TYPE_CHECKING:  # pragma: no cover
-    from local_data_api.resources.resource import ConnectionMaker, Cursor
+    from local_data_api.resources.resource import Connection, ConnectionMaker, Cursor
+
+# the server-side cursor of a streamed statement, one at a time on a connection
+STREAM_CURSOR_NAME: str = 'local_data_api_stream'
+# parameter sets of a batch sent in one round trip
+BATCH_PAGE_SIZE: int = 100
 
 
 def create_column_metadata(field_descriptor_packet: Column) -> ColumnMetadata:
@@ -44,6 +57,13 @@ class PostgresSQL(Resource):
         return [create_column_metadata(f) for f in getattr(cursor, 'description')]
 
     DIALECT = postgresql.dialect(paramstyle='named')
+    PARAMSTYLE = 'pyformat'
+
+    @classmethod
+    def ping(cls, connection: Connection) -> bool:
+        if getattr(connection, 'closed'):
+            return False
+        return super().ping(connection)
 
     @classmethod
     def create_connection_maker(
@@ -73,5 +93,46 @@ class PostgresSQL(Resource):
 
         return connect
 
+    def create_stream_cursor(self, sql: str) -> Cursor:
+        # a named cursor is declared on the server, which sends rows as they are
+        # fetched. DECLARE takes queries only, and needs a transaction.
+        if (
+            getattr(self.connection, 'autocommit')
+            or get_statement_keyword(sql) not in ('SELECT', 'WITH', 'VALUES')
+            or get_identifiers(sql) & (WRITE_IDENTIFIERS | {'into'})
+        ):
+            return super().create_stream_cursor(sql)
+        return self.connection.cursor(name=STREAM_CURSOR_NAME)
+
+    def execute_cursor(
+        self, cursor: Cursor, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        super().execute_cursor(cursor, sql, params)
+        if getattr(cursor, 'name', None) == STREAM_CURSOR_NAME:
+            # a named cursor has no description until a FETCH, which takes no
+            # rows here
+            cursor.fetchmany(0)
+
+    def execute_batch_cursor(
+        self,
+        cursor: Cursor,
+        parsed_query: ParsedQuery,
+        sql: str,
+        parameter_sets: List[Dict[str, Any]],
+    ) -> List[UpdateResult]:
+        # no generatedFields are reported for PostgreSQL, so INSERTs are sent
+        # in pages of statements like any other statement
+        with measure('execute'):
+            psycopg2.extras.execute_batch(
+                cursor,
+                parsed_query.to_paramstyle(self.PARAMSTYLE),
+                [
+                    parsed_query.bind(parameters, self.PARAMSTYLE)
+                    for parameters in parameter_sets
+                ],
+                page_size=BATCH_PAGE_SIZE,
+            )
+        return []
+
     def get_field_from_value(self, value: Any) -> Field:
         return super().get_field_from_value(value)
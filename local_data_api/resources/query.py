@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from sqlalchemy.engine import Dialect
+from sqlalchemy.sql.compiler import BIND_PARAMS, BIND_PARAMS_ESC, SQLCompiler
+from sqlalchemy.sql.sqltypes import _resolve_value_to_type
+
+from local_data_api.exceptions import BadRequestException
+
+QUERY_CACHE_SIZE: int = int(os.environ.get('QUERY_CACHE_SIZE', '1024'))
+
+# DBAPI paramstyles and how a bind parameter is written in each of them
+PLACEHOLDERS: Dict[str, str] = {
+    'named': ':{}',
+    'pyformat': '%({})s',
+    'qmark': '?',
+    'format': '%s',
+}
+POSITIONAL_PARAMSTYLES: Tuple[str, ...] = ('qmark', 'format')
+# text outside of bind parameters which a paramstyle takes for a placeholder,
+# e.g. an escaped `\:name` or the `?` operators of jsonb
+PLACEHOLDER_TEXT: Dict[str, re.Pattern] = {
+    'named': re.compile(r':\w'),
+    'qmark': re.compile(r'\?'),
+}
+
+# statements which may generate auto increment keys
+INSERT_KEYWORDS: Tuple[str, ...] = ('INSERT', 'REPLACE')
+
+STATEMENT_KEYWORD: re.Pattern = re.compile(
+    r'(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/|\()*(\w+)', re.DOTALL
+)
+
+# quoted text and comments which a statement separator cannot appear in
+QUOTED_TOKENS: Dict[str, List[str]] = {
+    'mysql': [
+        r"'(?:[^'\\]|\\.|'')*'",
+        r'"(?:[^"\\]|\\.|"")*"',
+        r'`(?:[^`]|``)*`',
+    ],
+    'postgresql': [
+        r"[eE]'(?:[^'\\]|\\.|'')*'",
+        r"'(?:[^']|'')*'",
+        r'"(?:[^"]|"")*"',
+        r'\$(?P<tag>[A-Za-z_]\w*|)\$.*?\$(?P=tag)\$',
+    ],
+}
+DEFAULT_QUOTED_TOKENS: List[str] = [r"'(?:[^']|'')*'", r'"(?:[^"]|"")*"']
+COMMENT_TOKENS: List[str] = [r'--[^\n]*', r'/\*.*?\*/']
+
+# statements which change no tables
+READ_ONLY_KEYWORDS: Tuple[str, ...] = (
+    'SELECT',
+    'WITH',
+    'SHOW',
+    'EXPLAIN',
+    'DESCRIBE',
+    'DESC',
+    'VALUES',
+    'SET',
+    'USE',
+    'BEGIN',
+    'START',
+    'COMMIT',
+    'ROLLBACK',
+    'SAVEPOINT',
+    'RELEASE',
+)
+# a SELECT or WITH with one of them may change rows, e.g. a data-modifying CTE
+WRITE_IDENTIFIERS: FrozenSet[str] = frozenset(['insert', 'update', 'delete', 'merge'])
+# functions whose results change between calls with the same arguments
+VOLATILE_IDENTIFIERS: FrozenSet[str] = frozenset(
+    [
+        'now',
+        'sysdate',
+        'curdate',
+        'curtime',
+        'current_date',
+        'current_time',
+        'current_timestamp',
+        'localtime',
+        'localtimestamp',
+        'utc_date',
+        'utc_time',
+        'utc_timestamp',
+        'unix_timestamp',
+        'clock_timestamp',
+        'statement_timestamp',
+        'timeofday',
+        'rand',
+        'random',
+        'uuid',
+        'uuid_short',
+        'gen_random_uuid',
+        'nextval',
+        'currval',
+        'lastval',
+        'last_insert_id',
+        'last_insert_rowid',
+        'found_rows',
+        'row_count',
+        'changes',
+        'sleep',
+        'pg_sleep',
+    ]
+)
+
+IDENTIFIER: re.Pattern = re.compile(r'[A-Za-z_]\w*')
+TABLE_NAME: str = r'((?:[`"\[]?[\w$]+[`"\]]?\.)*[`"\[]?[\w$]+[`"\]]?)(?![\w$`"\].])'
+TABLE_MODIFIERS: str = (
+    r'(?:(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|QUICK|IGNORE|ONLY|OR\s+\w+)\s+)*'
+)
+# the target of a statement changing a single table, when it can be told
+WRITTEN_TABLE: re.Pattern = re.compile(
+    r'^\s*(?:'
+    rf'INSERT\s+{TABLE_MODIFIERS}INTO\s+{TABLE_NAME}'
+    rf'|REPLACE\s+{TABLE_MODIFIERS}INTO\s+{TABLE_NAME}'
+    rf'|UPDATE\s+{TABLE_MODIFIERS}{TABLE_NAME}(?!\s*,)'
+    rf'|DELETE\s+{TABLE_MODIFIERS}FROM\s+{TABLE_MODIFIERS}{TABLE_NAME}(?!\s*,)'
+    rf'|TRUNCATE\s+(?:TABLE\s+)?{TABLE_MODIFIERS}{TABLE_NAME}(?!\s*,)'
+    rf'|(?:CREATE|DROP|ALTER)\s+(?:(?:GLOBAL|LOCAL|TEMPORARY|TEMP|UNLOGGED)\s+)*TABLE'
+    rf'\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?{TABLE_NAME}(?!\s*,)'
+    r')',
+    re.IGNORECASE,
+)
+
+Parameters = Union[Dict[str, Any], List[Any]]
+
+
+def get_statement_keyword(sql: str) -> str:
+    """Return the first keyword of a statement skipping comments and brackets"""
+    match = STATEMENT_KEYWORD.match(sql)
+    return match.group(1).upper() if match else ''
+
+
+def get_identifiers(sql: str) -> FrozenSet[str]:
+    """
+    Return every word of a statement in lower case, a superset of the tables
+    which it reads
+    """
+    return frozenset(identifier.lower() for identifier in IDENTIFIER.findall(sql))
+
+
+def normalize_table_name(name: str) -> str:
+    return name.split('.')[-1].strip('`"[]').lower()
+
+
+def is_cacheable_query(sql: str) -> bool:
+    """Whether the result of a query only changes when a table it reads changes"""
+    if get_statement_keyword(sql) not in ('SELECT', 'WITH'):
+        return False
+    return not get_identifiers(sql) & (WRITE_IDENTIFIERS | VOLATILE_IDENTIFIERS)
+
+
+def get_written_tables(sql: str) -> Optional[FrozenSet[str]]:
+    """
+    Return the tables a statement may change, which is None when they are
+    unknown, e.g. with a multiple-table UPDATE
+    """
+    keyword: str = get_statement_keyword(sql)
+    identifiers: FrozenSet[str] = get_identifiers(sql)
+    if keyword in READ_ONLY_KEYWORDS and not identifiers & WRITE_IDENTIFIERS:
+        return frozenset()
+    if keyword == 'UPDATE' and 'join' in identifiers:
+        return None
+    match = WRITTEN_TABLE.match(sql)
+    if not match:
+        return None
+    return frozenset(
+        normalize_table_name(name) for name in match.groups() if name is not None
+    )
+
+
+@lru_cache(maxsize=None)
+def get_statement_separator(dialect_name: str) -> re.Pattern:
+    quoted: List[str] = QUOTED_TOKENS.get(dialect_name, DEFAULT_QUOTED_TOKENS)
+    comments: List[str] = COMMENT_TOKENS
+    if dialect_name == 'mysql':
+        comments = [*comments, r'#[^\n]*']
+    return re.compile(
+        f"(?P<quoted>{'|'.join(quoted)})|{'|'.join(comments)}"
+        r'|(?P<separator>;)|(?P<code>\w+|\S)',
+        re.DOTALL,
+    )
+
+
+def split_statements(sql: str, dialect: Dialect) -> List[str]:
+    """
+    Split a script into statements on semicolons outside of quoted text and
+    comments of the dialect, leaving out statements without any code
+    """
+    statements: List[str] = []
+    start: int = 0
+    has_code: bool = False
+    for match in get_statement_separator(dialect.name).finditer(sql):
+        if match.group('separator'):
+            if has_code:
+                statements.append(sql[start : match.start()].strip())
+            start, has_code = match.end(), False
+        elif match.group('quoted') or match.group('code'):
+            has_code = True
+    if has_code:
+        statements.append(sql[start:].strip())
+    return statements
+
+
+@lru_cache(maxsize=None)
+def get_literal_compiler(dialect: Dialect) -> SQLCompiler:
+    return dialect.statement_compiler(dialect, None)
+
+
+def render_literal(value: Any, dialect: Dialect) -> str:
+    if value is None:
+        return 'NULL'
+    return str(
+        get_literal_compiler(dialect).render_literal_value(
+            value, _resolve_value_to_type(value)
+        )
+    )
+
+
+class ParsedQuery:
+    """
+    SQL text split around its bind parameters.
+
+    It mirrors how SQLAlchemy compiles a `text()` construct, so rendering a
+    parsed query gives the same result as compiling it with `literal_binds`.
+    """
+
+    def __init__(self, sql: str, dialect: Dialect):
+        self.keyword: str = get_statement_keyword(sql)
+        if dialect.identifier_preparer._double_percents:
+            sql = sql.replace('%', '%%')
+        self.fragments: List[str] = []
+        self.bind_names: List[str] = []
+        position: int = 0
+        for match in BIND_PARAMS.finditer(sql):
+            self.fragments.append(self._unescape(sql[position : match.start()]))
+            self.bind_names.append(match.group(1))
+            position = match.end()
+        self.fragments.append(self._unescape(sql[position:]))
+        self._statements: Dict[str, str] = {}
+
+    @staticmethod
+    def _unescape(fragment: str) -> str:
+        return str(BIND_PARAMS_ESC.sub(lambda m: m.group(1), fragment))
+
+    def render(self, params: Dict[str, Any], dialect: Dialect) -> str:
+        query: List[str] = [self.fragments[0]]
+        for name, fragment in zip(self.bind_names, self.fragments[1:]):
+            if name not in params:
+                raise BadRequestException(message=f'Cannot find parameter: {name}')
+            query.append(render_literal(params[name], dialect))
+            query.append(fragment)
+        return ''.join(query)
+
+    def supports_paramstyle(self, paramstyle: str) -> bool:
+        """
+        Whether the query can be sent with placeholders of a paramstyle, which
+        can't be told apart from the same text outside of its bind parameters
+        """
+        pattern: Optional[re.Pattern] = PLACEHOLDER_TEXT.get(paramstyle)
+        return pattern is None or not any(
+            pattern.search(fragment) for fragment in self.fragments
+        )
+
+    def to_paramstyle(self, paramstyle: str) -> str:
+        statement = self._statements.get(paramstyle)
+        if statement is None:
+            placeholder: str = PLACEHOLDERS[paramstyle]
+            fragments: List[str] = self.fragments
+            if paramstyle in ('pyformat', 'format'):
+                fragments = [f.replace('%', '%%') for f in fragments]
+            statement = fragments[0] + ''.join(
+                placeholder.format(name) + fragment
+                for name, fragment in zip(self.bind_names, fragments[1:])
+            )
+            self._statements[paramstyle] = statement
+        return statement
+
+    def bind(self, params: Dict[str, Any], paramstyle: str) -> Parameters:
+        for name in self.bind_names:
+            if name not in params:
+                raise BadRequestException(message=f'Cannot find parameter: {name}')
+        if paramstyle in POSITIONAL_PARAMSTYLES:
+            return [params[name] for name in self.bind_names]
+        return {name: params[name] for name in self.bind_names}
+
+
+class QueryCache:
+    """LRU cache of parsed queries keyed on dialect and SQL text"""
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._queries: OrderedDict[Tuple[str, str], ParsedQuery] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def get(self, dialect: Dialect, sql: str) -> ParsedQuery:
+        key: Tuple[str, str] = (dialect.name, sql)
+        with self._lock:
+            parsed_query = self._queries.get(key)
+            if parsed_query is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+                return parsed_query
+            self.misses += 1
+
+        parsed_query = ParsedQuery(sql, dialect)
+        if self.max_size > 0:
+            with self._lock:
+                self._queries[key] = parsed_query
+                while len(self._queries) > self.max_size:
+                    self._queries.popitem(last=False)
+        return parsed_query
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+QUERY_CACHE: QueryCache = QueryCache()
@@ -1,44 +1,152 @@
 from __future__ import annotations
 
+import json
+import os
 import random
-import re
 import string
+import threading
 from abc import ABC, abstractmethod
-from base64 import b64encode
-from dataclasses import dataclass
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
 from hashlib import sha1
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+from importlib import import_module
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from sqlalchemy import text
 from sqlalchemy.engine import Dialect
-from sqlalchemy.exc import ArgumentError, CompileError
-from sqlalchemy.sql.elements import TextClause
-from sqlalchemy.sql.expression import null
 
 from local_data_api.exceptions import BadRequestException, InternalServerErrorException
-from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
-from local_data_api.secret_manager import Secret, get_secret
-
-INVALID_PARAMETER_MESSAGE: str = (
-    r"Bind parameter '([^\']+)' without a renderable value not allowed here."
+from local_data_api.metrics import Gauge, Labels, measure
+from local_data_api.models import (
+    ColumnMetadata,
+    ExecuteStatementResponse,
+    Field,
+    RecordsFormatType,
+    UpdateResult,
 )
-UNDEFINED_PARAMETER_MESSAGE: str = (
-    r"This text\(\) construct doesn't define a bound parameter named '([^\']+)'"
+from local_data_api.resources.encoder import (
+    RecordEncoder,
+    RecordFormatter,
+    create_column_encoder,
+    create_json_column_encoder,
+    create_record_encoder,
+    create_record_formatter,
+    encode_sql_value,
+    encode_value,
+    format_datetime,
+)
+from local_data_api.resources.pool import POOL_MAX_SIZE, ConnectionPool
+from local_data_api.resources.query import (
+    INSERT_KEYWORDS,
+    QUERY_CACHE,
+    ParsedQuery,
+    split_statements,
+)
+from local_data_api.resources.transaction import TransactionRegistry
+from local_data_api.secret_manager import Secret, get_secret
+from local_data_api.worker import get_worker_tag
+
+# 'literal' renders parameters into the SQL text, 'native' binds them in the driver
+# unless the text has something else the driver would take for a placeholder
+PARAMETER_BINDING: str = os.environ.get('PARAMETER_BINDING', 'literal')
+
+# threads running blocking driver calls for each resource
+EXECUTOR_MAX_WORKERS: int = int(os.environ.get('EXECUTOR_MAX_WORKERS', POOL_MAX_SIZE))
+# threads fetching the chunks of streamed responses for each resource. Streams
+# hold their connections between chunks, so their fetches must not wait behind
+# requests waiting for a connection. A thread for each pooled connection.
+STREAM_EXECUTOR_MAX_WORKERS: int = POOL_MAX_SIZE
+
+# rows fetched per round trip when streaming records, 0 disables streaming
+STREAMING_FETCH_SIZE: int = int(os.environ.get('STREAMING_FETCH_SIZE', '0'))
+
+# bytes of the records of a response over which a statement fails like it does on
+# the Data API, 0 disables the limit. It applies to the whole Arrow stream of an
+# Arrow result. Streamed responses are not limited, as their status is sent
+# before the records are fetched.
+MAX_RESULT_SIZE: int = int(os.environ.get('MAX_RESULT_SIZE', str(1024 * 1024)))
+# rows fetched per round trip while the size of a result is limited
+RESULT_FETCH_SIZE: int = 1000
+RESULT_SIZE_EXCEEDED: str = (
+    'Database returned more than the allowed response size limit'
 )
 
+# run on a new connection by warm_up_resource()
+WARM_UP_QUERY: str = os.environ.get('WARM_UP_QUERY', 'SELECT 1')
+
 TRANSACTION_ID_CHARACTERS: str = string.ascii_letters + '/=+'
 TRANSACTION_ID_LENGTH: int = 184
 
 RESOURCE_CLASS: Dict[str, Type[Resource]] = {}
 
+# modules registering the engines, imported on the first lookup of an engine
+# so that only the drivers of the engines in use are loaded
+RESOURCE_MODULES: Dict[str, str] = {
+    'MySQL': 'local_data_api.resources.mysql',
+    'PostgresSQL': 'local_data_api.resources.postgres',
+    'SQLite': 'local_data_api.resources.sqlite',
+    'MySQLJDBC': 'local_data_api.resources.jdbc.mysql',
+    'PostgreSQLJDBC': 'local_data_api.resources.jdbc.postgres',
+}
+
 RESOURCE_METAS: Dict[str, ResourceMeta] = {}
 
-CONNECTION_POOL: Dict[str, Connection] = {}
+CONNECTION_POOL: TransactionRegistry = TransactionRegistry()
+
+EXECUTOR_LOCK: threading.Lock = threading.Lock()
+
+
+def collect_transactions() -> List[Tuple[Labels, float]]:
+    in_use: int = CONNECTION_POOL.in_use
+    return [(('idle',), len(CONNECTION_POOL) - in_use), (('in_use',), in_use)]
+
+
+def collect_pool_connections() -> List[Tuple[Labels, float]]:
+    samples: List[Tuple[Labels, float]] = []
+    for resource_arn, meta in list(RESOURCE_METAS.items()):
+        for database, pool in list(meta.pools.items()):
+            samples.append(((resource_arn, database or '', 'idle'), pool.idle))
+            samples.append(((resource_arn, database or '', 'in_use'), pool.in_use))
+    return samples
+
+
+OPEN_TRANSACTIONS: Gauge = Gauge(
+    'local_data_api_open_transactions',
+    'Open transactions by whether a request holds them',
+    ['state'],
+    collect_transactions,
+)
+EXPIRED_TRANSACTIONS: Gauge = Gauge(
+    'local_data_api_expired_transactions',
+    'Transactions rolled back after being idle for too long',
+    [],
+    lambda: [((), CONNECTION_POOL.expired)],
+)
+POOL_CONNECTIONS: Gauge = Gauge(
+    'local_data_api_pool_connections',
+    'Pooled connections by resource, database and whether a request holds them',
+    ['resource', 'database', 'state'],
+    collect_pool_connections,
+)
 
 # DBAPI's Types
+RowFetcher = Callable[[Optional[int]], Sequence[Sequence[Any]]]
+
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Callable
 
     connect = Callable
 
@@ -54,7 +162,7 @@ if TYPE_CHECKING:  # pragma: no cover
         def rollback(self) -> None:
             pass
 
-        def cursor(self) -> Cursor:
+        def cursor(self, *args: Any, **kwargs: Any) -> Cursor:
             return Cursor()
 
         @property
@@ -68,13 +176,62 @@ if TYPE_CHECKING:  # pragma: no cover
         def setAutoCommit(self, flag: bool) -> None:
             pass
 
+        def getAutoCommit(self) -> bool:
+            pass
+
+        def rollback(self) -> None:
+            pass
+
+        def isValid(self, timeout: int) -> bool:
+            pass
+
         def setCatalog(self, catalog: str) -> None:
             pass
 
+        def createStatement(self) -> JStatement:
+            pass
+
+        def prepareStatement(self, sql: str, *args: Any) -> JStatement:
+            pass
+
+    class JStatement:
+        def setObject(self, index: int, value: Any) -> None:
+            pass
+
+        def setFetchSize(self, rows: int) -> None:
+            pass
+
+        def getResultSet(self) -> Any:
+            pass
+
+        def addBatch(self, *args: Any) -> None:
+            pass
+
+        def executeBatch(self) -> List[int]:
+            pass
+
+        def execute(self) -> bool:
+            pass
+
+        def getUpdateCount(self) -> int:
+            pass
+
+        def getGeneratedKeys(self) -> Any:
+            pass
+
+        def close(self) -> None:
+            pass
+
     class Cursor:
+        rowcount: int
+        lastrowid: int
+
         def execute(self, *args: Any, **kwargs: Any) -> Any:
             pass
 
+        def executemany(self, *args: Any, **kwargs: Any) -> Any:
+            pass
+
         def fetchone(self) -> Tuple:
             pass
 
@@ -94,14 +251,89 @@ if TYPE_CHECKING:  # pragma: no cover
     ConnectionMaker = Callable[[Optional[str]], Connection]
 
 
-def set_connection(transaction_id: str, connection: Connection) -> None:
-    CONNECTION_POOL[transaction_id] = connection
+def dump_json(value: Any) -> str:
+    """Serialize a value the same way as Starlette's JSONResponse"""
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')
+    )
+
+
+class DumpedRecords:
+    """
+    The JSON of records, which a response embeds as it is. Only the JSON is
+    kept, so a result is not held twice in memory.
+    """
+
+    def __init__(self, dumped: str):
+        self.dumped: str = dumped
+
+    def load(self) -> List[Any]:
+        records: List[Any] = json.loads(self.dumped)
+        return records
+
+
+def load_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the DumpedRecords of a response, to build its model"""
+    return {
+        key: value.load() if isinstance(value, DumpedRecords) else value
+        for key, value in response.items()
+    }
+
+
+def dump_response(response: Dict[str, Any]) -> str:
+    """Serialize a response like dump_json(), reusing the JSON of DumpedRecords"""
+    return (
+        '{'
+        + ','.join(
+            dump_json(key)
+            + ':'
+            + (value.dumped if isinstance(value, DumpedRecords) else dump_json(value))
+            for key, value in response.items()
+        )
+        + '}'
+    )
+
+
+def dump_column_metadata_set(
+    column_metadata_set: List[ColumnMetadata],
+) -> List[Dict[str, Any]]:
+    return [
+        column_metadata.dict(by_alias=True, exclude_unset=True)
+        for column_metadata in column_metadata_set
+    ]
+
+
+def check_result_size(size: int, max_result_size: int) -> None:
+    if max_result_size and size > max_result_size:
+        raise BadRequestException(RESULT_SIZE_EXCEEDED)
+
+
+def set_connection(
+    transaction_id: str,
+    connection: Connection,
+    pool: Optional[ConnectionPool] = None,
+) -> None:
+    CONNECTION_POOL.add(transaction_id, connection, pool)
 
 
 def delete_connection(transaction_id: str) -> None:
     del CONNECTION_POOL[transaction_id]
 
 
+def release_connection(transaction_id: str) -> None:
+    CONNECTION_POOL.release(transaction_id)
+
+
+def add_transaction_tables(
+    transaction_id: str, tables: Optional[FrozenSet[str]]
+) -> None:
+    CONNECTION_POOL.add_written_tables(transaction_id, tables)
+
+
+def get_transaction_tables(transaction_id: str) -> Optional[FrozenSet[str]]:
+    return CONNECTION_POOL.get_written_tables(transaction_id)
+
+
 @dataclass
 class ResourceMeta:
     resource_type: Type[Resource]
@@ -111,6 +343,11 @@ class ResourceMeta:
     user_name: Optional[str] = None
     password: Optional[str] = None
     database: Optional[str] = None
+    pools: Dict[Optional[str], ConnectionPool] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    executor: Optional[Executor] = field(default=None, repr=False, compare=False)
+    stream_executor: Optional[Executor] = field(default=None, repr=False, compare=False)
 
 
 def register_resource_type(resource: Type[Resource]) -> Type[Resource]:
@@ -119,6 +356,8 @@ def register_resource_type(resource: Type[Resource]) -> Type[Resource]:
 
 
 def get_resource_class(engine_name: str) -> Type[Resource]:
+    if engine_name not in RESOURCE_CLASS and engine_name in RESOURCE_MODULES:
+        import_module(RESOURCE_MODULES[engine_name])
     try:
         return RESOURCE_CLASS[engine_name]
     except KeyError:
@@ -181,10 +420,71 @@ def create_connection(
     return connection
 
 
+def get_connection_pool(
+    resource_arn: str, database: Optional[str] = None
+) -> ConnectionPool:
+    meta: ResourceMeta = RESOURCE_METAS[resource_arn]
+    pool: Optional[ConnectionPool] = meta.pools.get(database)
+    if pool is None:
+        pool = meta.pools.setdefault(
+            database,
+            ConnectionPool(
+                lambda: create_connection(resource_arn, database),
+                meta.resource_type.reset_connection,
+                meta.resource_type.ping,
+            ),
+        )
+    return pool
+
+
+def get_executor(resource_arn: str, stream: bool = False) -> Optional[Executor]:
+    """
+    Return the executor which runs blocking calls for a resource, or the one
+    fetching the chunks of its streams for `stream`.
+    None means the event loop's default executor for unknown resources.
+    """
+    meta: Optional[ResourceMeta] = RESOURCE_METAS.get(resource_arn)
+    if meta is None:
+        return None
+    if stream:
+        if meta.stream_executor is None:
+            with EXECUTOR_LOCK:
+                if meta.stream_executor is None:
+                    meta.stream_executor = ThreadPoolExecutor(
+                        max_workers=STREAM_EXECUTOR_MAX_WORKERS,
+                        thread_name_prefix='local-data-api-stream',
+                    )
+        return meta.stream_executor
+    if meta.executor is None:
+        with EXECUTOR_LOCK:
+            if meta.executor is None:
+                meta.executor = ThreadPoolExecutor(
+                    max_workers=EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix='local-data-api',
+                )
+    return meta.executor
+
+
+def warm_up_resource(resource_arn: str, database: Optional[str] = None) -> None:
+    """
+    Open a pooled connection and run a probe query through it, so that the
+    driver is loaded and the connection is ready before the first request
+    """
+    pool: ConnectionPool = get_connection_pool(resource_arn, database)
+    resource: Resource = RESOURCE_METAS[resource_arn].resource_type(
+        pool.acquire(), pool=pool
+    )
+    try:
+        resource.execute_as_dict(WARM_UP_QUERY)
+    finally:
+        resource.release()
+
+
 def get_connection(transaction_id: str) -> Connection:
-    if transaction_id in CONNECTION_POOL:
-        return CONNECTION_POOL[transaction_id]
-    raise BadRequestException('Invalid transaction ID')
+    try:
+        return CONNECTION_POOL.acquire(transaction_id)
+    except KeyError:
+        raise BadRequestException('Invalid transaction ID')
 
 
 def get_resource(
@@ -193,28 +493,34 @@ def get_resource(
     transaction_id: Optional[str] = None,
     database: Optional[str] = None,
 ) -> Resource:
-    if resource_arn not in RESOURCE_METAS:
-        if transaction_id in CONNECTION_POOL:
-            raise InternalServerErrorException
-        raise BadRequestException(f'HttpEndPoint is not enabled for {resource_arn}')
+    with measure('lookup'):
+        if resource_arn not in RESOURCE_METAS:
+            if transaction_id in CONNECTION_POOL:
+                raise InternalServerErrorException
+            raise BadRequestException(f'HttpEndPoint is not enabled for {resource_arn}')
 
-    try:
-        secret: Secret = get_secret(secret_arn)
-    except BadRequestException:
-        if transaction_id in CONNECTION_POOL:
-            raise InternalServerErrorException
-        raise
+        try:
+            secret: Secret = get_secret(secret_arn)
+        except BadRequestException:
+            if transaction_id in CONNECTION_POOL:
+                raise InternalServerErrorException
+            raise
 
-    meta: ResourceMeta = RESOURCE_METAS[resource_arn]
+        meta: ResourceMeta = RESOURCE_METAS[resource_arn]
 
-    # TODO: support multiple secret_arn for a resource
-    if secret.user_name != meta.user_name or secret.password != meta.password:
-        raise BadRequestException('Invalid secret_arn')
+        # TODO: support multiple secret_arn for a resource
+        if secret.user_name != meta.user_name or secret.password != meta.password:
+            raise BadRequestException('Invalid secret_arn')
 
+    pool: Optional[ConnectionPool] = None
     if transaction_id is None:
-        connection: Connection = create_connection(resource_arn, database)
+        pool = get_connection_pool(resource_arn, database)
+        with measure('acquire'):
+            connection: Connection = pool.acquire()
     else:
-        connection = get_connection(transaction_id)
+        with measure('acquire'):
+            connection = get_connection(transaction_id)
+        pool = CONNECTION_POOL.get_pool(transaction_id)
         if database:
             try:
                 connected_database: Optional[str] = connection.database
@@ -223,11 +529,12 @@ def get_resource(
                     'dbname'
                 ]
             if database != connected_database:  # pragma: no cover
+                release_connection(transaction_id)
                 raise BadRequestException(
                     'Database name is not the same as when transaction was created'
                 )
 
-    return meta.resource_type(connection, transaction_id)
+    return meta.resource_type(connection, transaction_id, pool)
 
 
 class JDBCType(Enum):
@@ -274,36 +581,40 @@ class JDBCType(Enum):
 
 class Resource(ABC):
     DIALECT: Dialect
+    PARAMSTYLE: str = 'named'
+    NATIVE_BINDING: bool = PARAMETER_BINDING == 'native'
 
-    def __init__(self, connection: Connection, transaction_id: Optional[str] = None):
+    def __init__(
+        self,
+        connection: Connection,
+        transaction_id: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
         self._connection: Connection = connection
         self._transaction_id: Optional[str] = transaction_id
+        self._pool: Optional[ConnectionPool] = pool
 
     @classmethod
     def create_query(cls, sql: str, params: Dict[str, Any]) -> str:
-        text_sql: TextClause = text(sql)
-        kwargs = {'dialect': cls.DIALECT, 'compile_kwargs': {"literal_binds": True}}
-        try:
-            return str(
-                text_sql.bindparams(
-                    **{k: null() if v is None else v for k, v in params.items()}
-                ).compile(**kwargs)
-            )
-        except CompileError as e:
-            invalid_param_match = re.match(INVALID_PARAMETER_MESSAGE, e.args[0])
-            if invalid_param_match:  # pragma: no cover
-                raise BadRequestException(
-                    message=f'Cannot find parameter: {invalid_param_match.group(1)}'
-                )
-            raise  # pragma: no cover
-        except ArgumentError as e:
-            undefined_param_match = re.match(UNDEFINED_PARAMETER_MESSAGE, e.args[0])
-            if undefined_param_match:  # pragma: no cover
-                undefined_param: str = undefined_param_match.group(1)
-                return cls.create_query(
-                    sql, {k: v for k, v in params.items() if k != undefined_param}
+        return QUERY_CACHE.get(cls.DIALECT, sql).render(params, cls.DIALECT)
+
+    @classmethod
+    def create_statement(cls, sql: str, params: Dict[str, Any]) -> Tuple[Any, ...]:
+        """
+        Build the arguments of `Cursor.execute()` for a statement, whose values
+        are rendered as literals unless they are bound natively and the text of
+        the statement has nothing taken for a placeholder of PARAMSTYLE
+        """
+        if cls.NATIVE_BINDING:
+            parsed_query: ParsedQuery = QUERY_CACHE.get(cls.DIALECT, sql)
+            if parsed_query.bind_names and parsed_query.supports_paramstyle(
+                cls.PARAMSTYLE
+            ):
+                return (
+                    parsed_query.to_paramstyle(cls.PARAMSTYLE),
+                    parsed_query.bind(params, cls.PARAMSTYLE),
                 )
-            raise  # pragma: no cover
+        return (cls.create_query(sql, params),)
 
     @classmethod
     @abstractmethod
@@ -317,6 +628,22 @@ class Resource(ABC):
     ) -> ConnectionMaker:
         raise NotImplementedError
 
+    @classmethod
+    def reset_connection(cls, connection: Connection) -> None:
+        connection.rollback()
+
+    @classmethod
+    def ping(cls, connection: Connection) -> bool:
+        try:
+            cursor: Cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
     @property
     def connection(self) -> Connection:
         return self._connection
@@ -327,42 +654,41 @@ class Resource(ABC):
 
     @staticmethod
     def create_transaction_id() -> str:
-        return ''.join(
+        # the worker tag routes requests of the transaction to this process
+        worker_tag: str = get_worker_tag()
+        return worker_tag + ''.join(
             random.choice(TRANSACTION_ID_CHARACTERS)
-            for _ in range(TRANSACTION_ID_LENGTH)
+            for _ in range(TRANSACTION_ID_LENGTH - len(worker_tag))
         )
 
     @classmethod
     def _format_datetime(cls, value: Any) -> str:
-        return re.match(r'^[^.]+(\.\d{3}|$)', str(value)).group()  # type: ignore
+        return format_datetime(value)
 
     @abstractmethod
     def get_field_from_value(self, value: Any) -> Field:
-        if isinstance(value, bool):
-            return Field(booleanValue=value)
-        elif isinstance(value, str):
-            return Field(stringValue=value)
-        elif type(value).__name__ == 'datetime':
-            return Field(stringValue=self._format_datetime(value))
-        elif isinstance(value, int):
-            return Field(longValue=value)
-        elif isinstance(value, float):
-            return Field(doubleValue=value)
-        elif isinstance(value, bytes):
-            return Field(blobValue=b64encode(value))
-        elif value is None:
-            return Field(isNull=True)
-        else:
-            raise Exception(f'unsupported type {type(value)}: {value} ')
+        return Field(**encode_value(value))
 
     @abstractmethod
     def create_column_metadata_set(self, cursor: Cursor) -> List[ColumnMetadata]:
         raise NotImplementedError
 
     def close(self) -> None:
-        self.connection.close()
-        if self.transaction_id in CONNECTION_POOL:
+        if self.transaction_id and self.transaction_id in CONNECTION_POOL:
             delete_connection(self.transaction_id)
+        if self._pool:
+            # the pool rolls back anything left open by the transaction
+            self._pool.release(self.connection)
+            self._pool = None
+        else:
+            self.connection.close()
+
+    def release(self) -> None:
+        """Hand the connection back at the end of a request"""
+        if self.transaction_id:
+            release_connection(self.transaction_id)
+        else:
+            self.close()
 
     @abstractmethod
     def autocommit_off(self) -> None:
@@ -370,8 +696,9 @@ class Resource(ABC):
 
     def begin(self) -> str:
         transaction_id = self.create_transaction_id()
+        # the connection stays borrowed from the pool until the transaction ends
+        set_connection(transaction_id, self.connection, self._pool)
         self._transaction_id = transaction_id
-        set_connection(transaction_id, self.connection)
         self.autocommit_off()
         return transaction_id
 
@@ -381,55 +708,431 @@ class Resource(ABC):
     def rollback(self) -> None:
         self.connection.rollback()
 
+    def execute_cursor(
+        self, cursor: Cursor, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with measure('compile'):
+            statement: Tuple[Any, ...] = (
+                self.create_statement(sql, params) if params else (str(text(sql)),)
+            )
+        with measure('execute'):
+            cursor.execute(*statement)
+
+    def create_stream_cursor(self, sql: str) -> Cursor:
+        """Return a cursor of execute_stream(), which should not read all rows at once"""
+        return self.connection.cursor()
+
+    def create_row_fetcher(self, cursor: Cursor) -> RowFetcher:
+        """Return a function fetching up to `size` rows, all rows for None"""
+
+        def fetch(size: Optional[int]) -> Sequence[Sequence[Any]]:
+            if size is None:
+                return cursor.fetchall()
+            return cursor.fetchmany(size)
+
+        return fetch
+
+    def create_record_converter(
+        self, cursor: Cursor, include_result_metadata: bool = False
+    ) -> Tuple[RecordEncoder, Optional[List[ColumnMetadata]]]:
+        """Return an encoder of the rows of the cursor and the column metadata"""
+        encode_record: RecordEncoder = create_record_encoder(
+            [create_column_encoder() for _ in cursor.description]
+        )
+        if include_result_metadata:
+            return encode_record, self.create_column_metadata_set(cursor)
+        return encode_record, None
+
+    def create_record_formatter(self, cursor: Cursor) -> RecordFormatter:
+        """Return a formatter of the rows of the cursor for formattedRecords"""
+        return create_record_formatter(
+            [description[0] for description in cursor.description],
+            [create_json_column_encoder() for _ in cursor.description],
+        )
+
+    def last_generated_id(self, cursor: Cursor) -> int:
+        return cursor.lastrowid
+
+    def create_update_response(self, cursor: Cursor) -> Dict[str, Any]:
+        rowcount: int = cursor.rowcount
+        last_generated_id: int = self.last_generated_id(cursor)
+        generated_fields: List[Dict[str, Any]] = []
+        if last_generated_id > 0:
+            generated_fields.append(encode_value(last_generated_id))
+        return {'numberOfRecordsUpdated': rowcount, 'generatedFields': generated_fields}
+
     def execute(
         self,
         sql: str,
         params: Optional[Dict[str, Any]] = None,
         include_result_metadata: bool = False,
     ) -> ExecuteStatementResponse:
+        return ExecuteStatementResponse(
+            **load_response(self.execute_as_dict(sql, params, include_result_metadata))
+        )
 
+    def execute_as_dict(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        include_result_metadata: bool = False,
+        format_records_as: RecordsFormatType = RecordsFormatType.NONE,
+        max_result_size: int = MAX_RESULT_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Execute a statement and return the response as plain dicts, which are
+        serialized as they are without building and validating models.
+        """
         try:
             cursor: Optional[Cursor] = None
             try:
                 cursor = self.connection.cursor()
-                if params:
-                    cursor.execute(self.create_query(sql, params))
-                else:
-                    cursor.execute(str(text(sql)))
+                self.execute_cursor(cursor, sql, params)
 
+                if cursor.description and format_records_as == RecordsFormatType.JSON:
+                    return self.create_formatted_response(
+                        cursor, include_result_metadata, max_result_size
+                    )
                 if cursor.description:
-                    response: ExecuteStatementResponse = ExecuteStatementResponse(
-                        numberOfRecordsUpdated=0,
-                        records=[
-                            [self.get_field_from_value(column) for column in row]
-                            for row in cursor.fetchall()
-                        ],
+                    encode_record, column_metadata_set = self.create_record_converter(
+                        cursor, include_result_metadata
                     )
-                    if include_result_metadata:
-                        response.columnMetadata = self.create_column_metadata_set(
-                            cursor
+                    # the JSON measured for the limit is the one of the response
+                    chunks: List[str] = []
+                    size: int = 0
+                    for rows in self.fetch_batches(cursor, max_result_size):
+                        with measure('convert'):
+                            chunk: str = dump_json(
+                                [encode_record(row) for row in rows]
+                            )[1:-1]
+                            if max_result_size:
+                                size += len(chunk.encode())
+                        check_result_size(size, max_result_size)
+                        chunks.append(chunk)
+                    response: Dict[str, Any] = {
+                        'numberOfRecordsUpdated': 0,
+                        'records': DumpedRecords('[' + ','.join(chunks) + ']'),
+                    }
+                    if column_metadata_set is not None:
+                        response['columnMetadata'] = dump_column_metadata_set(
+                            column_metadata_set
                         )
                     return response
                 else:
-                    rowcount: int = cursor.rowcount
-                    last_generated_id: int = cursor.lastrowid
-                    generated_fields: List[Field] = []
-                    if last_generated_id > 0:
-                        generated_fields.append(
-                            self.get_field_from_value(last_generated_id)
-                        )
-                    return ExecuteStatementResponse(
-                        numberOfRecordsUpdated=rowcount,
-                        generatedFields=generated_fields,
-                    )
+                    return self.create_update_response(cursor)
+            finally:
+                if cursor:  # pragma: no cover
+                    cursor.close()
+
+        except Exception as e:
+            raise BadRequestException(self.get_error_message(e))
+
+    def fetch_batches(
+        self, cursor: Cursor, max_result_size: int = MAX_RESULT_SIZE
+    ) -> Generator[Sequence[Sequence[Any]], None, None]:
+        """
+        Yield the rows of the cursor, in batches of RESULT_FETCH_SIZE rows while
+        the size of the result is limited so that the rest of an oversized result
+        is never fetched, else all at once
+        """
+        fetch_rows: RowFetcher = self.create_row_fetcher(cursor)
+        fetch_size: Optional[int] = RESULT_FETCH_SIZE if max_result_size else None
+        while True:
+            with measure('fetch'):
+                rows: Sequence[Sequence[Any]] = fetch_rows(fetch_size)
+            if rows:
+                yield rows
+            if not rows or fetch_size is None:
+                return
+
+    def create_formatted_response(
+        self,
+        cursor: Cursor,
+        include_result_metadata: bool = False,
+        max_result_size: int = MAX_RESULT_SIZE,
+    ) -> Dict[str, Any]:
+        """Fetch the rows of the cursor as the JSON string of formattedRecords"""
+        format_record: RecordFormatter = self.create_record_formatter(cursor)
+        chunks: List[str] = []
+        size: int = 0
+        for rows in self.fetch_batches(cursor, max_result_size):
+            with measure('convert'):
+                chunk: str = dump_json([format_record(row) for row in rows])[1:-1]
+                if max_result_size:
+                    size += len(chunk.encode())
+            check_result_size(size, max_result_size)
+            chunks.append(chunk)
+        response: Dict[str, Any] = {
+            'numberOfRecordsUpdated': 0,
+            'formattedRecords': '[' + ','.join(chunks) + ']',
+        }
+        if include_result_metadata:
+            response['columnMetadata'] = dump_column_metadata_set(
+                self.create_column_metadata_set(cursor)
+            )
+        return response
+
+    def execute_arrow(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_result_size: int = MAX_RESULT_SIZE,
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Execute a statement and return its records as an Arrow IPC stream of
+        record batches of ARROW_BATCH_SIZE rows, each fetched and written in
+        turn, whose bytes are limited by `max_result_size`. Statements without a
+        result set return the same response as `execute_as_dict()`.
+        """
+        # pyarrow is loaded on the first Arrow result
+        from local_data_api.resources.arrow import (
+            ARROW_BATCH_SIZE,
+            ArrowStreamWriter,
+            require_pyarrow,
+        )
+
+        require_pyarrow()
+        try:
+            cursor: Optional[Cursor] = None
+            try:
+                cursor = self.connection.cursor()
+                self.execute_cursor(cursor, sql, params)
+
+                if not cursor.description:
+                    return self.create_update_response(cursor)
+                column_metadata_set: List[
+                    ColumnMetadata
+                ] = self.create_column_metadata_set(cursor)
+                fetch_rows: RowFetcher = self.create_row_fetcher(cursor)
+                writer: ArrowStreamWriter = ArrowStreamWriter(column_metadata_set)
+                while True:
+                    with measure('fetch'):
+                        rows: Sequence[Sequence[Any]] = fetch_rows(ARROW_BATCH_SIZE)
+                    if not rows:
+                        break
+                    with measure('convert'):
+                        size: int = writer.write(rows)
+                    check_result_size(size, max_result_size)
+                with measure('convert'):
+                    return writer.getvalue()
+            finally:
+                if cursor:  # pragma: no cover
+                    cursor.close()
+
+        except Exception as e:
+            raise BadRequestException(self.get_error_message(e))
+
+    def execute_sql(self, sql_statements: str) -> List[Dict[str, Any]]:
+        """
+        Execute a script of statements and return the result of each of them
+        as plain dicts of the ExecuteSql response
+        """
+        statements: List[str] = split_statements(sql_statements, self.DIALECT)
+        try:
+            cursor: Optional[Cursor] = None
+            try:
+                cursor = self.connection.cursor()
+                return self.execute_script(cursor, statements)
             finally:
                 if cursor:  # pragma: no cover
                     cursor.close()
 
         except Exception as e:
-            message: str = 'Unknown'
-            if hasattr(e, 'orig') and hasattr(e.orig, 'args'):  # type: ignore
-                message = str(e.orig.args[1])  # type: ignore
-            elif len(getattr(e, 'args', [])) and e.args[0]:
-                message = str(e.args[0])
-            raise BadRequestException(message)
+            raise BadRequestException(self.get_error_message(e))
+
+    def execute_script(
+        self, cursor: Cursor, statements: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Execute statements one by one, engines may send them in one go"""
+        results: List[Dict[str, Any]] = []
+        for statement in statements:
+            with measure('execute'):
+                cursor.execute(statement)
+            results.append(self.create_sql_statement_result(cursor))
+        return results
+
+    def create_sql_statement_result(self, cursor: Cursor) -> Dict[str, Any]:
+        if not cursor.description:
+            return {'numberOfRecordsUpdated': max(cursor.rowcount, 0)}
+        encode_record, column_metadata_set = self.create_record_converter(cursor, True)
+        with measure('fetch'):
+            rows = self.create_row_fetcher(cursor)(None)
+        with measure('convert'):
+            records: List[Dict[str, Any]] = [
+                {'values': [encode_sql_value(f) for f in encode_record(row)]}
+                for row in rows
+            ]
+        return {
+            'numberOfRecordsUpdated': 0,
+            'resultFrame': {
+                'records': records,
+                'resultSetMetadata': {
+                    'columnCount': len(cursor.description),
+                    'columnMetadata': dump_column_metadata_set(
+                        column_metadata_set or []
+                    ),
+                },
+            },
+        }
+
+    def execute_stream(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        include_result_metadata: bool = False,
+        fetch_size: int = STREAMING_FETCH_SIZE,
+        format_records_as: RecordsFormatType = RecordsFormatType.NONE,
+    ) -> Union[Dict[str, Any], Generator[str, None, None]]:
+        """
+        Execute a statement and return its records as chunks of the JSON response.
+
+        Statements without a result set return the same response as
+        `execute_as_dict()`. The chunks own the cursor, which is closed once they
+        are exhausted or closed after the first chunk has been read. The size of
+        the records is not limited by MAX_RESULT_SIZE.
+        """
+        cursor: Optional[Cursor] = None
+        try:
+            cursor = self.create_stream_cursor(sql)
+            self.execute_cursor(cursor, sql, params)
+
+            if not cursor.description:
+                return self.create_update_response(cursor)
+            formatted: bool = format_records_as == RecordsFormatType.JSON
+            encode_record: Union[RecordEncoder, RecordFormatter]
+            column_metadata_set: Optional[List[ColumnMetadata]]
+            if formatted:
+                encode_record = self.create_record_formatter(cursor)
+                column_metadata_set = (
+                    self.create_column_metadata_set(cursor)
+                    if include_result_metadata
+                    else None
+                )
+            else:
+                encode_record, column_metadata_set = self.create_record_converter(
+                    cursor, include_result_metadata
+                )
+            chunks: Generator[str, None, None] = self._stream_records(
+                cursor,
+                self.create_row_fetcher(cursor),
+                encode_record,
+                column_metadata_set,
+                fetch_size,
+                formatted,
+            )
+            cursor = None
+            return chunks
+        except Exception as e:
+            raise BadRequestException(self.get_error_message(e))
+        finally:
+            if cursor:
+                cursor.close()
+
+    @staticmethod
+    def _stream_records(
+        cursor: Cursor,
+        fetch_rows: RowFetcher,
+        encode_record: Union[RecordEncoder, RecordFormatter],
+        column_metadata_set: Optional[List[ColumnMetadata]],
+        fetch_size: int,
+        formatted: bool = False,
+    ) -> Generator[str, None, None]:
+        """
+        Yield chunks of records, or of the string of formattedRecords when
+        `formatted` as the escaping of JSON strings applies chunk by chunk.
+        """
+        try:
+            if formatted:
+                yield '{"numberOfRecordsUpdated":0,"formattedRecords":"['
+            else:
+                yield '{"numberOfRecordsUpdated":0,"records":['
+            separator: str = ''
+            while True:
+                with measure('fetch'):
+                    rows: Sequence[Sequence[Any]] = fetch_rows(fetch_size)
+                if not rows:
+                    break
+                with measure('convert'):
+                    chunk: str = separator + ','.join(
+                        dump_json(encode_record(row)) for row in rows
+                    )
+                    if formatted:
+                        chunk = dump_json(chunk)[1:-1]
+                yield chunk
+                separator = ','
+            end: str = ']"' if formatted else ']'
+            if column_metadata_set is None:
+                yield end + '}'
+            else:
+                yield end + ',"columnMetadata":' + dump_json(
+                    dump_column_metadata_set(column_metadata_set)
+                ) + '}'
+        finally:
+            cursor.close()
+
+    def batch_execute(
+        self, sql: str, parameter_sets: List[Dict[str, Any]]
+    ) -> List[UpdateResult]:
+        try:
+            cursor: Optional[Cursor] = None
+            try:
+                cursor = self.connection.cursor()
+                return self.execute_batch_cursor(
+                    cursor, QUERY_CACHE.get(self.DIALECT, sql), sql, parameter_sets
+                )
+            finally:
+                if cursor:  # pragma: no cover
+                    cursor.close()
+        except BadRequestException:
+            raise
+        except Exception as e:
+            raise BadRequestException(self.get_error_message(e))
+
+    def execute_batch_cursor(
+        self,
+        cursor: Cursor,
+        parsed_query: ParsedQuery,
+        sql: str,
+        parameter_sets: List[Dict[str, Any]],
+    ) -> List[UpdateResult]:
+        """Run a statement with each parameter set on one cursor"""
+        # executemany() can't report a generated id for each parameter set
+        if (
+            self.NATIVE_BINDING
+            and parsed_query.bind_names
+            and parsed_query.keyword not in INSERT_KEYWORDS
+            and parsed_query.supports_paramstyle(self.PARAMSTYLE)
+        ):
+            with measure('execute'):
+                cursor.executemany(
+                    parsed_query.to_paramstyle(self.PARAMSTYLE),
+                    [
+                        parsed_query.bind(parameters, self.PARAMSTYLE)
+                        for parameters in parameter_sets
+                    ],
+                )
+            return []
+
+        update_results: List[UpdateResult] = []
+        for parameters in parameter_sets:
+            self.execute_cursor(cursor, sql, parameters)
+            # sqlite3 keeps the id of the last INSERT on the connection
+            if parsed_query.keyword not in INSERT_KEYWORDS:
+                continue
+            generated_id: int = self.last_generated_id(cursor)
+            if generated_id > 0:
+                update_results.append(
+                    UpdateResult(
+                        generatedFields=[self.get_field_from_value(generated_id)]
+                    )
+                )
+        return update_results
+
+    @staticmethod
+    def get_error_message(e: Exception) -> str:
+        message: str = 'Unknown'
+        if hasattr(e, 'orig') and hasattr(e.orig, 'args'):  # type: ignore
+            message = str(e.orig.args[1])  # type: ignore
+        elif len(getattr(e, 'args', [])) and e.args[0]:
+            message = str(e.args[0])
+        return message
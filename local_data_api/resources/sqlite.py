@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import os
+import re
 import sqlite3
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.dialects import sqlite
 
@@ -9,7 +12,32 @@ from local_data_api.models import ColumnMetadata, Field
 from local_data_api.resources.resource import Resource, register_resource_type
 
 if TYPE_CHECKING:  # pragma: no cover
-    from local_data_api.resources.resource import ConnectionMaker, Cursor
+    from local_data_api.resources.resource import Connection, ConnectionMaker, Cursor
+
+# pragmas which engine_kwargs can set on every connection
+PRAGMAS: Tuple[str, ...] = (
+    'journal_mode',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'busy_timeout',
+)
+# WAL lets readers run alongside a writer, NORMAL is durable enough with WAL
+DEFAULT_PRAGMAS: Dict[str, Any] = {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+PRAGMA_VALUE: re.Pattern = re.compile(r'^-?\w+$')
+
+
+def create_pragma_statements(engine_kwargs: Dict[str, Any]) -> List[str]:
+    pragmas: Dict[str, Any] = {
+        **DEFAULT_PRAGMAS,
+        **{k: v for k, v in engine_kwargs.items() if k in PRAGMAS and v is not None},
+    }
+    statements: List[str] = []
+    for name, value in pragmas.items():
+        if not PRAGMA_VALUE.match(str(value)):
+            raise Exception(f'Invalid value of PRAGMA {name}: {value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
 
 
 @register_resource_type
@@ -19,9 +47,19 @@ class SQLite(Resource):
         pass
 
     def create_column_metadata_set(self, cursor: Cursor) -> List[ColumnMetadata]:
-        raise NotImplementedError
+        # sqlite3 only describes the names of columns
+        return [
+            ColumnMetadata(name=description[0], label=description[0])
+            for description in cursor.description
+        ]
 
     DIALECT = sqlite.dialect(paramstyle='named')
+    PARAMSTYLE = 'named'
+
+    @classmethod
+    def reset_connection(cls, connection: Connection) -> None:
+        if getattr(connection, 'in_transaction'):
+            connection.rollback()
 
     @classmethod
     def create_connection_maker(
@@ -32,9 +70,42 @@ class SQLite(Resource):
         password: Optional[str] = None,
         engine_kwargs: Dict[str, Any] = None,
     ) -> ConnectionMaker:
+        """
+        Connect to the `database` of engine_kwargs, which is a path, a `file:`
+        URI or `:memory:` for a private database of each connection. Without
+        it all connections share a database in a temporary file of the
+        resource, removed with the connection maker.
+
+        A `file:` URI with `mode=memory&cache=shared` shares an in-memory
+        database, whose tables are locked by a writing transaction: readers
+        fail with "database table is locked" instead of waiting on
+        busy_timeout.
+        """
+        engine_kwargs = engine_kwargs or {}
+        database: str = engine_kwargs.get('database') or ''
+        directory: Optional[tempfile.TemporaryDirectory[str]] = None
+        if not database:
+            # a file in WAL mode lets reads run alongside a writing transaction
+            directory = tempfile.TemporaryDirectory(prefix='local-data-api-')
+            database = os.path.join(directory.name, 'local.db')
+        pragma_statements: List[str] = create_pragma_statements(engine_kwargs)
+        keeper: Optional[sqlite3.Connection] = None
+
         def connect(_: Optional[str] = None):  # type: ignore
-            return sqlite3.connect(':memory:')
+            # pooled connections are handed over between worker threads
+            connection: sqlite3.Connection = sqlite3.connect(
+                database, check_same_thread=False, uri=database.startswith('file:')
+            )
+            for statement in pragma_statements:
+                connection.execute(statement)
+            return connection
 
+        if 'mode=memory' in database:
+            # a shared in-memory database lives as long as a connection to it,
+            # so the connection maker holds one besides the pooled connections
+            keeper = connect()
+        setattr(connect, 'keeper', keeper)
+        setattr(connect, 'directory', directory)
         return connect
 
     def get_field_from_value(self, value: Any) -> Field:
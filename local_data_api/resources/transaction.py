@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
+
+from local_data_api.exceptions import ServiceUnavailableError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from local_data_api.resources.pool import ConnectionPool
+    from local_data_api.resources.resource import Connection
+
+# Aurora rolls back transactions which are not used for three minutes
+TRANSACTION_TIMEOUT: float = float(os.environ.get('TRANSACTION_TIMEOUT', '180'))
+TRANSACTION_MAX_COUNT: int = int(os.environ.get('TRANSACTION_MAX_COUNT', '100'))
+TRANSACTION_REAP_INTERVAL: float = float(
+    os.environ.get('TRANSACTION_REAP_INTERVAL', '10')
+)
+# how long a request waits for another request holding the same transaction
+TRANSACTION_LOCK_TIMEOUT: float = float(
+    os.environ.get('TRANSACTION_LOCK_TIMEOUT', '30')
+)
+TRANSACTION_LOCK_STRIPES: int = int(os.environ.get('TRANSACTION_LOCK_STRIPES', '16'))
+
+
+@dataclass
+class Transaction:
+    connection: Connection
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: bool = False
+    # held by the request using the connection, which may release it on another thread
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # tables changed by statements of the transaction, None when unknown
+    written_tables: Optional[FrozenSet[str]] = frozenset()
+    # the pool which lent the connection and takes it back when the transaction ends
+    pool: Optional[ConnectionPool] = None
+
+
+class TransactionRegistry:
+    """
+    Connections of open transactions keyed on transaction id.
+
+    Requests on the same transaction are serialized by a lock of the
+    transaction, so they never interleave on its connection, while requests
+    on different transactions run in parallel. The map itself is split into
+    `stripes` which are locked independently.
+
+    A background reaper rolls back and closes transactions which have been
+    idle for longer than `timeout`, and no more than `max_count` transactions
+    can be open at a time. A transaction is idle while no request holds it,
+    so a long running statement is never rolled back under a request.
+    A `timeout` or `max_count` of 0 disables the limit.
+
+    A connection borrowed from a pool keeps counting against the pool while
+    its transaction is open, and goes back to the pool when it ends.
+    """
+
+    def __init__(
+        self,
+        timeout: float = TRANSACTION_TIMEOUT,
+        max_count: int = TRANSACTION_MAX_COUNT,
+        reap_interval: float = TRANSACTION_REAP_INTERVAL,
+        lock_timeout: float = TRANSACTION_LOCK_TIMEOUT,
+        stripes: int = TRANSACTION_LOCK_STRIPES,
+    ):
+        self.timeout: float = timeout
+        self.max_count: int = max_count
+        self.reap_interval: float = reap_interval
+        self.lock_timeout: float = lock_timeout
+        self.expired: int = 0
+        self._stripes: List[Tuple[threading.Lock, Dict[str, Transaction]]] = [
+            (threading.Lock(), {}) for _ in range(max(stripes, 1))
+        ]
+        # guards the count of transactions against max_count and the reaper
+        self._lock: threading.Lock = threading.Lock()
+        self._size: int = 0
+        self._reaper: Optional[threading.Thread] = None
+        self._stopped: threading.Event = threading.Event()
+
+    def _stripe(
+        self, transaction_id: str
+    ) -> Tuple[threading.Lock, Dict[str, Transaction]]:
+        return self._stripes[hash(transaction_id) % len(self._stripes)]
+
+    def __contains__(self, transaction_id: object) -> bool:
+        return isinstance(transaction_id, str) and (
+            transaction_id in self._stripe(transaction_id)[1]
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, transaction_id: str) -> Connection:
+        return self._stripe(transaction_id)[1][transaction_id].connection
+
+    def __setitem__(self, transaction_id: str, connection: Connection) -> None:
+        self.add(transaction_id, connection)
+
+    def __delitem__(self, transaction_id: str) -> None:
+        lock, transactions = self._stripe(transaction_id)
+        with lock:
+            transaction: Transaction = transactions.pop(transaction_id)
+            self._forget()
+        if transaction.in_use:
+            # wake up requests waiting for it, which find it gone
+            transaction.lock.release()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def in_use(self) -> int:
+        return sum(
+            1
+            for _, transactions in self._stripes
+            for t in list(transactions.values())
+            if t.in_use
+        )
+
+    def add(
+        self,
+        transaction_id: str,
+        connection: Connection,
+        pool: Optional[ConnectionPool] = None,
+    ) -> None:
+        with self._lock:
+            if self.max_count and self._size >= self.max_count:
+                raise ServiceUnavailableError(
+                    f'Too many open transactions: '
+                    f'the limit is {self.max_count} transactions'
+                )
+            self._size += 1
+        lock, transactions = self._stripe(transaction_id)
+        with lock:
+            transactions[transaction_id] = Transaction(connection, pool=pool)
+        self._start_reaper()
+
+    def acquire(self, transaction_id: str) -> Connection:
+        """
+        Return the connection of a transaction and hold it for a request,
+        waiting for a request which already holds it
+        """
+        lock, transactions = self._stripe(transaction_id)
+        transaction: Transaction = transactions[transaction_id]
+        if not transaction.lock.acquire(timeout=self.lock_timeout):
+            raise ServiceUnavailableError(
+                'Timeout waiting for another request on the transaction'
+            )
+        with lock:
+            if transactions.get(transaction_id) is not transaction:
+                transaction.lock.release()
+                raise KeyError(transaction_id)
+            transaction.in_use = True
+            transaction.last_used = time.monotonic()
+        return transaction.connection
+
+    def release(self, transaction_id: str) -> None:
+        lock, transactions = self._stripe(transaction_id)
+        with lock:
+            transaction: Optional[Transaction] = transactions.get(transaction_id)
+            if transaction is None or not transaction.in_use:
+                return
+            transaction.in_use = False
+            transaction.last_used = time.monotonic()
+        transaction.lock.release()
+
+    def get_pool(self, transaction_id: str) -> Optional[ConnectionPool]:
+        transaction: Optional[Transaction] = self._stripe(transaction_id)[1].get(
+            transaction_id
+        )
+        return transaction.pool if transaction else None
+
+    def add_written_tables(
+        self, transaction_id: str, tables: Optional[FrozenSet[str]]
+    ) -> None:
+        """Record tables changed by a request holding the transaction"""
+        transaction: Optional[Transaction] = self._stripe(transaction_id)[1].get(
+            transaction_id
+        )
+        if transaction is None:
+            return
+        if tables is None or transaction.written_tables is None:
+            transaction.written_tables = None
+        else:
+            transaction.written_tables |= tables
+
+    def get_written_tables(self, transaction_id: str) -> Optional[FrozenSet[str]]:
+        transaction: Optional[Transaction] = self._stripe(transaction_id)[1].get(
+            transaction_id
+        )
+        return transaction.written_tables if transaction else frozenset()
+
+    def reap(self) -> int:
+        """
+        Roll back idle transactions and close their connections or hand them
+        back to their pools, returning how many expired
+        """
+        if not self.timeout:
+            return 0
+        expired: List[Transaction] = []
+        deadline: float = time.monotonic() - self.timeout
+        for lock, transactions in self._stripes:
+            with lock:
+                for transaction_id, transaction in list(transactions.items()):
+                    if transaction.last_used < deadline and transaction.lock.acquire(
+                        blocking=False
+                    ):
+                        del transactions[transaction_id]
+                        self._forget()
+                        expired.append(transaction)
+                        transaction.lock.release()
+        with self._lock:
+            self.expired += len(expired)
+        for transaction in expired:
+            if transaction.pool:
+                transaction.pool.release(transaction.connection)
+            else:
+                self._close(transaction.connection)
+        return len(expired)
+
+    def clear(self) -> None:
+        for lock, transactions in self._stripes:
+            with lock:
+                transactions.clear()
+        with self._lock:
+            self._size = 0
+            self.expired = 0
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _forget(self) -> None:
+        with self._lock:
+            self._size -= 1
+
+    def _start_reaper(self) -> None:
+        if self._reaper is not None or not self.timeout or self.reap_interval <= 0:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(
+                    target=self._run_reaper,
+                    name='local-data-api-transaction-reaper',
+                    daemon=True,
+                )
+                self._reaper.start()
+
+    def _run_reaper(self) -> None:
+        while not self._stopped.wait(self.reap_interval):
+            self.reap()
+
+    @staticmethod
+    def _close(connection: Connection) -> None:
+        try:
+            connection.rollback()
+        except Exception:  # pragma: no cover
+            pass
+        try:
+            connection.close()
+        except Exception:  # pragma: no cover
+            pass
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 
-from local_data_api.resources.resource import register_resource
+from local_data_api.resources.resource import register_resource, warm_up_resource
 from local_data_api.secret_manager import register_secret
 
 RESOURCE_ARN: str = os.environ.get(
@@ -14,11 +14,13 @@ RESOURCE_ARN: str = os.environ.get(
 SECRET_ARN: str = os.environ.get(
     'SECRET_ARN', 'arn:aws:secretsmanager:us-east-1:123456789012:secret:dummy'
 )
+# connect to the database on startup instead of on the first request
+WARM_UP: bool = os.environ.get('WARM_UP', '0') == '1'
 
 
 class DBSetting(BaseModel):
-    HOST: str
-    PORT: int
+    HOST: Optional[str]
+    PORT: Optional[int]
     USER: str
     PASSWORD: str
     JAR_PATH: Optional[str]
@@ -54,9 +56,27 @@ def setup() -> None:
             USER=os.environ.get('POSTGRES_USER', 'postgres'),
             PASSWORD=os.environ.get('POSTGRES_PASSWORD', 'example'),
         )
+    elif engine == 'SQLite':
+        db_setting = DBSetting(
+            USER=os.environ.get('SQLITE_USER', 'root'),
+            PASSWORD=os.environ.get('SQLITE_PASSWORD', 'example'),
+        )
     else:
         raise NotImplementedError("Engine not already implemented")
 
+    engine_kwargs: Dict[str, Any] = {}
+    if 'JDBC' in engine.upper():
+        engine_kwargs['JAR_PATH'] = db_setting.JAR_PATH
+    elif engine == 'SQLite':
+        # engines are imported once they are looked up
+        from local_data_api.resources.sqlite import PRAGMAS
+
+        # e.g. SQLITE_DATABASE=/data/local.db SQLITE_MMAP_SIZE=268435456
+        for name in ('database', *PRAGMAS):
+            value: Optional[str] = os.environ.get(f'SQLITE_{name.upper()}')
+            if value:
+                engine_kwargs[name] = value
+
     register_secret(db_setting.USER, db_setting.PASSWORD, SECRET_ARN)
     register_resource(
         RESOURCE_ARN,
@@ -65,5 +85,8 @@ def setup() -> None:
         db_setting.PORT,
         db_setting.USER,
         db_setting.PASSWORD,
-        {'JAR_PATH': db_setting.JAR_PATH} if 'JDBC' in engine.upper() else {},
+        engine_kwargs,
     )
+    if WARM_UP:
+        # JDBC engines start the JVM and load the driver here
+        warm_up_resource(RESOURCE_ARN)
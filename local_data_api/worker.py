@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import string
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from local_data_api.exceptions import (
+    BadRequestException,
+    DataAPIException,
+    InternalServerErrorException,
+)
+
+
+def get_worker_count() -> int:
+    """Return the most worker processes gunicorn is configured to run"""
+    web_concurrency: str = os.environ.get('WEB_CONCURRENCY', '')
+    if web_concurrency:
+        return int(web_concurrency)
+    # the limit of the workers of the Docker image, one for a bare uvicorn
+    return int(os.environ.get('MAX_WORKERS', '1'))
+
+
+# forward requests of transactions to the worker process which owns them,
+# which is only needed when more than one worker may run
+WORKER_ROUTING: bool = (
+    os.environ.get('WORKER_ROUTING', '1' if get_worker_count() > 1 else '0') == '1'
+)
+WORKER_SOCKET_DIR: str = os.environ.get(
+    'WORKER_SOCKET_DIR', os.path.join(tempfile.gettempdir(), 'local-data-api')
+)
+
+# seconds to wait for another worker answering a request of this worker
+WORKER_REQUEST_TIMEOUT: float = float(os.environ.get('WORKER_REQUEST_TIMEOUT', '5'))
+
+WORKER_TAG_CHARACTERS: str = string.ascii_letters
+WORKER_TAG_LENGTH: int = 4
+
+TRANSACTION_ID_WORKER_TAG: re.Pattern = re.compile(
+    rb'"transactionId"\s*:\s*"([A-Za-z]{%d})' % WORKER_TAG_LENGTH
+)
+
+_worker_tag: Optional[Tuple[int, str]] = None
+
+
+def create_worker_tag(pid: int) -> str:
+    """Encode a process id into letters which can start a transaction id"""
+    base: int = len(WORKER_TAG_CHARACTERS)
+    characters: List[str] = []
+    for _ in range(WORKER_TAG_LENGTH):
+        pid, index = divmod(pid, base)
+        characters.append(WORKER_TAG_CHARACTERS[index])
+    return ''.join(reversed(characters))
+
+
+def get_worker_tag() -> str:
+    """Return the tag of this process, which changes when a worker is forked"""
+    global _worker_tag
+    pid: int = os.getpid()
+    if _worker_tag is None or _worker_tag[0] != pid:
+        _worker_tag = pid, create_worker_tag(pid)
+    return _worker_tag[1]
+
+
+def get_socket_path(worker_tag: str, socket_dir: str = WORKER_SOCKET_DIR) -> str:
+    return os.path.join(socket_dir, f'{worker_tag}.sock')
+
+
+def list_worker_tags(socket_dir: str = WORKER_SOCKET_DIR) -> List[str]:
+    """Return the tags of the other workers listening in `socket_dir`"""
+    try:
+        names: List[str] = os.listdir(socket_dir)
+    except OSError:
+        return []
+    worker_tag: str = get_worker_tag()
+    return sorted(
+        name[: -len('.sock')]
+        for name in names
+        if name.endswith('.sock') and name[: -len('.sock')] != worker_tag
+    )
+
+
+def find_worker_tag(body: bytes) -> Optional[str]:
+    match = TRANSACTION_ID_WORKER_TAG.search(body)
+    return match.group(1).decode() if match else None
+
+
+# Forwarded requests and responses are sent as frames of a 4 bytes length and
+# a payload. A request is a JSON frame of the scope and a frame of the body.
+# A response is a JSON frame of the status and headers, followed by frames of
+# the body ending with an empty frame.
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(len(payload).to_bytes(4, 'big') + payload)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    length: int = int.from_bytes(await reader.readexactly(4), 'big')
+    return await reader.readexactly(length)
+
+
+def encode_headers(headers: List[Tuple[bytes, bytes]]) -> List[List[str]]:
+    return [[key.decode('latin-1'), value.decode('latin-1')] for key, value in headers]
+
+
+def decode_headers(headers: List[List[str]]) -> List[Tuple[bytes, bytes]]:
+    return [(key.encode('latin-1'), value.encode('latin-1')) for key, value in headers]
+
+
+async def send_exception(send: Send, exc: DataAPIException) -> None:
+    body: bytes = json.dumps({"message": exc.message, "code": exc.code}).encode()
+    await send(
+        {
+            'type': 'http.response.start',
+            'status': exc.status_code,
+            'headers': [
+                (b'content-length', str(len(body)).encode()),
+                (b'content-type', b'application/json'),
+            ],
+        }
+    )
+    await send({'type': 'http.response.body', 'body': body})
+
+
+class WorkerRouter:
+    """
+    Forward requests carrying a transaction id to the worker which began it.
+
+    Connections of transactions live in the process which began them, so a
+    transaction id starts with the tag of that worker and every worker
+    listens on a Unix socket named after its tag. Other requests are served
+    by whichever worker accepted them.
+    """
+
+    def __init__(self, app: ASGIApp, socket_dir: str = WORKER_SOCKET_DIR):
+        self.app: ASGIApp = app
+        self.socket_dir: str = socket_dir
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        body: bytes = await self._read_body(receive)
+        worker_tag: Optional[str] = find_worker_tag(body)
+        if worker_tag is not None and worker_tag != get_worker_tag():
+            await self.forward(scope, body, send, worker_tag)
+            return
+
+        received: bool = False
+
+        async def replay() -> Message:
+            nonlocal received
+            if received:
+                return await receive()
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            message: Message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def forward(
+        self, scope: Scope, body: bytes, send: Send, worker_tag: str
+    ) -> None:
+        try:
+            reader, writer = await asyncio.open_unix_connection(
+                get_socket_path(worker_tag, self.socket_dir)
+            )
+        except OSError:
+            # the worker has gone and its transactions with it
+            await send_exception(send, BadRequestException('Invalid transaction ID'))
+            return
+
+        started: bool = False
+        try:
+            request: Dict[str, Any] = {
+                'method': scope['method'],
+                'path': scope['path'],
+                'query_string': scope.get('query_string', b'').decode('latin-1'),
+                'headers': encode_headers(scope['headers']),
+            }
+            write_frame(writer, json.dumps(request).encode())
+            write_frame(writer, body)
+            await writer.drain()
+
+            response: Dict[str, Any] = json.loads(await read_frame(reader))
+            await send(
+                {
+                    'type': 'http.response.start',
+                    'status': response['status'],
+                    'headers': decode_headers(response['headers']),
+                }
+            )
+            started = True
+            while True:
+                chunk: bytes = await read_frame(reader)
+                await send(
+                    {
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': bool(chunk),
+                    }
+                )
+                if not chunk:
+                    break
+        except (OSError, asyncio.IncompleteReadError):
+            if started:
+                raise
+            await send_exception(send, InternalServerErrorException())
+        finally:
+            writer.close()
+
+
+async def request_worker(
+    worker_tag: str,
+    method: str,
+    path: str,
+    query_string: str = '',
+    socket_dir: str = WORKER_SOCKET_DIR,
+    timeout: float = WORKER_REQUEST_TIMEOUT,
+) -> Tuple[int, bytes]:
+    """
+    Send a request of this worker to another one, returning the status and the
+    body of the response. Raises OSError or asyncio.IncompleteReadError when
+    the worker has gone, and asyncio.TimeoutError when it does not answer.
+    """
+
+    async def exchange() -> Tuple[int, bytes]:
+        reader, writer = await asyncio.open_unix_connection(
+            get_socket_path(worker_tag, socket_dir)
+        )
+        try:
+            request: Dict[str, Any] = {
+                'method': method,
+                'path': path,
+                'query_string': query_string,
+                'headers': [],
+            }
+            write_frame(writer, json.dumps(request).encode())
+            write_frame(writer, b'')
+            await writer.drain()
+
+            response: Dict[str, Any] = json.loads(await read_frame(reader))
+            chunks: List[bytes] = []
+            while True:
+                chunk: bytes = await read_frame(reader)
+                if not chunk:
+                    return response['status'], b''.join(chunks)
+                chunks.append(chunk)
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def serve_forwarded_request(
+    app: ASGIApp, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Run a request forwarded by another worker and send its response back"""
+    try:
+        request: Dict[str, Any] = json.loads(await read_frame(reader))
+        body: bytes = await read_frame(reader)
+        scope: Scope = {
+            'type': 'http',
+            'http_version': '1.1',
+            'method': request['method'],
+            'scheme': 'http',
+            'path': request['path'],
+            'root_path': '',
+            'query_string': request['query_string'].encode('latin-1'),
+            'headers': decode_headers(request['headers']),
+            'server': None,
+            'client': None,
+        }
+        received: bool = False
+
+        async def receive() -> Message:
+            nonlocal received
+            if received:
+                return {'type': 'http.disconnect'}
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response: Dict[str, Any] = {
+                    'status': message['status'],
+                    'headers': encode_headers(message.get('headers', [])),
+                }
+                write_frame(writer, json.dumps(response).encode())
+            elif message['type'] == 'http.response.body':
+                if message.get('body'):
+                    write_frame(writer, message['body'])
+                if not message.get('more_body', False):
+                    write_frame(writer, b'')
+            await writer.drain()
+
+        await app(scope, receive, send)
+    except (OSError, asyncio.IncompleteReadError):  # pragma: no cover
+        pass
+    finally:
+        writer.close()
+
+
+async def start_worker_server(
+    app: ASGIApp, socket_dir: str = WORKER_SOCKET_DIR
+) -> asyncio.AbstractServer:
+    """Listen for requests forwarded to this worker"""
+    os.makedirs(socket_dir, exist_ok=True)
+    path: str = get_socket_path(get_worker_tag(), socket_dir)
+    if os.path.exists(path):
+        # left by a dead worker with the same process id
+        os.unlink(path)
+    return await asyncio.start_unix_server(
+        lambda reader, writer: serve_forwarded_request(app, reader, writer), path
+    )
+
+
+async def stop_worker_server(
+    server: asyncio.AbstractServer, socket_dir: str = WORKER_SOCKET_DIR
+) -> None:
+    server.close()
+    await server.wait_closed()
+    path: str = get_socket_path(get_worker_tag(), socket_dir)
+    if os.path.exists(path):
+        os.unlink(path)
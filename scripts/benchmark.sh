@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+set -e
+
+# Save the results under .benchmarks and, once a run is saved, fail on a
+# regression of the median against the last one.
+# e.g. BENCHMARK_THRESHOLD=10% scripts/benchmark.sh -k large_result
+compare=()
+if [ -d .benchmarks ]; then
+  compare=(--benchmark-compare "--benchmark-compare-fail=median:${BENCHMARK_THRESHOLD:-20%}")
+fi
+
+pytest tests/benchmarks \
+  --benchmark-only \
+  --benchmark-autosave \
+  --benchmark-columns=min,median,mean,max,ops,rounds \
+  "${compare[@]}" \
+  "$@"
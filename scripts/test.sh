@@ -1,4 +1,4 @@
 #!/usr/bin/env bash
 set -e
 
-pytest --cov=local_data_api --cov-report term-missing tests
+pytest --cov=local_data_api --cov-report term-missing --benchmark-skip tests
@@ -0,0 +1,249 @@
+"""
+End to end benchmarks of the app in-process against a SQLite resource.
+
+Besides pytest-benchmark's timings, each benchmark reports throughput,
+p50/p99 latency and the peak memory of a request in `extra_info`.
+scripts/benchmark.sh saves the results and compares them with the last
+saved run to detect regressions.
+"""
+from __future__ import annotations
+
+import sqlite3
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+from starlette.testclient import TestClient
+
+from local_data_api import main
+from local_data_api.main import app
+from local_data_api.resources.resource import (
+    RESOURCE_METAS,
+    ResourceMeta,
+    get_connection_pool,
+    register_resource,
+)
+from local_data_api.secret_manager import SECRETS, register_secret
+
+RESOURCE_ARN: str = 'arn:aws:rds:us-east-1:123456789012:cluster:benchmark'
+SECRET_ARN: str = 'arn:aws:secretsmanager:us-east-1:123456789012:secret:benchmark'
+
+USER_COUNT: int = 1000
+WIDE_COLUMN_COUNT: int = 50
+WIDE_ROW_COUNT: int = 1000
+LARGE_ROW_COUNT: int = 100_000
+BLOB_SIZE: int = 64 * 1024
+BLOB_COUNT: int = 16
+BATCH_SIZE: int = 1000
+
+
+def populate(connection: sqlite3.Connection) -> None:
+    connection.execute('create table users (id integer primary key, name text)')
+    connection.executemany(
+        'insert into users values (?, ?)',
+        ((i, f'user-{i}') for i in range(USER_COUNT)),
+    )
+    columns: List[str] = [f'c{i}' for i in range(WIDE_COLUMN_COUNT)]
+    connection.execute(f'create table wide ({", ".join(columns)})')
+    connection.executemany(
+        f'insert into wide values ({", ".join("?" for _ in columns)})',
+        (
+            tuple(
+                f'{row}-{column}' if column % 2 else row
+                for column in range(WIDE_COLUMN_COUNT)
+            )
+            for row in range(WIDE_ROW_COUNT)
+        ),
+    )
+    connection.execute('create table large (id integer, value real, name text)')
+    connection.executemany(
+        'insert into large values (?, ?, ?)',
+        ((i, i * 0.5, f'name-{i}') for i in range(LARGE_ROW_COUNT)),
+    )
+    connection.execute('create table blobs (id integer, data blob)')
+    connection.executemany(
+        'insert into blobs values (?, ?)',
+        ((i, bytes(BLOB_SIZE)) for i in range(BLOB_COUNT)),
+    )
+    connection.execute('create table events (id integer, name text)')
+    connection.commit()
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory) -> Iterator[TestClient]:
+    path: str = str(tmp_path_factory.mktemp('benchmark') / 'benchmark.db')
+    with sqlite3.connect(path) as connection:
+        populate(connection)
+
+    register_resource(
+        RESOURCE_ARN, 'SQLite', None, None, 'benchmark', 'benchmark', {'database': path}
+    )
+    register_secret('benchmark', 'benchmark', SECRET_ARN)
+    # the results of the benchmarks are larger than the Data API allows
+    patch: pytest.MonkeyPatch = pytest.MonkeyPatch()
+    patch.setattr(main, 'MAX_RESULT_SIZE', 0)
+    try:
+        yield TestClient(app)
+    finally:
+        patch.undo()
+        meta: ResourceMeta = RESOURCE_METAS.pop(RESOURCE_ARN)
+        for pool in meta.pools.values():
+            pool.close()
+        if meta.executor:
+            meta.executor.shutdown()
+        if meta.stream_executor:
+            meta.stream_executor.shutdown()
+        SECRETS.pop(SECRET_ARN)
+
+
+def post(client: TestClient, path: str, **body: Any) -> Dict[str, Any]:
+    response = client.post(
+        path, json={'resourceArn': RESOURCE_ARN, 'secretArn': SECRET_ARN, **body}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def run(benchmark: Any, request: Callable[[], Any], rows: int = 1) -> Any:
+    """Benchmark a request and report throughput, latency percentiles and memory"""
+    tracemalloc.start()
+    try:
+        request()
+        benchmark.extra_info['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result: Any = benchmark(request)
+
+    stats: Any = getattr(benchmark, 'stats', None)
+    if stats is not None:
+        timings: List[float] = sorted(stats.stats.data)
+        benchmark.extra_info.update(
+            p50=timings[int(len(timings) * 0.50)],
+            p99=timings[min(int(len(timings) * 0.99), len(timings) - 1)],
+            rows_per_second=rows / stats.stats.mean,
+        )
+    return result
+
+
+def test_point_select(benchmark, client):
+    response = run(
+        benchmark,
+        lambda: post(
+            client,
+            '/Execute',
+            sql='select id, name from users where id = :id',
+            parameters=[{'name': 'id', 'value': {'longValue': 500}}],
+        ),
+    )
+    assert response['records'] == [[{'longValue': 500}, {'stringValue': 'user-500'}]]
+
+
+def test_wide_rows(benchmark, client):
+    response = run(
+        benchmark,
+        lambda: post(
+            client, '/Execute', sql='select * from wide', includeResultMetadata=True
+        ),
+        WIDE_ROW_COUNT,
+    )
+    assert len(response['records']) == WIDE_ROW_COUNT
+    assert len(response['columnMetadata']) == WIDE_COLUMN_COUNT
+
+
+def test_large_result(benchmark, client):
+    response = run(
+        benchmark,
+        lambda: post(client, '/Execute', sql='select * from large'),
+        LARGE_ROW_COUNT,
+    )
+    assert len(response['records']) == LARGE_ROW_COUNT
+
+
+def test_large_result_formatted(benchmark, client):
+    response = run(
+        benchmark,
+        lambda: post(
+            client, '/Execute', sql='select * from large', formatRecordsAs='JSON'
+        ),
+        LARGE_ROW_COUNT,
+    )
+    assert response['formattedRecords'].startswith('[{"id":0,')
+
+
+def test_large_result_size_checked(benchmark, client, monkeypatch):
+    """A large result under the size limit, serialized once while measured"""
+    monkeypatch.setattr(main, 'MAX_RESULT_SIZE', 1 << 30)
+    response = run(
+        benchmark,
+        lambda: post(client, '/Execute', sql='select * from large'),
+        LARGE_ROW_COUNT,
+    )
+    assert len(response['records']) == LARGE_ROW_COUNT
+
+
+def test_result_size_limit(benchmark, client, monkeypatch):
+    """An oversized result fails after fetching the rows over the limit only"""
+    monkeypatch.setattr(main, 'MAX_RESULT_SIZE', 1024 * 1024)
+
+    def request() -> Dict[str, Any]:
+        response = client.post(
+            '/Execute',
+            json={
+                'resourceArn': RESOURCE_ARN,
+                'secretArn': SECRET_ARN,
+                'sql': 'select * from large',
+            },
+        )
+        assert response.status_code == 400
+        return response.json()
+
+    response = run(benchmark, request)
+    assert response['message'] == (
+        'Database returned more than the allowed response size limit'
+    )
+
+
+def test_blobs(benchmark, client):
+    response = run(
+        benchmark,
+        lambda: post(client, '/Execute', sql='select * from blobs'),
+        BLOB_COUNT,
+    )
+    assert len(response['records']) == BLOB_COUNT
+
+
+def test_batch_execute(benchmark, client):
+    parameter_sets: List[List[Dict[str, Any]]] = [
+        [
+            {'name': 'id', 'value': {'longValue': i}},
+            {'name': 'name', 'value': {'stringValue': f'event-{i}'}},
+        ]
+        for i in range(BATCH_SIZE)
+    ]
+    run(
+        benchmark,
+        lambda: post(
+            client,
+            '/BatchExecute',
+            sql='insert into events values (:id, :name)',
+            parameterSets=parameter_sets,
+        ),
+        BATCH_SIZE,
+    )
+
+
+def test_transaction(benchmark, client):
+    def transaction() -> Dict[str, Any]:
+        transaction_id: str = post(client, '/BeginTransaction')['transactionId']
+        post(
+            client,
+            '/Execute',
+            sql="update users set name = 'updated' where id = 1",
+            transactionId=transaction_id,
+        )
+        return post(client, '/CommitTransaction', transactionId=transaction_id)
+
+    response = run(benchmark, transaction)
+    assert response == {'transactionStatus': 'Transaction Committed'}
+    assert get_connection_pool(RESOURCE_ARN, None).in_use == 0
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, List, Tuple
+
+import pytest
+
+from local_data_api.models import ColumnMetadata
+from local_data_api.resources.jdbc.mysql import MySQLJDBC
+from local_data_api.resources.jdbc.postgres import PostgreSQLJDBC
+from local_data_api.resources.resource import JDBCType
+
+# a wide result set: 50 repetitions of BIGINT, DOUBLE, DECIMAL, VARCHAR columns
+COLUMN_TYPES: List[Tuple[JDBCType, Any]] = [
+    (JDBCType.BIGINT, 1),
+    (JDBCType.DOUBLE, 1.5),
+    (JDBCType.DECIMAL, '1.50'),
+    (JDBCType.VARCHAR, 'abc'),
+] * 50
+ROWS: List[Tuple[Any, ...]] = [
+    tuple(value for _, value in COLUMN_TYPES) for _ in range(200)
+]
+
+
+@pytest.fixture(params=[MySQLJDBC, PostgreSQLJDBC])
+def resource(request, mocker):
+    resource = request.param(mocker.Mock())
+    resource.create_column_metadata_set = mocker.Mock(
+        return_value=[ColumnMetadata(type=type_.value) for type_, _ in COLUMN_TYPES]
+    )
+    return resource
+
+
+def test_per_cell_conversion(benchmark, resource):
+    """A JDBC type lookup for every cell"""
+    jdbc_types = [type_.value for type_, _ in COLUMN_TYPES]
+
+    def convert() -> Any:
+        return [
+            [
+                resource.get_filed_from_jdbc_type(value, jdbc_type).dict(
+                    exclude_unset=True
+                )
+                for value, jdbc_type in zip(row, jdbc_types)
+            ]
+            for row in ROWS
+        ]
+
+    benchmark(convert)
+
+
+def test_column_encoders(benchmark, resource, mocker):
+    """Encoders compiled once per result set from the column metadata"""
+
+    def convert() -> Any:
+        encode_record, _ = resource.create_record_converter(mocker.Mock())
+        return [encode_record(row) for row in ROWS]
+
+    benchmark(convert)
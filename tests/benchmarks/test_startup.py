@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+STARTUP: str = '''
+import json, time
+start = time.perf_counter()
+import local_data_api.main
+print(json.dumps(time.perf_counter() - start))
+'''
+
+
+def start(engine: str) -> float:
+    """Import the app in a new interpreter, as a gateway does on a cold start"""
+    output: bytes = subprocess.check_output(
+        [sys.executable, '-c', STARTUP], env={**os.environ, 'ENGINE': engine}
+    )
+    seconds: float = json.loads(output)
+    return seconds
+
+
+@pytest.mark.parametrize('engine', ['SQLite', 'PostgresSQL'])
+def test_startup(benchmark, engine):
+    """
+    The time to import the app, of which the drivers imported are asserted by
+    test_main.test_import_drivers_of_engine
+    """
+    seconds: float = benchmark.pedantic(start, args=(engine,), rounds=5)
+    benchmark.extra_info['import_seconds'] = seconds
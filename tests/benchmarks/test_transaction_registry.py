@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pytest
+
+from local_data_api.resources.transaction import TransactionRegistry
+
+REQUESTS_PER_THREAD: int = 20
+# a statement releases the GIL while it waits for the database
+STATEMENT_TIME: float = 0.001
+
+
+def run_requests(threads: int, request: Callable[[str], None]) -> None:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [
+            executor.submit(
+                lambda t: [request(t) for _ in range(REQUESTS_PER_THREAD)], str(t)
+            )
+            for t in range(threads)
+        ]:
+            future.result()
+
+
+@pytest.mark.parametrize('threads', [1, 4, 16])
+def test_transaction_locks(benchmark, mocker, threads):
+    """Requests on different transactions run in parallel"""
+    registry = TransactionRegistry(reap_interval=0)
+    for t in range(threads):
+        registry.add(str(t), mocker.Mock())
+
+    def request(transaction_id: str) -> None:
+        registry.acquire(transaction_id)
+        try:
+            time.sleep(STATEMENT_TIME)
+        finally:
+            registry.release(transaction_id)
+
+    benchmark.pedantic(run_requests, args=(threads, request), rounds=3)
+
+
+@pytest.mark.parametrize('threads', [1, 4, 16])
+def test_global_lock(benchmark, threads):
+    """Baseline: one lock around every request serializes all transactions"""
+    lock = threading.Lock()
+
+    def request(_: str) -> None:
+        with lock:
+            time.sleep(STATEMENT_TIME)
+
+    benchmark.pedantic(run_requests, args=(threads, request), rounds=3)
@@ -0,0 +1,177 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.testclient import TestClient
+
+from local_data_api.compression import (
+    Compression,
+    GzipEncoder,
+    decompress_gzip,
+    decompress_zstd,
+    negotiate_encoding,
+    parse_accept_encoding,
+)
+from local_data_api.exceptions import BadRequestException
+
+BODY = {'records': [[{'stringValue': 'value'}]] * 100}
+
+
+@pytest.fixture
+def client():
+    app = Starlette()
+    app.add_middleware(Compression, minimum_size=100, max_request_size=1 << 16)
+
+    @app.route('/Execute', methods=['POST'])
+    async def execute(request):
+        return JSONResponse(await request.json())
+
+    @app.route('/Small', methods=['POST'])
+    async def small(request):
+        return PlainTextResponse('small')
+
+    @app.route('/Stream', methods=['POST'])
+    async def stream(request):
+        async def chunks():
+            for chunk in (b'[', b'"value",' * 100, b'"value"]'):
+                yield chunk
+
+        return StreamingResponse(chunks(), media_type='application/json')
+
+    @app.route('/Encoded', methods=['POST'])
+    async def encoded(request):
+        body = gzip.compress(b'compressed by a worker' * 100)
+        return PlainTextResponse(body, headers={'Content-Encoding': 'gzip'})
+
+    return TestClient(app)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding('gzip, br;q=0.5, *;q=0, zstd;q=x') == {
+        'gzip': 1.0,
+        'br': 0.5,
+        '*': 0.0,
+        'zstd': 0.0,
+    }
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding('gzip, deflate') == 'gzip'
+    assert negotiate_encoding('*') is not None
+    assert negotiate_encoding('identity') is None
+    assert negotiate_encoding('gzip;q=0') is None
+    assert negotiate_encoding('') is None
+
+
+def test_gzip_encoder():
+    encoder = GzipEncoder()
+    body = encoder.compress(b'a' * 100)
+    # each chunk can be decoded as soon as it is received
+    assert zlib.decompressobj(31).decompress(body) == b'a' * 100
+    body += encoder.compress(b'b' * 100) + encoder.finish()
+    assert gzip.decompress(body) == b'a' * 100 + b'b' * 100
+
+
+def test_compress_response(client):
+    response = client.post('/Execute', json=BODY, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < len(json.dumps(BODY))
+    assert response.json() == BODY
+
+
+def test_compress_response_skipped(client):
+    response = client.post(
+        '/Execute', json=BODY, headers={'Accept-Encoding': 'identity'}
+    )
+    assert 'content-encoding' not in response.headers
+    assert response.json() == BODY
+
+    response = client.post('/Small', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert response.text == 'small'
+
+    response = client.post('/Encoded', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.text == 'compressed by a worker' * 100
+
+
+def test_compress_streaming_response(client):
+    response = client.post('/Stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert response.json() == ['value'] * 101
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate'])
+def test_decompress_request(client, encoding):
+    body = json.dumps(BODY).encode()
+    compressed = gzip.compress(body) if encoding == 'gzip' else zlib.compress(body)
+    response = client.post(
+        '/Execute',
+        data=compressed,
+        headers={'Content-Encoding': encoding, 'Content-Type': 'application/json'},
+    )
+    assert response.status_code == 200
+    assert response.json() == BODY
+
+
+def test_decompress_request_invalid(client):
+    response = client.post('/Execute', data=b'{}', headers={'Content-Encoding': 'lzma'})
+    assert response.status_code == 400
+    assert response.json() == {
+        'message': 'Unsupported Content-Encoding: lzma',
+        'code': 'BadRequestException',
+    }
+
+    response = client.post('/Execute', data=b'{}', headers={'Content-Encoding': 'gzip'})
+    assert response.status_code == 400
+    assert response.json()['message'] == (
+        'Invalid request body for Content-Encoding: gzip'
+    )
+
+
+def test_decompress_gzip():
+    assert decompress_gzip(gzip.compress(b'a' * 100), 100) == b'a' * 100
+    with pytest.raises(BadRequestException) as e:
+        decompress_gzip(gzip.compress(b'a' * 101), 100)
+    assert e.value.message == 'Request body exceeds the limit of 100 bytes'
+    with pytest.raises(zlib.error):
+        decompress_gzip(gzip.compress(b'a' * 100)[:-10], 100)
+
+
+def test_decompress_zstd():
+    zstandard = pytest.importorskip('zstandard')
+    compressed = zstandard.ZstdCompressor().compress(b'a' * 2000)
+    assert decompress_zstd(compressed, 2000) == b'a' * 2000
+    with pytest.raises(BadRequestException) as e:
+        decompress_zstd(compressed, 1999)
+    assert e.value.message == 'Request body exceeds the limit of 1999 bytes'
+    with pytest.raises(zstandard.ZstdError):
+        decompress_zstd(compressed[:-3], 2000)
+
+
+def test_decompress_request_too_large(client):
+    # a few kilobytes expanding far beyond the limit are not decompressed whole
+    response = client.post(
+        '/Execute',
+        data=gzip.compress(b' ' * (1 << 24)),
+        headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json'},
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        'message': 'Request body exceeds the limit of 65536 bytes',
+        'code': 'BadRequestException',
+    }
+
+    response = client.post(
+        '/Execute', data=b'a' * (1 << 17), headers={'Content-Encoding': 'gzip'}
+    )
+    assert response.status_code == 400
+    assert response.json()['message'] == (
+        'Request body exceeds the limit of 65536 bytes'
+    )
@@ -1,15 +1,22 @@
+import json
+import os
+import subprocess
+import sys
 from unittest.mock import Mock
 
 import pytest
 from starlette.testclient import TestClient
 
-from local_data_api.main import app
+from local_data_api.exceptions import ServiceUnavailableError
+from local_data_api.main import _accepts_arrow, app
 from local_data_api.resources import SQLite
+from local_data_api.resources.cache import RESULT_CACHE
 from local_data_api.resources.resource import (
     CONNECTION_POOL,
     RESOURCE_METAS,
     ResourceMeta,
 )
+from local_data_api.resources.transaction import TransactionRegistry
 
 client = TestClient(app)
 
@@ -41,7 +48,7 @@ def mocked_connection(mocker):
 
 @pytest.fixture
 def mocked_connection_pool(mocker):
-    connection_pool = {}
+    connection_pool = TransactionRegistry()
     mocker.patch('local_data_api.resources.resource.CONNECTION_POOL', connection_pool)
     return connection_pool
 
@@ -53,16 +60,46 @@ def mocked_cursor(mocked_connection, mocker):
     return cursor_mock
 
 
-def test_execute_sql(mocked_mysql):
-    with pytest.raises(NotImplementedError):
-        client.post(
-            "/ExecuteSql",
-            json={
-                'awsSecretStoreArn': 1,
-                'dbClusterOrInstanceArn': 2,
-                'sqlStatements': 3,
-            },
-        )
+def test_execute_sql(mocked_mysql, mocked_connection, mocked_cursor, mocker):
+    mocked_cursor.description = None
+    mocked_cursor.rowcount = 1
+    response = client.post(
+        "/ExecuteSql",
+        json={
+            'awsSecretStoreArn': '1',
+            'dbClusterOrInstanceArn': 'abc',
+            'sqlStatements': "insert into users values (1, 'a;b');\n"
+            "update users set name = 'c';",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        'sqlStatementResults': [
+            {'numberOfRecordsUpdated': 1},
+            {'numberOfRecordsUpdated': 1},
+        ]
+    }
+    mocked_cursor.execute.assert_has_calls(
+        [
+            mocker.call("insert into users values (1, 'a;b')"),
+            mocker.call("update users set name = 'c'"),
+        ]
+    )
+    mocked_connection.commit.assert_called_once_with()
+
+
+def test_execute_sql_error(mocked_mysql, mocked_connection, mocked_cursor):
+    mocked_cursor.execute.side_effect = Exception('error')
+    response = client.post(
+        "/ExecuteSql",
+        json={
+            'awsSecretStoreArn': '1',
+            'dbClusterOrInstanceArn': 'abc',
+            'sqlStatements': 'select 1',
+        },
+    )
+    assert response.status_code == 400
+    mocked_connection.commit.assert_not_called()
 
 
 def test_begin_statement(mocked_mysql):
@@ -76,6 +113,23 @@ def test_begin_statement(mocked_mysql):
     assert isinstance(response_json['transactionId'], str) is True
 
 
+def test_begin_statement_with_too_many_transactions(mocked_mysql, mocker):
+    mocker.patch(
+        'local_data_api.resources.resource.CONNECTION_POOL',
+        TransactionRegistry(max_count=0),
+    )
+    close = mocker.patch.object(SQLite, 'close')
+    mocker.patch.object(
+        TransactionRegistry, 'add', side_effect=ServiceUnavailableError('full')
+    )
+    response = client.post(
+        "/BeginTransaction", json={'resourceArn': 'abc', 'secretArn': '1'}
+    )
+    assert response.status_code == 503
+    assert response.json() == {'message': 'full', 'code': 'ServiceUnavailableError'}
+    close.assert_called_once_with()
+
+
 def test_commit_transaction(mocked_mysql, mocker, mocked_connection_pool):
     mocked_connection_pool['2'] = mocker.Mock()
     response = client.post(
@@ -86,6 +140,41 @@ def test_commit_transaction(mocked_mysql, mocker, mocked_connection_pool):
     assert response.json() == {'transactionStatus': 'Transaction Committed'}
 
 
+def test_commit_transaction_error(mocked_mysql, mocker, mocked_connection_pool):
+    connection = mocker.Mock()
+    connection.commit.side_effect = Exception('deferred constraint violated')
+    mocked_connection_pool['2'] = connection
+    response = TestClient(app, raise_server_exceptions=False).post(
+        "/CommitTransaction",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'transactionId': '2'},
+    )
+    assert response.status_code == 500
+    # the connection is not left held by the failed request
+    connection.close.assert_called_once_with()
+    assert '2' not in mocked_connection_pool
+    assert mocked_connection_pool.in_use == 0
+
+    response = client.post(
+        "/RollbackTransaction",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'transactionId': '2'},
+    )
+    assert response.status_code == 400
+    assert response.json()['message'] == 'Invalid transaction ID'
+
+
+def test_rollback_transaction_error(mocked_mysql, mocker, mocked_connection_pool):
+    connection = mocker.Mock()
+    connection.rollback.side_effect = Exception('connection lost')
+    mocked_connection_pool['2'] = connection
+    response = TestClient(app, raise_server_exceptions=False).post(
+        "/RollbackTransaction",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'transactionId': '2'},
+    )
+    assert response.status_code == 500
+    connection.close.assert_called_once_with()
+    assert '2' not in mocked_connection_pool
+
+
 def test_rollback_transaction(mocked_mysql, mocker, mocked_connection_pool):
     mocked_connection_pool['2'] = mocker.Mock()
     response = client.post(
@@ -109,7 +198,7 @@ def test_data_api_exception_handler():
 
 def test_execute_statement(mocked_mysql, mocked_cursor):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
 
     response = client.post(
         "/Execute",
@@ -125,7 +214,7 @@ def test_execute_statement(mocked_mysql, mocked_cursor):
 
 def test_execute_statement_with_parameters(mocked_mysql, mocked_cursor):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
 
     response = client.post(
         "/Execute",
@@ -148,7 +237,7 @@ def test_execute_statement_with_transaction(
     mocked_mysql, mocked_connection, mocked_connection_pool, mocked_cursor
 ):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
     mocked_connection_pool['2'] = mocked_connection
 
     response = client.post(
@@ -172,7 +261,7 @@ def test_execute_statement_with_empty_transaction_id(
     mocked_mysql, mocked_connection, mocked_connection_pool, mocked_cursor
 ):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
     mocked_connection_pool['2'] = mocked_connection
 
     response = client.post(
@@ -192,6 +281,132 @@ def test_execute_statement_with_empty_transaction_id(
     }
 
 
+def test_execute_statement_streaming(
+    mocked_mysql, mocked_connection, mocked_cursor, mocker
+):
+    mocker.patch('local_data_api.main.STREAMING_FETCH_SIZE', 1)
+    mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ((2, 'def'),), ()]
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'},
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json() == {
+        'numberOfRecordsUpdated': 0,
+        'records': [
+            [{'longValue': 1}, {'stringValue': 'abc'}],
+            [{'longValue': 2}, {'stringValue': 'def'}],
+        ],
+    }
+    mocked_cursor.close.assert_called_once_with()
+    mocked_connection.commit.assert_called_once_with()
+
+
+def test_execute_statement_streaming_update(
+    mocked_mysql, mocked_connection, mocked_cursor, mocker
+):
+    mocker.patch('local_data_api.main.STREAMING_FETCH_SIZE', 1)
+    mocked_cursor.description = ''
+    mocked_cursor.rowcount = 1
+    mocked_cursor.lastrowid = 0
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'delete from users'},
+    )
+    assert response.status_code == 200
+    assert response.json() == {'numberOfRecordsUpdated': 1, 'generatedFields': []}
+    mocked_connection.commit.assert_called_once_with()
+
+
+def test_execute_statement_streaming_error(mocked_mysql, mocked_cursor, mocker):
+    mocker.patch('local_data_api.main.STREAMING_FETCH_SIZE', 1)
+    mocked_cursor.execute.side_effect = Exception('error')
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'},
+    )
+    assert response.status_code == 400
+    assert response.json() == {'code': 'BadRequestException', 'message': 'error'}
+
+
+def test_execute_statement_formatted(mocked_mysql, mocked_cursor):
+    mocked_cursor.description = (('id',), ('name',))
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
+
+    response = client.post(
+        "/Execute",
+        json={
+            'resourceArn': 'abc',
+            'secretArn': '1',
+            'sql': 'select * from users',
+            'formatRecordsAs': 'JSON',
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        'numberOfRecordsUpdated': 0,
+        'formattedRecords': '[{"id":1,"name":"abc"}]',
+    }
+
+
+def test_accepts_arrow():
+    assert _accepts_arrow('application/vnd.apache.arrow.stream')
+    assert _accepts_arrow('application/json, application/vnd.apache.arrow.stream;q=0.5')
+    assert not _accepts_arrow('application/vnd.apache.arrow.stream;q=0')
+    assert not _accepts_arrow('application/json, */*')
+
+
+def test_execute_statement_arrow(mocked_mysql, mocked_cursor):
+    pyarrow = pytest.importorskip('pyarrow')
+    mocked_cursor.description = (('id',), ('name',))
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'), (2, None)), ()]
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'},
+        headers={'Accept': 'application/vnd.apache.arrow.stream'},
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/vnd.apache.arrow.stream'
+    table = pyarrow.ipc.open_stream(response.content).read_all()
+    assert table.to_pydict() == {'id': [1, 2], 'name': ['abc', None]}
+
+
+def test_execute_statement_arrow_update(mocked_mysql, mocked_cursor):
+    pytest.importorskip('pyarrow')
+    mocked_cursor.description = None
+    mocked_cursor.rowcount = 2
+    mocked_cursor.lastrowid = 0
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'delete from users'},
+        headers={'Accept': 'application/vnd.apache.arrow.stream'},
+    )
+    assert response.status_code == 200
+    assert response.json() == {'numberOfRecordsUpdated': 2, 'generatedFields': []}
+
+
+def test_execute_statement_arrow_unavailable(mocked_mysql, mocker):
+    mocker.patch('local_data_api.resources.arrow.pyarrow', None)
+
+    response = client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'},
+        headers={'Accept': 'application/vnd.apache.arrow.stream'},
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        'message': 'Arrow results require pyarrow to be installed',
+        'code': 'BadRequestException',
+    }
+
+
 def test_batch_execute_statement(mocked_mysql, mocked_cursor):
     mocked_cursor.description = ''
     mocked_cursor.rowcount = 1
@@ -282,3 +497,148 @@ def test_batch_execute_statement_with_empty_transaction_id(
     assert response.status_code == 200
     response_json = response.json()
     assert response_json == {'updateResults': [{'generatedFields': [{'longValue': 1}]}]}
+
+
+def test_metrics(mocked_mysql, mocked_cursor):
+    mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
+    client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'},
+    )
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    metrics = response.text
+    assert (
+        'local_data_api_requests_total{endpoint="Execute",resource="abc",status="200"}'
+        in metrics
+    )
+    for phase in ['lookup', 'acquire', 'compile', 'execute', 'fetch', 'convert']:
+        assert (
+            'local_data_api_phase_duration_seconds_count'
+            f'{{endpoint="Execute",resource="abc",phase="{phase}"}}'
+        ) in metrics
+    assert 'phase="serialize"' in metrics
+    assert 'local_data_api_open_transactions{state="idle"}' in metrics
+    assert '# TYPE local_data_api_pool_connections gauge' in metrics
+
+
+def test_metrics_of_workers(mocker):
+    other = [
+        {
+            'name': 'local_data_api_requests_total',
+            'documentation': 'Requests by endpoint, resource and status code',
+            'type': 'counter',
+            'samples': [
+                ['', ['endpoint', 'resource', 'status'], ['Execute', 'xyz', '200'], 3]
+            ],
+        }
+    ]
+
+    async def request_worker(worker_tag, method, path, query_string):
+        if worker_tag == 'Bcde':
+            raise OSError('gone')
+        assert (method, path, query_string) == ('GET', '/metrics', 'scope=worker')
+        return 200, json.dumps(other).encode()
+
+    mocker.patch('local_data_api.main.WORKER_ROUTING', True)
+    mocker.patch('local_data_api.main.list_worker_tags', return_value=['Abcd', 'Bcde'])
+    mocker.patch('local_data_api.main.request_worker', request_worker)
+    metrics = client.get("/metrics").text
+    assert (
+        'local_data_api_requests_total{endpoint="Execute",resource="xyz",status="200"}'
+        ' 3\n'
+    ) in metrics
+    assert metrics.count('# TYPE local_data_api_requests_total counter') == 1
+
+    response = client.get("/metrics", params={'scope': 'worker'})
+    assert response.headers['content-type'] == 'application/json'
+    assert {metric['name'] for metric in response.json()} >= {
+        'local_data_api_requests_total',
+        'local_data_api_open_transactions',
+    }
+
+
+@pytest.fixture
+def result_cache(mocker):
+    RESULT_CACHE.clear()
+    mocker.patch.object(RESULT_CACHE, 'max_size', 1 << 20)
+    yield RESULT_CACHE
+    RESULT_CACHE.clear()
+
+
+def test_execute_statement_cached(
+    mocked_mysql, mocked_connection, mocked_cursor, result_cache, mocker
+):
+    mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
+    mocked_cursor.fetchmany.side_effect = [((1, 'abc'),), ()]
+    body = {'resourceArn': 'abc', 'secretArn': '1', 'sql': 'select * from users'}
+
+    for _ in range(2):
+        response = client.post("/Execute", json=body)
+        assert response.json() == {
+            'numberOfRecordsUpdated': 0,
+            'records': [[{'longValue': 1}, {'stringValue': 'abc'}]],
+        }
+    mocked_cursor.execute.assert_called_once()
+    assert (result_cache.hits, result_cache.misses) == (1, 1)
+
+    # a change of the table drops the result
+    update_cursor = mocker.Mock(description=None, rowcount=1, lastrowid=0)
+    mocked_connection.cursor.side_effect = [update_cursor]
+    client.post(
+        "/Execute",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'sql': 'delete from users'},
+    )
+    assert len(result_cache) == 0
+
+
+def test_commit_transaction_invalidates_result_cache(
+    mocked_mysql, mocked_connection_pool, result_cache, mocker
+):
+    connection = mocker.Mock()
+    mocked_connection_pool['2'] = connection
+    mocked_connection_pool.add_written_tables('2', frozenset(['users']))
+    invalidate = mocker.spy(result_cache, 'invalidate')
+
+    response = client.post(
+        "/CommitTransaction",
+        json={'resourceArn': 'abc', 'secretArn': '1', 'transactionId': '2'},
+    )
+    assert response.status_code == 200
+    invalidate.assert_called_once_with(frozenset(['users']))
+
+
+DRIVER_MODULES = [
+    'pymysql',
+    'psycopg2',
+    'jaydebeapi',
+    'jpype',
+    'sqlalchemy.dialects.mysql',
+    'sqlalchemy.dialects.postgresql',
+    'sqlalchemy.dialects.sqlite',
+]
+
+
+@pytest.mark.parametrize(
+    'engine, modules',
+    [
+        ('SQLite', ['sqlalchemy.dialects.sqlite']),
+        ('PostgresSQL', ['psycopg2', 'sqlalchemy.dialects.postgresql']),
+        ('MySQLJDBC', ['jaydebeapi', 'sqlalchemy.dialects.mysql']),
+    ],
+)
+def test_import_drivers_of_engine(engine, modules):
+    """Only the driver of the engine in use is imported with the app"""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            '-c',
+            'import json, sys; import local_data_api.main; '
+            f'print(json.dumps([m for m in {DRIVER_MODULES!r} if m in sys.modules]))',
+        ],
+        env={**os.environ, 'ENGINE': engine},
+    )
+    assert json.loads(output) == modules
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+from contextvars import copy_context
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.testclient import TestClient
+
+from local_data_api.exceptions import BadRequestException
+from local_data_api.metrics import (
+    PHASE_DURATION,
+    REQUEST_DURATION,
+    REQUEST_LABELS,
+    REQUEST_TIMINGS,
+    REQUESTS,
+    Counter,
+    Gauge,
+    Histogram,
+    ServerTiming,
+    collect_metrics,
+    format_labels,
+    format_metrics,
+    format_server_timing,
+    measure,
+    merge_metrics,
+    render_metrics,
+    track_request,
+)
+
+
+def test_format_labels():
+    assert format_labels([], []) == ''
+    assert format_labels(['a', 'b'], ['x', 'y"\\\n']) == '{a="x",b="y\\"\\\\\\n"}'
+
+
+def test_counter():
+    registry = []
+    counter = Counter('requests_total', 'Requests', ['status'], registry)
+    counter.inc('200')
+    counter.inc('200')
+    counter.inc('400', amount=3)
+    assert render_metrics(registry) == (
+        '# HELP requests_total Requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{status="200"} 2\n'
+        'requests_total{status="400"} 3\n'
+    )
+
+
+def test_histogram():
+    registry = []
+    histogram = Histogram('duration', 'Duration', ['phase'], [0.1, 1.0], registry)
+    histogram.observe(0.05, 'fetch')
+    histogram.observe(0.1, 'fetch')
+    histogram.observe(0.5, 'fetch')
+    histogram.observe(2.0, 'fetch')
+    assert render_metrics(registry) == (
+        '# HELP duration Duration\n'
+        '# TYPE duration histogram\n'
+        'duration_bucket{phase="fetch",le="0.1"} 2\n'
+        'duration_bucket{phase="fetch",le="1.0"} 3\n'
+        'duration_bucket{phase="fetch",le="+Inf"} 4\n'
+        'duration_sum{phase="fetch"} 2.65\n'
+        'duration_count{phase="fetch"} 4\n'
+    )
+
+
+def test_gauge():
+    registry = []
+    values = {'idle': 1}
+    Gauge(
+        'connections',
+        'Connections',
+        ['state'],
+        lambda: [((state,), value) for state, value in values.items()],
+        registry,
+    )
+    assert render_metrics(registry).endswith('connections{state="idle"} 1\n')
+    values['idle'] = 2
+    assert render_metrics(registry).endswith('connections{state="idle"} 2\n')
+
+
+def test_merge_metrics():
+    collected = []
+    for status, duration in [('200', 0.0625), ('400', 0.5)]:
+        registry = []
+        Counter('requests_total', 'Requests', ['status'], registry).inc(status)
+        Histogram('duration', 'Duration', [], [0.1], registry).observe(duration)
+        # workers send the metrics to each other as JSON
+        collected.append(json.loads(json.dumps(collect_metrics(registry))))
+    collected.append(collected[0])
+
+    assert format_metrics(merge_metrics(collected)) == (
+        '# HELP requests_total Requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{status="200"} 2\n'
+        'requests_total{status="400"} 1\n'
+        '# HELP duration Duration\n'
+        '# TYPE duration histogram\n'
+        'duration_bucket{le="0.1"} 2\n'
+        'duration_bucket{le="+Inf"} 3\n'
+        'duration_sum 0.625\n'
+        'duration_count 3\n'
+    )
+
+
+def test_track_request(mocker):
+    observe = mocker.patch.object(REQUEST_DURATION, 'observe')
+    inc = mocker.patch.object(REQUESTS, 'inc')
+    phase = mocker.patch.object(PHASE_DURATION, 'observe')
+
+    with track_request('Execute', 'arn'):
+        assert REQUEST_LABELS.get() == ('Execute', 'arn')
+        with measure('fetch'):
+            pass
+    assert REQUEST_LABELS.get() == ('', '')
+    inc.assert_called_once_with('Execute', 'arn', '200')
+    assert observe.call_args[0][1:] == ('Execute', 'arn')
+    assert phase.call_args[0][1:] == ('Execute', 'arn', 'fetch')
+
+    inc.reset_mock()
+    with pytest.raises(BadRequestException):
+        with track_request('Execute', 'arn'):
+            raise BadRequestException('error')
+    inc.assert_called_once_with('Execute', 'arn', '400')
+
+    inc.reset_mock()
+    with pytest.raises(ValueError):
+        with track_request('Execute', 'arn'):
+            raise ValueError
+    inc.assert_called_once_with('Execute', 'arn', '500')
+
+
+def test_format_server_timing():
+    assert format_server_timing({'execute': 0.0012345, 'total': 0.002}) == (
+        'execute;dur=1.234, total;dur=2.000'
+    )
+
+
+def test_server_timing(caplog):
+    app = Starlette()
+    app.add_middleware(ServerTiming)
+
+    def execute():
+        with measure('execute'):
+            pass
+        with measure('fetch'):
+            pass
+        with measure('fetch'):
+            pass
+
+    @app.route('/Execute', methods=['POST'])
+    async def endpoint(request):
+        # as run_in_executor does
+        await asyncio.get_event_loop().run_in_executor(
+            None, copy_context().run, execute
+        )
+        return JSONResponse({})
+
+    with caplog.at_level(logging.DEBUG, logger='local_data_api.metrics'):
+        response = TestClient(app).post('/Execute')
+
+    assert response.status_code == 200
+    phases = [
+        timing.split(';')[0] for timing in response.headers['server-timing'].split(', ')
+    ]
+    assert phases == ['execute', 'fetch', 'total']
+    assert '"path": "/Execute", "status": 200' in caplog.text
+    assert REQUEST_TIMINGS.get() is None
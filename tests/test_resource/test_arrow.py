@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from local_data_api.exceptions import BadRequestException
+from local_data_api.models import ColumnMetadata
+from local_data_api.resources.arrow import (
+    ArrowStreamWriter,
+    create_record_batch,
+    get_arrow_type,
+)
+from local_data_api.resources.resource import RESULT_SIZE_EXCEEDED
+from local_data_api.resources.sqlite import SQLite
+
+pyarrow = pytest.importorskip('pyarrow')
+
+
+def test_get_arrow_type():
+    assert get_arrow_type(ColumnMetadata(type=4)) == pyarrow.int64()
+    assert get_arrow_type(ColumnMetadata(type=16)) == pyarrow.bool_()
+    assert get_arrow_type(ColumnMetadata(type=8)) == pyarrow.float64()
+    assert get_arrow_type(ColumnMetadata(type=-3)) == pyarrow.binary()
+    assert get_arrow_type(ColumnMetadata(type=93)) == pyarrow.string()
+    assert get_arrow_type(ColumnMetadata(type=3)) is None
+    assert get_arrow_type(ColumnMetadata()) is None
+
+
+def test_create_record_batch():
+    column_metadata_set = [
+        ColumnMetadata(name='id', label='id', type=4, nullable=0),
+        ColumnMetadata(name='created_at', label='created_at', type=93),
+        ColumnMetadata(name='value'),
+    ]
+    table = create_record_batch(
+        [(1, '2020-01-01 00:00:00', 1.5), (2, None, None)], column_metadata_set
+    )
+    assert table.column_names == ['id', 'created_at', 'value']
+    assert table.to_pydict() == {
+        'id': [1, 2],
+        'created_at': ['2020-01-01 00:00:00', None],
+        'value': [1.5, None],
+    }
+    field = table.schema.field('id')
+    assert field.type == pyarrow.int64()
+    assert not field.nullable
+    assert json.loads(field.metadata[b'columnMetadata']) == {
+        'name': 'id',
+        'label': 'id',
+        'type': 4,
+        'nullable': 0,
+    }
+    assert table.schema.field('value').type == pyarrow.float64()
+
+
+def test_create_record_batch_empty():
+    batch = create_record_batch([], [ColumnMetadata(name='id', type=4)])
+    assert batch.num_rows == 0
+    assert batch.schema.field('id').type == pyarrow.int64()
+
+
+def test_create_record_batch_mixed_types():
+    batch = create_record_batch(
+        [(1, 1), ('abc', 2), (None, 3)],
+        [ColumnMetadata(name='value'), ColumnMetadata(name='id')],
+    )
+    assert batch.schema.field('value').type == pyarrow.string()
+    assert batch.schema.field('id').type == pyarrow.int64()
+    assert batch.to_pydict() == {'value': ['1', 'abc', None], 'id': [1, 2, 3]}
+
+
+def test_create_record_batch_schema():
+    column_metadata_set = [ColumnMetadata(name='value')]
+    schema = create_record_batch([(1,)], column_metadata_set).schema
+    assert create_record_batch([(2,)], column_metadata_set, schema).to_pydict() == {
+        'value': [2]
+    }
+    with pytest.raises(BadRequestException) as e:
+        create_record_batch([('abc',)], column_metadata_set, schema)
+    assert e.value.message.startswith('Column value has values of another type')
+
+
+def test_arrow_stream_writer():
+    writer = ArrowStreamWriter([ColumnMetadata(name='id', type=4)])
+    sizes = [writer.write([(i,) for i in range(4)]) for _ in range(2)]
+    assert 0 < sizes[0] < sizes[1]
+    writer.write([(8,), (9,)])
+    reader = pyarrow.ipc.open_stream(writer.getvalue())
+    assert [batch.num_rows for batch in reader] == [4, 4, 2]
+
+
+def test_arrow_stream_writer_empty():
+    writer = ArrowStreamWriter([ColumnMetadata(name='id', type=4)])
+    table = pyarrow.ipc.open_stream(writer.getvalue()).read_all()
+    assert table.num_rows == 0
+    assert table.schema.field('id').type == pyarrow.int64()
+
+
+def test_execute_arrow():
+    resource = SQLite(
+        SQLite.create_connection_maker(engine_kwargs={'database': ':memory:'})()
+    )
+    resource.connection.execute('create table users (id integer, name text)')
+    assert resource.execute_arrow("insert into users values (1, 'abc')") == {
+        'numberOfRecordsUpdated': 1,
+        'generatedFields': [{'longValue': 1}],
+    }
+    result = resource.execute_arrow(
+        'select id, name from users where id = :id', {'id': 1}
+    )
+    table = pyarrow.ipc.open_stream(result).read_all()
+    assert table.to_pydict() == {'id': [1], 'name': ['abc']}
+
+
+def test_execute_arrow_result_size():
+    resource = SQLite(
+        SQLite.create_connection_maker(engine_kwargs={'database': ':memory:'})()
+    )
+    resource.connection.execute('create table users (id integer, name text)')
+    resource.connection.execute("insert into users values (1, 'abc')")
+    assert resource.execute_arrow('select id, name from users', max_result_size=0)
+    with pytest.raises(BadRequestException) as e:
+        resource.execute_arrow('select id, name from users', max_result_size=10)
+    assert e.value.message == RESULT_SIZE_EXCEEDED
+
+
+def test_execute_arrow_batches(mocker):
+    mocker.patch('local_data_api.resources.arrow.ARROW_BATCH_SIZE', 2)
+    resource = SQLite(
+        SQLite.create_connection_maker(engine_kwargs={'database': ':memory:'})()
+    )
+    resource.connection.execute('create table users (id integer, name)')
+    resource.connection.execute(
+        "insert into users values (1, 'abc'), (2, 2), (3, null), (4, 'def'), (5, null)"
+    )
+    reader = pyarrow.ipc.open_stream(
+        resource.execute_arrow('select id, name from users order by id')
+    )
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert pyarrow.Table.from_batches(batches).to_pydict() == {
+        'id': [1, 2, 3, 4, 5],
+        'name': ['abc', '2', None, 'def', None],
+    }
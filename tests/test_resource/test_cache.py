@@ -0,0 +1,83 @@
+from local_data_api.resources.cache import ResultCache, get_result_cache_size
+from local_data_api.resources.resource import dump_json
+
+RESPONSE = {'numberOfRecordsUpdated': 0, 'records': [[{'longValue': 1}]]}
+SIZE = len(dump_json(RESPONSE))
+
+
+def test_get_and_put():
+    cache = ResultCache(max_size=SIZE * 2)
+    assert cache.get('a') is None
+    cache.put('a', RESPONSE, frozenset(['users']), cache.generation)
+    assert cache.get('a') is RESPONSE
+    assert (cache.hits, cache.misses, cache.size, len(cache)) == (1, 1, SIZE, 1)
+
+    cache.put('a', RESPONSE, frozenset(['users']), cache.generation)
+    assert (cache.size, len(cache)) == (SIZE, 1)
+
+
+def test_put_evicts_least_recently_used():
+    cache = ResultCache(max_size=SIZE * 2)
+    cache.put('a', RESPONSE, frozenset(['users']), cache.generation)
+    cache.put('b', RESPONSE, frozenset(['users']), cache.generation)
+    cache.get('a')
+    cache.put('c', RESPONSE, frozenset(['users']), cache.generation)
+    assert cache.get('b') is None
+    assert cache.get('a') is RESPONSE
+    assert cache.get('c') is RESPONSE
+    assert (cache.evictions, cache.size) == (1, SIZE * 2)
+
+
+def test_put_too_large():
+    cache = ResultCache(max_size=SIZE - 1)
+    cache.put('a', RESPONSE, frozenset(['users']), cache.generation)
+    assert len(cache) == 0
+
+
+def test_put_after_invalidation():
+    cache = ResultCache(max_size=SIZE)
+    generation = cache.generation
+    cache.invalidate(['users'])
+    # the result may have been read before the change
+    cache.put('a', RESPONSE, frozenset(['users']), generation)
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = ResultCache(max_size=SIZE * 3)
+    cache.put('a', RESPONSE, frozenset(['select', 'users']), cache.generation)
+    cache.put('b', RESPONSE, frozenset(['select', 'users', 'admins']), cache.generation)
+    cache.put('c', RESPONSE, frozenset(['select', 'admins']), cache.generation)
+
+    cache.invalidate(['users'])
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c') is RESPONSE
+    assert (cache.invalidations, cache.size) == (2, SIZE)
+
+    cache.invalidate(None)
+    assert cache.get('c') is None
+    assert (cache.invalidations, cache.size) == (3, 0)
+
+
+def test_clear():
+    cache = ResultCache(max_size=SIZE)
+    cache.put('a', RESPONSE, frozenset(['users']), cache.generation)
+    cache.get('a')
+    cache.clear()
+    assert (len(cache), cache.size, cache.hits) == (0, 0, 0)
+
+
+def test_get_result_cache_size(monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('MAX_WORKERS', raising=False)
+    assert get_result_cache_size(SIZE) == SIZE
+
+    # the results cached by a worker would miss the writes of the others
+    monkeypatch.setenv('MAX_WORKERS', '4')
+    assert get_result_cache_size(SIZE) == 0
+    monkeypatch.setenv('WEB_CONCURRENCY', '1')
+    assert get_result_cache_size(SIZE) == SIZE
+    monkeypatch.setenv('WEB_CONCURRENCY', '2')
+    assert get_result_cache_size(SIZE) == 0
+    assert get_result_cache_size(0) == 0
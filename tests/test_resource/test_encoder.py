@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from local_data_api.resources.encoder import (
+    create_column_encoder,
+    create_json_column_encoder,
+    create_record_encoder,
+    create_record_formatter,
+    encode_sql_value,
+    encode_value,
+    format_field,
+    get_value_encoder,
+)
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        ('str', {'stringValue': 'str'}),
+        (123, {'longValue': 123}),
+        (1.23, {'doubleValue': 1.23}),
+        (True, {'booleanValue': True}),
+        (False, {'booleanValue': False}),
+        (b'bytes', {'blobValue': 'Ynl0ZXM='}),
+        (None, {'isNull': True}),
+        (datetime(2019, 5, 18, 15, 17, 8), {'stringValue': '2019-05-18 15:17:08'}),
+        (
+            datetime(2019, 5, 18, 15, 17, 8, 123456),
+            {'stringValue': '2019-05-18 15:17:08.123'},
+        ),
+    ],
+)
+def test_encode_value(value, expected):
+    assert encode_value(value) == expected
+
+
+def test_encode_value_unsupported():
+    assert get_value_encoder(Decimal) is None
+    with pytest.raises(Exception) as e:
+        encode_value(Decimal('1.5'))
+    assert str(e.value) == "unsupported type <class 'decimal.Decimal'>: 1.5 "
+
+
+def test_column_encoder():
+    encode = create_column_encoder()
+    assert encode(1) == {'longValue': 1}
+    assert encode(None) == {'isNull': True}
+    assert encode(2) == {'longValue': 2}
+    # SQLite columns may hold values of any type
+    assert encode('abc') == {'stringValue': 'abc'}
+    assert encode(True) == {'booleanValue': True}
+    with pytest.raises(Exception):
+        encode(Decimal('1.5'))
+
+
+def test_record_encoder():
+    encode_record = create_record_encoder(
+        [create_column_encoder(), create_column_encoder()]
+    )
+    assert encode_record((1, 'abc')) == [{'longValue': 1}, {'stringValue': 'abc'}]
+    assert encode_record((None, b'a')) == [{'isNull': True}, {'blobValue': 'YQ=='}]
+
+
+def test_encode_sql_value():
+    assert encode_sql_value({'longValue': 1}) == {'bigIntValue': 1}
+    assert encode_sql_value({'booleanValue': True}) == {'bitValue': True}
+    assert encode_sql_value({'stringValue': 'a'}) == {'stringValue': 'a'}
+    assert encode_sql_value({'isNull': True}) == {'isNull': True}
+
+
+def test_json_column_encoder():
+    encode = create_json_column_encoder()
+    assert encode(1) == 1
+    assert encode(None) is None
+    assert encode('abc') == 'abc'
+    assert encode(b'a') == 'YQ=='
+    assert encode(Decimal('1.50')) == '1.50'
+    assert encode(datetime(2019, 5, 18, 15, 17, 8, 123456)) == '2019-05-18 15:17:08.123'
+    with pytest.raises(Exception):
+        encode(object())
+
+
+def test_record_formatter():
+    format_record = create_record_formatter(
+        ['id', 'name'], [create_json_column_encoder(), create_json_column_encoder()]
+    )
+    assert format_record((1, 'abc')) == {'id': 1, 'name': 'abc'}
+    assert format_record((None, b'a')) == {'id': None, 'name': 'YQ=='}
+
+
+def test_format_field():
+    assert format_field({'longValue': 1}) == 1
+    assert format_field({'isNull': True}) is None
@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import os
+from array import array
 from base64 import b64encode
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 
 import jaydebeapi
 import pytest
+from sqlalchemy.dialects import mysql
 
-from local_data_api.models import ColumnMetadata, Field
-from local_data_api.resources.jdbc import JDBC, attach_thread_to_jvm, connection_maker
+from local_data_api.exceptions import BadRequestException
+from local_data_api.models import ColumnMetadata, Field, UpdateResult
+from local_data_api.resources.jdbc import (
+    COLUMN_BOOLEAN,
+    COLUMN_DECIMAL,
+    COLUMN_LONG,
+    COLUMN_OBJECT,
+    JDBC,
+    attach_thread_to_jvm,
+    connection_maker,
+    get_column_reader,
+    load_column_reader,
+    start_jvm,
+)
 from local_data_api.resources.resource import JDBCType
 
 
@@ -20,15 +35,32 @@ class DummyJDBC(JDBC):
 
     JDBC_NAME = 'jdbc:dummy'
     DRIVER = 'dummy'
+    DIALECT = mysql.dialect(paramstyle='named')
+
+
+def mock_result_set(cursor: Any, rows: List[Tuple[Any, ...]]) -> None:
+    """Mock the ResultSet of a jaydebeapi cursor holding rows"""
+    cursor._meta.getColumnCount.return_value = len(rows[0]) if rows else 0
+    cursor._meta.getColumnType.return_value = JDBCType.OTHER.value
+    cursor._converters = {}
+    remaining = iter(rows)
+    cursor._rs.next.side_effect = lambda: next(remaining, None) is not None
+    cursor._rs.getObject.side_effect = [value for row in rows for value in row]
 
-    @staticmethod
-    def reset_generated_id(cursor: jaydebeapi.Cursor) -> None:
-        cursor.execute('SELECT LAST_INSERT_ID(NULL)')
 
-    @staticmethod
-    def last_generated_id(cursor: jaydebeapi.Cursor) -> int:
-        cursor.execute("SELECT LAST_INSERT_ID()")
-        return int(str(cursor.fetchone()[0]))
+def mock_generated_keys(connection: Any, keys: List[int]) -> Any:
+    """Mock the statement of an insert returning generated keys"""
+    statement = connection.jconn.prepareStatement.return_value
+    statement.execute.return_value = False
+    statement.getUpdateCount.return_value = 1
+    result_set = statement.getGeneratedKeys.return_value
+    remaining = iter(keys)
+    result_set.next.side_effect = lambda: next(remaining, None) is not None
+    result_set.getMetaData.return_value.getColumnType.return_value = (
+        JDBCType.BIGINT.value
+    )
+    result_set.getLong.side_effect = keys
+    return statement
 
 
 def test_attach_thread_to_jvm(mocker):
@@ -48,8 +80,32 @@ def test_attach_thread_to_jvm(mocker):
     mock_current_thread.setContextClassLoader.assert_called_once_with('abc')
 
 
+def test_start_jvm(mocker):
+    mock_jpype = mocker.Mock()
+    mock_jpype.isJVMStarted.return_value = False
+    mock_jpype.getDefaultJVMPath.return_value = 'libjvm.so'
+    mocker.patch.dict('sys.modules', jpype=mock_jpype)
+    mocker.patch('jaydebeapi._get_classpath', return_value=['env.jar'])
+
+    start_jvm('test.jar', ['lib'], ['-Xmx512m'], ['extra.jar'])
+    mock_jpype.startJVM.assert_called_once_with(
+        'libjvm.so',
+        '-Xmx512m',
+        f'-Djava.class.path=test.jar{os.pathsep}extra.jar{os.pathsep}env.jar',
+        '-Djava.library.path=lib',
+        ignoreUnrecognized=True,
+        convertStrings=True,
+    )
+
+    mock_jpype.reset_mock()
+    mock_jpype.isJVMStarted.return_value = True
+    start_jvm('test.jar')
+    mock_jpype.startJVM.assert_not_called()
+
+
 def test_connection(mocker):
     mocker.patch('local_data_api.resources.jdbc.attach_thread_to_jvm')
+    mock_start_jvm = mocker.patch('local_data_api.resources.jdbc.start_jvm')
     mock_jaydebeapi = mocker.patch('local_data_api.resources.jdbc.jaydebeapi')
     connection = connection_maker(
         jclassname='jdbc:db',
@@ -62,6 +118,7 @@ def test_connection(mocker):
     mock_jaydebeapi.connect.assert_called_once_with(
         'jdbc:db', 'localhost', {'user': 'root'}, 'test.jar', 'lib.so'
     )
+    mock_start_jvm.assert_called_once_with('test.jar', 'lib.so')
 
 
 def test_create_column_metadata_set(mocker):
@@ -123,7 +180,7 @@ def test_init(mocker):
         'local_data_api.resources.jdbc.attach_thread_to_jvm'
     )
     DummyJDBC(None)
-    mock_attach_thread_to_jvm.assert_not_called()
+    mock_attach_thread_to_jvm.assert_called_once_with()
 
     mock_attach_thread_to_jvm = mocker.patch(
         'local_data_api.resources.jdbc.attach_thread_to_jvm'
@@ -132,6 +189,177 @@ def test_init(mocker):
     mock_attach_thread_to_jvm.assert_called_once_with()
 
 
+def test_reset_connection(mocker):
+    connection = mocker.Mock(in_transaction=False)
+    DummyJDBC.reset_connection(connection)
+    connection.jconn.rollback.assert_not_called()
+
+    connection.in_transaction = True
+    DummyJDBC.reset_connection(connection)
+    connection.jconn.rollback.assert_called_once_with()
+    connection.jconn.setAutoCommit.assert_not_called()
+    assert connection.in_transaction is False
+
+
+def test_autocommit_off(mocker):
+    connection = mocker.Mock(spec=['jconn', 'commit', 'rollback'])
+    JDBC.autocommit_off(DummyJDBC(connection))
+    connection.jconn.setAutoCommit.assert_called_once_with(False)
+    assert connection.in_transaction is True
+
+    # a pooled connection stays in manual commit mode between requests
+    resource = DummyJDBC(connection)
+    resource.commit()
+    assert connection.in_transaction is False
+    DummyJDBC.reset_connection(connection)
+    JDBC.autocommit_off(resource)
+    resource.rollback()
+    connection.jconn.setAutoCommit.assert_called_once_with(False)
+    connection.jconn.rollback.assert_not_called()
+    assert connection.commit.call_count == 1
+    assert connection.rollback.call_count == 1
+    assert connection.in_transaction is False
+
+
+def test_ping(mocker):
+    connection = mocker.Mock()
+    connection.jconn.isValid.return_value = True
+    assert DummyJDBC.ping(connection) is True
+    connection.jconn.isValid.assert_called_once_with(5)
+
+    connection.jconn.isValid.side_effect = Exception('closed')
+    assert DummyJDBC.ping(connection) is False
+
+
+def test_batch_execute(mocker):
+    connection = mocker.Mock()
+    statement = connection.jconn.createStatement.return_value
+    assert (
+        DummyJDBC(connection).batch_execute(
+            "update users set name = :name", [{'name': 'abc'}, {'name': 'def'}]
+        )
+        == []
+    )
+    statement.addBatch.assert_has_calls(
+        [
+            mocker.call("update users set name = 'abc'"),
+            mocker.call("update users set name = 'def'"),
+        ]
+    )
+    statement.executeBatch.assert_called_once_with()
+    statement.getGeneratedKeys.assert_not_called()
+    statement.close.assert_called_once_with()
+
+
+def test_batch_execute_native_binding(mocker):
+    mocker.patch.object(DummyJDBC, 'NATIVE_BINDING', True)
+    mocker.patch.object(DummyJDBC, 'SUPPORTS_GENERATED_KEYS', True)
+    connection = mocker.Mock()
+    statement = connection.jconn.prepareStatement.return_value
+    result_set = statement.getGeneratedKeys.return_value
+    result_set.next.side_effect = [True, True, False]
+    result_set.getMetaData.return_value.getColumnType.return_value = (
+        JDBCType.BIGINT.value
+    )
+    result_set.getLong.side_effect = [1, 2]
+    assert DummyJDBC(connection).batch_execute(
+        "insert into users (id, name) values (:id, :name)",
+        [{'id': 1, 'name': 'abc'}, {'id': 2, 'name': 'def'}],
+    ) == [
+        UpdateResult(generatedFields=[Field(longValue=1)]),
+        UpdateResult(generatedFields=[Field(longValue=2)]),
+    ]
+    connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users (id, name) values (?, ?)", 1
+    )
+    statement.setObject.assert_has_calls(
+        [
+            mocker.call(1, 1),
+            mocker.call(2, 'abc'),
+            mocker.call(1, 2),
+            mocker.call(2, 'def'),
+        ]
+    )
+    assert statement.addBatch.call_count == 2
+    statement.executeBatch.assert_called_once_with()
+    result_set.close.assert_called_once_with()
+    statement.close.assert_called_once_with()
+
+
+def test_batch_execute_native_binding_question_mark(mocker):
+    mocker.patch.object(DummyJDBC, 'NATIVE_BINDING', True)
+    connection = mocker.Mock()
+    cursor = connection.cursor.return_value
+    assert (
+        DummyJDBC(connection).batch_execute(
+            "update users set name = :name where data ? 'key'",
+            [{'name': 'abc'}, {'name': 'def'}],
+        )
+        == []
+    )
+    # the ? operator would be taken for a parameter of a PreparedStatement
+    connection.jconn.prepareStatement.assert_not_called()
+    cursor.execute.assert_has_calls(
+        [
+            mocker.call("update users set name = 'abc' where data ? 'key'"),
+            mocker.call("update users set name = 'def' where data ? 'key'"),
+        ]
+    )
+
+
+def test_batch_execute_generated_keys(mocker):
+    mocker.patch.object(DummyJDBC, 'SUPPORTS_GENERATED_KEYS', True)
+    connection = mocker.Mock()
+    statement = mock_generated_keys(connection, [1, 2])
+    assert DummyJDBC(connection).batch_execute(
+        "insert into users (name) values (:name)", [{'name': 'abc'}, {'name': 'def'}]
+    ) == [
+        UpdateResult(generatedFields=[Field(longValue=1)]),
+        UpdateResult(generatedFields=[Field(longValue=2)]),
+    ]
+    # prepared to return keys even though parameters are rendered as literals
+    connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users (name) values (?)", 1
+    )
+    statement.setObject.assert_has_calls([mocker.call(1, 'abc'), mocker.call(1, 'def')])
+    connection.jconn.createStatement.assert_not_called()
+    statement.close.assert_called_once_with()
+
+
+def test_batch_execute_exception(mocker):
+    connection = mocker.Mock()
+    statement = connection.jconn.createStatement.return_value
+    cause = mocker.Mock()
+    cause.cause.message = 'cause_error_message'
+    error = Exception(cause)
+    statement.executeBatch.side_effect = error
+    with pytest.raises(BadRequestException) as e:
+        DummyJDBC(connection).batch_execute(
+            "update users set name = :name", [{'name': 'abc'}]
+        )
+    assert e.value.message == 'cause_error_message'
+    statement.close.assert_called_once_with()
+
+    with pytest.raises(BadRequestException) as e:
+        DummyJDBC(connection).batch_execute("update users set name = :name", [{}])
+    assert e.value.message == 'Cannot find parameter: name'
+
+
+def test_get_generated_keys(mocker):
+    connection = mocker.Mock()
+    statement = mock_generated_keys(connection, [1, 2])
+    assert DummyJDBC.get_generated_keys(statement) == [1, 2]
+    statement.getGeneratedKeys.return_value.close.assert_called_once_with()
+
+    statement = mock_generated_keys(mocker.Mock(), [1])
+    result_set = statement.getGeneratedKeys.return_value
+    result_set.getMetaData.return_value.getColumnType.return_value = (
+        JDBCType.VARCHAR.value
+    )
+    assert DummyJDBC.get_generated_keys(statement) == []
+    result_set.getLong.assert_not_called()
+
+
 def test_create_connection_maker(mocker):
     mock_connect = mocker.patch('local_data_api.resources.jdbc.connection_maker')
     connection_maker = DummyJDBC.create_connection_maker(
@@ -191,3 +419,175 @@ def test_get_filed_from_jdbc_type(value, jdbc_type, expected):
         .dict(exclude_unset=True)
         == expected
     )
+
+
+def test_create_record_converter(mocker):
+    dummy = DummyJDBC(None)
+    column_metadata_set = [
+        ColumnMetadata(type=JDBCType.BIGINT.value),
+        ColumnMetadata(type=JDBCType.DECIMAL.value),
+        ColumnMetadata(type=JDBCType.VARCHAR.value),
+        ColumnMetadata(type=None),
+    ]
+    dummy.create_column_metadata_set = mocker.Mock(return_value=column_metadata_set)
+    encode_record, metadata = dummy.create_record_converter(mocker.Mock())
+    assert metadata is None
+    assert encode_record((1, 1.5, 'abc', 2.5)) == [
+        {'longValue': 1},
+        {'stringValue': '1.5'},
+        {'stringValue': 'abc'},
+        {'doubleValue': 2.5},
+    ]
+    assert encode_record((None, None, None, None)) == [{'isNull': True}] * 4
+
+    _, metadata = dummy.create_record_converter(mocker.Mock(), True)
+    assert metadata == column_metadata_set
+
+
+def test_create_record_formatter(mocker):
+    dummy = DummyJDBC(None)
+    dummy.create_column_metadata_set = mocker.Mock(
+        return_value=[
+            ColumnMetadata(label='id', type=JDBCType.BIGINT.value),
+            ColumnMetadata(label='price', type=JDBCType.DECIMAL.value),
+            ColumnMetadata(label='ratio', type=None),
+        ]
+    )
+    format_record = dummy.create_record_formatter(mocker.Mock())
+    assert format_record((1, 1.5, 2.5)) == {'id': 1, 'price': '1.5', 'ratio': 2.5}
+    assert format_record((None, None, None)) == {
+        'id': None,
+        'price': None,
+        'ratio': None,
+    }
+
+
+def test_create_row_fetcher(mocker):
+    cursor = mocker.Mock()
+    mock_result_set(cursor, [(1, 'a'), (2, 'b'), (3, 'c')])
+    fetch = DummyJDBC(None).create_row_fetcher(cursor)
+    assert fetch(2) == [(1, 'a'), (2, 'b')]
+    assert fetch(None) == [(3, 'c')]
+    assert fetch(2) == []
+    cursor._meta.getColumnCount.assert_called_once_with()
+    assert cursor._meta.getColumnType.call_count == 2
+    cursor.fetchone.assert_not_called()
+
+
+def mock_columns(mocker: Any, size: int, values: List[Any], nulls: List[Any]) -> Any:
+    """Mock the columns read by ColumnReader.read()"""
+    return mocker.Mock(size=size, values=values, nulls=nulls)
+
+
+def test_create_row_fetcher_column_reader(mocker):
+    cursor = mocker.Mock()
+    cursor._meta.getColumnCount.return_value = 4
+    cursor._meta.getColumnType.side_effect = [
+        JDBCType.INTEGER.value,
+        JDBCType.BOOLEAN.value,
+        JDBCType.DECIMAL.value,
+        JDBCType.VARCHAR.value,
+    ]
+    cursor._converters = {
+        JDBCType.INTEGER.value: jaydebeapi._DEFAULT_CONVERTERS['INTEGER'],
+        JDBCType.BOOLEAN.value: jaydebeapi._DEFAULT_CONVERTERS['BOOLEAN'],
+        JDBCType.DECIMAL.value: jaydebeapi._DEFAULT_CONVERTERS['DECIMAL'],
+    }
+    column_reader = mocker.Mock()
+    column_reader.read.side_effect = [
+        mock_columns(
+            mocker,
+            2,
+            [array('q', [1, 0]), bytes([1, 0]), [1, 2.5], ['a', None]],
+            [bytes([0, 1]), bytes([0, 1]), bytes(2), bytes(2)],
+        ),
+        mock_columns(
+            mocker,
+            1,
+            [array('q', [3, 0]), bytes([0, 0]), [None, None], ['c', None]],
+            [bytes(2), bytes(2), bytes(2), bytes(2)],
+        ),
+    ]
+    mocker.patch(
+        'local_data_api.resources.jdbc.get_column_reader', return_value=column_reader
+    )
+    mocker.patch('local_data_api.resources.jdbc.COLUMN_READER_BATCH_SIZE', 2)
+    fetch = DummyJDBC(None).create_row_fetcher(cursor)
+    assert fetch(None) == [(1, 1, 1, 'a'), (None, None, 2.5, None), (3, 0, None, 'c')]
+    kinds = [COLUMN_LONG, COLUMN_BOOLEAN, COLUMN_DECIMAL, COLUMN_OBJECT]
+    column_reader.read.assert_has_calls(
+        [mocker.call(cursor._rs, kinds, 2), mocker.call(cursor._rs, kinds, 2)]
+    )
+    cursor._rs.next.assert_not_called()
+
+
+def test_create_row_fetcher_column_reader_unsupported(mocker):
+    cursor = mocker.Mock()
+    mock_result_set(cursor, [(1,)])
+    cursor._meta.getColumnType.return_value = JDBCType.TIMESTAMP.value
+    cursor._converters = {JDBCType.TIMESTAMP.value: lambda rs, col: rs.getObject(col)}
+    column_reader = mocker.Mock()
+    mocker.patch(
+        'local_data_api.resources.jdbc.get_column_reader', return_value=column_reader
+    )
+    # a column converted in Python is read per row
+    assert DummyJDBC(None).create_row_fetcher(cursor)(None) == [(1,)]
+    column_reader.read.assert_not_called()
+
+
+def test_get_column_reader(mocker):
+    mock_jpype = mocker.Mock()
+    mock_jpype.isJVMStarted.return_value = False
+    mocker.patch.dict('sys.modules', jpype=mock_jpype)
+    load_column_reader.cache_clear()
+    assert get_column_reader() is None
+
+    mock_jpype.isJVMStarted.return_value = True
+    assert get_column_reader() is mock_jpype.JClass.return_value
+    mock_jpype.JClass.assert_called_once_with('com.koxudaxi.localDataApi.ColumnReader')
+
+    load_column_reader.cache_clear()
+    mock_jpype.JClass.side_effect = Exception('not found')
+    assert get_column_reader() is None
+    load_column_reader.cache_clear()
+
+
+def test_execute_cursor_fetch_size(mocker):
+    mocker.patch('local_data_api.resources.jdbc.JDBC_FETCH_SIZE', 500)
+    connection = mocker.Mock()
+    cursor = mocker.Mock()
+    statement = connection.jconn.prepareStatement.return_value
+    statement.execute.return_value = True
+    DummyJDBC(connection).execute_cursor(cursor, 'select * from users')
+    connection.jconn.prepareStatement.assert_called_once_with('select * from users')
+    statement.setFetchSize.assert_called_once_with(500)
+    cursor.execute.assert_not_called()
+    assert cursor._prep is statement
+    assert cursor._rs is statement.getResultSet.return_value
+    assert cursor._meta is statement.getResultSet.return_value.getMetaData.return_value
+    assert cursor.rowcount == -1
+
+    statement.execute.return_value = False
+    statement.getUpdateCount.return_value = 2
+    DummyJDBC(connection).execute_cursor(
+        cursor, 'update users set name = :name', {'name': 'abc'}
+    )
+    assert cursor.rowcount == 2
+    statement.getGeneratedKeys.assert_not_called()
+
+
+def test_create_connection_maker_fetch_size(mocker):
+    mocker.patch('local_data_api.resources.jdbc.JDBC_FETCH_SIZE', 500)
+    mocker.patch.object(DummyJDBC, 'FETCH_SIZE_PROPERTY', 'defaultFetchSize')
+    connection_maker_mock = mocker.patch(
+        'local_data_api.resources.jdbc.connection_maker'
+    )
+    DummyJDBC.create_connection_maker(
+        'localhost', 3306, 'root', 'pw', {'JAR_PATH': 'test.jar'}
+    )
+    connection_maker_mock.assert_called_once_with(
+        'dummy',
+        'jdbc:dummy://localhost:3306/',
+        {'user': 'root', 'password': 'pw', 'defaultFetchSize': '500'},
+        'test.jar',
+    )
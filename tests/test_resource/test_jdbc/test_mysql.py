@@ -8,6 +8,7 @@ import pytest
 from local_data_api.exceptions import BadRequestException
 from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
 from local_data_api.resources.jdbc.mysql import MySQLJDBC
+from tests.test_resource.test_jdbc.test_jdbc import mock_generated_keys, mock_result_set
 from tests.test_resource.test_resource import helper_default_test_field
 
 DATABASE_SETTINGS: Dict[str, Dict[str, Union[str, int]]] = {
@@ -33,80 +34,105 @@ def mocked_cursor(mocked_connection, mocker):
 
 def test_execute_insert(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = ''
-    mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
+    statement = mock_generated_keys(mocked_connection, [])
     dummy = MySQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users values (1, 'abc')"
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [
-            mocker.call('SELECT LAST_INSERT_ID(NULL)'),
-            mocker.call("insert into users values (1, 'abc')"),
-            mocker.call('SELECT LAST_INSERT_ID()'),
-        ]
+    mocked_connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users values (1, 'abc')", 1
     )
+    mocked_cursor._set_stmt_parms.assert_called_once_with(statement, ())
+    statement.execute.assert_called_once_with()
+    mocked_cursor.execute.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
     mocked_cursor = mocker.Mock()
     mocked_connection.cursor.side_effect = [mocked_cursor]
     mocked_cursor.description = ''
-    mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
+    mock_generated_keys(mocked_connection, [])
     assert dummy.execute(
         "insert into users values (1, 'abc')"
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [
-            mocker.call('SELECT LAST_INSERT_ID(NULL)'),
-            mocker.call("insert into users values (1, 'abc')"),
-            mocker.call('SELECT LAST_INSERT_ID()'),
-        ]
-    )
+    mocked_cursor.execute.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
 
 def test_execute_insert_with_generated_field(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = ''
-    mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[1]]
+    statement = mock_generated_keys(mocked_connection, [1])
     dummy = MySQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users (name) values ('abc')"
     ) == ExecuteStatementResponse(
         numberOfRecordsUpdated=1, generatedFields=[Field(longValue=1)]
     )
-    mocked_cursor.execute.assert_has_calls(
-        [
-            mocker.call('SELECT LAST_INSERT_ID(NULL)'),
-            mocker.call("insert into users (name) values ('abc')"),
-            mocker.call('SELECT LAST_INSERT_ID()'),
-        ]
+    mocked_connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users (name) values ('abc')", 1
     )
+    statement.getGeneratedKeys.return_value.close.assert_called_once_with()
+    mocked_cursor.execute.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
 
 def test_execute_insert_with_params(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = ''
-    mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
+    mock_generated_keys(mocked_connection, [])
     dummy = MySQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users values (:id, :name)", {'id': 1, 'name': 'abc'}
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [
-            mocker.call('SELECT LAST_INSERT_ID(NULL)'),
-            mocker.call("insert into users values (1, 'abc')"),
-            mocker.call('SELECT LAST_INSERT_ID()'),
-        ]
+    mocked_connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users values (1, 'abc')", 1
+    )
+    mocked_cursor.close.assert_called_once_with()
+
+
+def test_execute_insert_with_native_binding(mocked_connection, mocked_cursor, mocker):
+    mocker.patch.object(MySQLJDBC, 'NATIVE_BINDING', True)
+    mocked_cursor.description = ''
+    statement = mock_generated_keys(mocked_connection, [])
+    dummy = MySQLJDBC(mocked_connection)
+    assert dummy.execute(
+        "insert into users values (:id, :name)", {'id': 1, 'name': 'abc'}
+    ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
+    mocked_connection.jconn.prepareStatement.assert_called_once_with(
+        "insert into users values (?, ?)", 1
     )
+    mocked_cursor._set_stmt_parms.assert_called_once_with(statement, [1, 'abc'])
+    mocked_cursor.close.assert_called_once_with()
+
+
+def test_execute_insert_exception(mocked_connection, mocked_cursor, mocker):
+    statement = mock_generated_keys(mocked_connection, [])
+    statement.execute.side_effect = Exception('error')
+    handle_sql_exception = mocker.patch(
+        'jaydebeapi._handle_sql_exception',
+        side_effect=jaydebeapi.DatabaseError('error_message'),
+    )
+    dummy = MySQLJDBC(mocked_connection)
+    with pytest.raises(BadRequestException) as e:
+        dummy.execute("insert into users values (1, 'abc')")
+    assert e.value.message == 'error_message'
+    handle_sql_exception.assert_called_once_with()
+    mocked_cursor.close.assert_called_once_with()
+
+
+def test_execute_update(mocked_connection, mocked_cursor, mocker):
+    mocked_cursor.description = ''
+    mocked_cursor.rowcount = 2
+    dummy = MySQLJDBC(mocked_connection)
+    assert dummy.execute("update users set name = 'abc'") == ExecuteStatementResponse(
+        numberOfRecordsUpdated=2, generatedFields=[]
+    )
+    mocked_cursor.execute.assert_called_once_with("update users set name = 'abc'")
+    mocked_connection.jconn.prepareStatement.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
 
 def test_execute_select(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mock_result_set(mocked_cursor, [(1, 'abc')])
     dummy = MySQLJDBC(mocked_connection, transaction_id='123')
     dummy.create_column_metadata_set = create_column_metadata_set_mock = mocker.Mock()
     create_column_metadata_set_mock.side_effect = [
@@ -147,9 +173,25 @@ def test_execute_select(mocked_connection, mocked_cursor, mocker):
         records=[[dummy.get_field_from_value(1), dummy.get_field_from_value('abc')]],
     )
 
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call('SELECT LAST_INSERT_ID(NULL)'), mocker.call('select * from users')]
+    mocked_cursor.execute.assert_called_once_with('select * from users')
+    mocked_cursor.close.assert_called_once_with()
+
+
+def test_execute_stream(mocked_connection, mocked_cursor, mocker):
+    attach_thread_to_jvm = mocker.patch(
+        'local_data_api.resources.jdbc.attach_thread_to_jvm'
     )
+    mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
+    mock_result_set(mocked_cursor, [(1, 1.5)])
+    dummy = MySQLJDBC(mocked_connection)
+    dummy.create_column_metadata_set = mocker.Mock(
+        return_value=[ColumnMetadata(type=-5), ColumnMetadata(type=3)]
+    )
+    assert ''.join(dummy.execute_stream("select * from users", fetch_size=10)) == (
+        '{"numberOfRecordsUpdated":0,"records":[[{"longValue":1},{"stringValue":"1.5"}]]}'
+    )
+    # on creation and for each of the 4 chunks
+    assert attach_thread_to_jvm.call_count == 5
     mocked_cursor.close.assert_called_once_with()
 
 
@@ -157,7 +199,7 @@ def test_execute_select_with_include_metadata(mocked_connection, mocked_cursor,
     meta_mock = mocker.Mock()
     mocked_cursor._meta = meta_mock
     mocked_cursor.description = (1, 2, 3, 4, 5, 6, 7), (8, 9, 10, 11, 12, 13, 14)
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mock_result_set(mocked_cursor, [(1, 'abc')])
     dummy = MySQLJDBC(mocked_connection, transaction_id='123')
     dummy.create_column_metadata_set = create_column_metadata_set_mock = mocker.Mock()
     create_column_metadata_set_mock.side_effect = [
@@ -231,22 +273,20 @@ def test_execute_select_with_include_metadata(mocked_connection, mocked_cursor,
     )
 
     create_column_metadata_set_mock.assert_called_once_with(mocked_cursor)
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call('SELECT LAST_INSERT_ID(NULL)'), mocker.call('select * from users')]
-    )
+    mocked_cursor.execute.assert_called_once_with('select * from users')
     mocked_cursor.close.assert_called_once_with()
 
 
 def test_execute_exception_1(mocked_connection, mocked_cursor, mocker):
     error = jaydebeapi.DatabaseError('error_message')
     error.args = ['error_message']
-    mocked_cursor.execute.side_effect = [0, error]
+    mocked_cursor.execute.side_effect = [error]
     mocked_connection.cursor.side_effect = [mocked_cursor]
     dummy = MySQLJDBC(mocked_connection, transaction_id='123')
     with pytest.raises(BadRequestException) as e:
         dummy.execute("select * from users")
     assert e.value.message == 'error_message'
-    mocked_cursor.execute.assert_has_calls([mocker.call('SELECT LAST_INSERT_ID(NULL)')])
+    mocked_cursor.execute.assert_called_once_with('select * from users')
     mocked_cursor.close.assert_called_once_with()
 
 
@@ -257,13 +297,13 @@ def test_execute_exception_2(mocked_connection, mocked_cursor, mocker):
     inner_error = mocker.Mock()
     inner_error.args = [cause]
     error.args = [inner_error]
-    mocked_cursor.execute.side_effect = [0, error]
+    mocked_cursor.execute.side_effect = [error]
     mocked_connection.cursor.side_effect = [mocked_cursor]
     dummy = MySQLJDBC(mocked_connection, transaction_id='123')
     with pytest.raises(BadRequestException) as e:
         dummy.execute("select * from users")
     assert e.value.message == 'cause_error_message'
-    mocked_cursor.execute.assert_has_calls([mocker.call('SELECT LAST_INSERT_ID(NULL)')])
+    mocked_cursor.execute.assert_called_once_with('select * from users')
     mocked_cursor.close.assert_called_once_with()
 
 
@@ -280,13 +320,13 @@ def test_execute_exception_4(mocked_connection, mocked_cursor, mocker):
     inner_error = mocker.Mock()
     inner_error.args = ['inner_error_message']
     error.args = [inner_error]
-    mocked_cursor.execute.side_effect = [0, error]
+    mocked_cursor.execute.side_effect = [error]
     mocked_connection.cursor.side_effect = [mocked_cursor]
     dummy = MySQLJDBC(mocked_connection, transaction_id='123')
     with pytest.raises(BadRequestException) as e:
         dummy.execute("select * from users")
     assert e.value.message == 'inner_error_message'
-    mocked_cursor.execute.assert_has_calls([mocker.call('SELECT LAST_INSERT_ID(NULL)')])
+    mocked_cursor.execute.assert_called_once_with('select * from users')
     mocked_cursor.close.assert_called_once_with()
 
 
@@ -8,6 +8,7 @@ import pytest
 from local_data_api.exceptions import BadRequestException
 from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
 from local_data_api.resources.jdbc.postgres import PostgreSQLJDBC
+from tests.test_resource.test_jdbc.test_jdbc import mock_result_set
 from tests.test_resource.test_resource import helper_default_test_field
 
 DATABASE_SETTINGS: Dict[str, Dict[str, Union[str, int]]] = {
@@ -34,61 +35,61 @@ def mocked_cursor(mocked_connection, mocker):
 def test_execute_insert(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = ''
     mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
     dummy = PostgreSQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users values (1, 'abc')"
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call("insert into users values (1, 'abc')")]
-    )
+    mocked_cursor.execute.assert_called_once_with("insert into users values (1, 'abc')")
+    mocked_connection.jconn.prepareStatement.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
-    mocked_cursor = mocker.Mock()
-    mocked_connection.cursor.side_effect = [mocked_cursor]
-    mocked_cursor.description = ''
-    mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
-    assert dummy.execute(
-        "insert into users values (1, 'abc')"
-    ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call("insert into users values (1, 'abc')")]
-    )
-    mocked_cursor.close.assert_called_once_with()
 
-
-def test_execute_insert_with_generated_field(mocked_connection, mocked_cursor, mocker):
+def test_execute_insert_without_generated_field(
+    mocked_connection, mocked_cursor, mocker
+):
+    # the driver would append `RETURNING *` to a statement asked for its keys
     mocked_cursor.description = ''
     mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[1]]
     dummy = PostgreSQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users (name) values ('abc')"
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call("insert into users (name) values ('abc')")]
-    )
+    mocked_connection.jconn.prepareStatement.assert_not_called()
     mocked_cursor.close.assert_called_once_with()
 
 
 def test_execute_insert_with_params(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = ''
     mocked_cursor.rowcount = 1
-    mocked_cursor.fetchone.side_effect = [[0]]
     dummy = PostgreSQLJDBC(mocked_connection)
     assert dummy.execute(
         "insert into users values (:id, :name)", {'id': 1, 'name': 'abc'}
     ) == ExecuteStatementResponse(numberOfRecordsUpdated=1, generatedFields=[])
-    mocked_cursor.execute.assert_has_calls(
-        [mocker.call("insert into users values (1, 'abc')")]
-    )
+    mocked_cursor.execute.assert_called_once_with("insert into users values (1, 'abc')")
     mocked_cursor.close.assert_called_once_with()
 
 
+def test_execute_insert_returning(mocked_connection, mocked_cursor, mocker):
+    mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
+    mock_result_set(mocked_cursor, [(1,)])
+    dummy = PostgreSQLJDBC(mocked_connection)
+    dummy.create_column_metadata_set = mocker.Mock(
+        return_value=[ColumnMetadata(type=-5)]
+    )
+    assert dummy.execute(
+        "insert into users (name) values ('abc') returning id"
+    ) == ExecuteStatementResponse(
+        numberOfRecordsUpdated=0, records=[[Field(longValue=1)]]
+    )
+    mocked_cursor.execute.assert_called_once_with(
+        "insert into users (name) values ('abc') returning id"
+    )
+    mocked_connection.jconn.prepareStatement.assert_not_called()
+
+
 def test_execute_select(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = 1, 1, 1, 1, 1, 1, 1
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mock_result_set(mocked_cursor, [(1, 'abc')])
     dummy = PostgreSQLJDBC(mocked_connection, transaction_id='123')
     dummy.create_column_metadata_set = create_column_metadata_set_mock = mocker.Mock()
     create_column_metadata_set_mock.side_effect = [
@@ -134,7 +135,7 @@ def test_execute_select(mocked_connection, mocked_cursor, mocker):
 
 def test_execute_select_with_include_metadata(mocked_connection, mocked_cursor, mocker):
     mocked_cursor.description = (1, 2, 3, 4, 5, 6, 7), (8, 9, 10, 11, 12, 13, 14)
-    mocked_cursor.fetchall.side_effect = [((1, 'abc'),)]
+    mock_result_set(mocked_cursor, [(1, 'abc')])
     dummy = PostgreSQLJDBC(mocked_connection, transaction_id='123')
     dummy.create_column_metadata_set = create_column_metadata_set_mock = mocker.Mock()
     create_column_metadata_set_mock.side_effect = [
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 import pytest
+from pymysql.constants import COMMAND
+from pymysql.cursors import SSCursor
 
-from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
+from local_data_api.models import (
+    ColumnMetadata,
+    ExecuteStatementResponse,
+    Field,
+    UpdateResult,
+)
 from local_data_api.resources import MySQL
 from local_data_api.resources.resource import CONNECTION_POOL, RESOURCE_METAS
 from tests.test_resource.test_resource import helper_default_test_field
@@ -45,7 +52,7 @@ def test_execute_select_with_include_metadata(clear, mocker):
     cursor_mock = mocker.Mock()
     connection_mock.cursor.side_effect = [cursor_mock]
     cursor_mock.description = (1, 2, 3, 4, 5, 6, 7), (8, 9, 10, 11, 12, 13, 14)
-    cursor_mock.fetchall.side_effect = [((1, 'abc'),)]
+    cursor_mock.fetchmany.side_effect = [((1, 'abc'),), ()]
     field_1 = mocker.Mock()
     field_1.name = '1'
     field_1.org_name = '1'
@@ -112,3 +119,141 @@ def test_from_value(mocker) -> None:
     connection_mock = mocker.Mock()
     dummy = MySQL(connection_mock)
     helper_default_test_field(dummy)
+
+
+def test_reset_connection(mocker):
+    connection_mock = mocker.Mock()
+    connection_mock.server_status = 0
+    MySQL.reset_connection(connection_mock)
+    connection_mock.rollback.assert_not_called()
+
+    connection_mock.server_status = 1
+    MySQL.reset_connection(connection_mock)
+    connection_mock.rollback.assert_called_once_with()
+
+
+def test_ping(mocker):
+    connection_mock = mocker.Mock()
+    assert MySQL.ping(connection_mock) is True
+    connection_mock.ping.assert_called_once_with(reconnect=False)
+
+    connection_mock.ping.side_effect = Exception('gone away')
+    assert MySQL.ping(connection_mock) is False
+
+
+def test_execute_sql(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.description = None
+    cursor_mock.rowcount = 1
+    cursor_mock.nextset.side_effect = [True, None]
+    assert MySQL(connection_mock).execute_sql('delete from a; delete from b;') == [
+        {'numberOfRecordsUpdated': 1},
+        {'numberOfRecordsUpdated': 1},
+    ]
+    cursor_mock.execute.assert_called_once_with('delete from a;\ndelete from b')
+    connection_mock._execute_command.assert_has_calls(
+        [
+            mocker.call(COMMAND.COM_SET_OPTION, b'\x00\x00'),
+            mocker.call(COMMAND.COM_SET_OPTION, b'\x01\x00'),
+        ]
+    )
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_sql_single_statement(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.description = None
+    cursor_mock.rowcount = 1
+    assert MySQL(connection_mock).execute_sql('delete from a') == [
+        {'numberOfRecordsUpdated': 1}
+    ]
+    cursor_mock.execute.assert_called_once_with('delete from a')
+    connection_mock._execute_command.assert_not_called()
+
+
+def test_execute_stream(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.description = ((1, 2, 3, 4, 5, 6, 7),)
+    cursor_mock.fetchmany.side_effect = [((1,),), ()]
+    chunks = MySQL(connection_mock).execute_stream('select id from users', fetch_size=1)
+    assert ''.join(chunks) == (
+        '{"numberOfRecordsUpdated":0,"records":[[{"longValue":1}]]}'
+    )
+    # rows are read from the socket as they are fetched
+    connection_mock.cursor.assert_called_once_with(SSCursor)
+    cursor_mock.fetchall.assert_not_called()
+
+
+def mogrify(query, args):
+    return query % {
+        name: f"'{value}'" if isinstance(value, str) else value
+        for name, value in args.items()
+    }
+
+
+def test_batch_execute_insert(clear, mocker):
+    mocker.patch('local_data_api.resources.mysql.MAX_BATCH_STATEMENT_LENGTH', 50)
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.mogrify.side_effect = mogrify
+    lastrowids = iter([3, 5])
+
+    def execute(_):
+        cursor_mock.lastrowid = next(lastrowids)
+
+    cursor_mock.execute.side_effect = execute
+    assert MySQL(connection_mock).batch_execute(
+        'insert into users (name) values (:name)',
+        [{'name': 'abc'}, {'name': 'def'}, {'name': 'ghi'}],
+    ) == [UpdateResult(generatedFields=[Field(longValue=id_)]) for id_ in (3, 4, 5)]
+    # multi-row INSERTs split at the length of a statement
+    cursor_mock.execute.assert_has_calls(
+        [
+            mocker.call("insert into users (name) values ('abc'),('def')"),
+            mocker.call("insert into users (name) values ('ghi')"),
+        ]
+    )
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_batch_execute_insert_ignore(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.lastrowid = 0
+    assert (
+        MySQL(connection_mock).batch_execute(
+            'insert ignore into users (name) values (:name)',
+            [{'name': 'abc'}, {'name': 'def'}],
+        )
+        == []
+    )
+    # rows which are skipped would shift the counted ids
+    assert cursor_mock.execute.call_count == 2
+    cursor_mock.mogrify.assert_not_called()
+
+
+def test_batch_execute_update(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.mogrify.side_effect = mogrify
+    cursor_mock.nextset.side_effect = [True, None]
+    assert (
+        MySQL(connection_mock).batch_execute(
+            'update users set name = :name where id = :id',
+            [{'id': 1, 'name': 'abc'}, {'id': 2, 'name': 'def'}],
+        )
+        == []
+    )
+    cursor_mock.execute.assert_called_once_with(
+        "update users set name = 'abc' where id = 1;\n"
+        "update users set name = 'def' where id = 2"
+    )
+    connection_mock._execute_command.assert_has_calls(
+        [
+            mocker.call(COMMAND.COM_SET_OPTION, b'\x00\x00'),
+            mocker.call(COMMAND.COM_SET_OPTION, b'\x01\x00'),
+        ]
+    )
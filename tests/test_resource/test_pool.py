@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from local_data_api.exceptions import ServiceUnavailableError
+from local_data_api.resources.pool import ConnectionPool
+
+
+@pytest.fixture
+def connect(mocker):
+    return mocker.Mock(side_effect=lambda: mocker.Mock())
+
+
+@pytest.fixture
+def reset(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def ping(mocker):
+    return mocker.Mock(return_value=True)
+
+
+def test_acquire_creates_connection(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    connection = pool.acquire()
+    assert connect.call_count == 1
+    assert pool.size == 1
+    assert pool.in_use == 1
+    assert pool.idle == 0
+    assert connection is not None
+
+
+def test_release_reuses_connection(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    connection = pool.acquire()
+    pool.release(connection)
+    reset.assert_called_once_with(connection)
+    assert pool.idle == 1
+
+    assert pool.acquire() is connection
+    assert connect.call_count == 1
+    ping.assert_not_called()
+
+
+def test_release_lifo(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    assert pool.acquire() is second
+
+
+def test_release_discards_when_reset_fails(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    connection = pool.acquire()
+    reset.side_effect = Exception('broken')
+    pool.release(connection)
+    connection.close.assert_called_once_with()
+    assert pool.size == 0
+    assert pool.idle == 0
+
+
+def test_acquire_validates_stale_connection(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, validation_interval=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    ping.return_value = False
+
+    new_connection = pool.acquire()
+    ping.assert_called_once_with(connection)
+    connection.close.assert_called_once_with()
+    assert new_connection is not connection
+    assert pool.size == 1
+
+
+def test_acquire_evicts_idle_connections(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, idle_timeout=-1)
+    connection = pool.acquire()
+    pool.release(connection)
+
+    new_connection = pool.acquire()
+    connection.close.assert_called_once_with()
+    assert new_connection is not connection
+    assert pool.size == 1
+
+
+def test_release_evicts_idle_connections(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, idle_timeout=-1)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    first.close.assert_called_once_with()
+    second.close.assert_not_called()
+    assert pool.size == 1
+    assert pool.idle == 1
+
+
+def test_acquire_keeps_min_size(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, min_size=1, idle_timeout=-1)
+    connection = pool.acquire()
+    pool.release(connection)
+
+    assert pool.acquire() is connection
+    connection.close.assert_not_called()
+
+
+def test_acquire_timeout(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, max_size=1, timeout=0.01)
+    pool.acquire()
+    with pytest.raises(ServiceUnavailableError):
+        pool.acquire()
+
+
+def test_acquire_waits_for_release(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping, max_size=1, timeout=5)
+    connection = pool.acquire()
+    timer = threading.Timer(0.05, pool.release, [connection])
+    timer.start()
+    assert pool.acquire() is connection
+    timer.join()
+
+
+def test_acquire_connect_error(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    connect.side_effect = Exception('refused')
+    with pytest.raises(Exception):
+        pool.acquire()
+    assert pool.size == 0
+
+
+def test_close(connect, reset, ping):
+    pool = ConnectionPool(connect, reset, ping)
+    connection = pool.acquire()
+    pool.release(connection)
+    pool.close()
+    connection.close.assert_called_once_with()
+    assert pool.size == 0
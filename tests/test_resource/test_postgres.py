@@ -4,6 +4,7 @@ from psycopg2._psycopg import Column
 
 from local_data_api.models import Field
 from local_data_api.resources import PostgresSQL
+from local_data_api.resources.postgres import STREAM_CURSOR_NAME
 from tests.test_resource.test_resource import helper_default_test_field
 
 
@@ -48,3 +49,80 @@ def test_from_value(mocker) -> None:
     connection_mock = mocker.Mock()
     dummy = PostgresSQL(connection_mock)
     helper_default_test_field(dummy)
+
+
+def test_ping(mocker) -> None:
+    connection_mock = mocker.Mock()
+    connection_mock.closed = 1
+    assert PostgresSQL.ping(connection_mock) is False
+    connection_mock.cursor.assert_not_called()
+
+    connection_mock.closed = 0
+    assert PostgresSQL.ping(connection_mock) is True
+
+
+def test_execute_stream(mocker) -> None:
+    connection_mock = mocker.Mock()
+    connection_mock.autocommit = False
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.name = STREAM_CURSOR_NAME
+    cursor_mock.description = ((1, 2, 3, 4, 5, 6, 7),)
+    cursor_mock.fetchmany.side_effect = [[], [(1,)], []]
+    chunks = PostgresSQL(connection_mock).execute_stream(
+        'select id from users', fetch_size=1
+    )
+    assert ''.join(chunks) == (
+        '{"numberOfRecordsUpdated":0,"records":[[{"longValue":1}]]}'
+    )
+    connection_mock.cursor.assert_called_once_with(name=STREAM_CURSOR_NAME)
+    # the first FETCH only describes the rows
+    assert cursor_mock.fetchmany.call_args_list == [
+        mocker.call(0),
+        mocker.call(1),
+        mocker.call(1),
+    ]
+
+
+def test_create_stream_cursor(mocker) -> None:
+    connection_mock = mocker.Mock()
+    connection_mock.autocommit = False
+    dummy = PostgresSQL(connection_mock)
+    dummy.create_stream_cursor('with t as (select 1) select * from t')
+    connection_mock.cursor.assert_called_once_with(name=STREAM_CURSOR_NAME)
+
+    # DECLARE takes no statements changing rows
+    for sql in (
+        "insert into users values (1) returning id",
+        'with t as (delete from users returning id) select * from t',
+        'select * into copied from users',
+    ):
+        connection_mock.cursor.reset_mock()
+        dummy.create_stream_cursor(sql)
+        connection_mock.cursor.assert_called_once_with()
+
+    connection_mock.cursor.reset_mock()
+    connection_mock.autocommit = True
+    dummy.create_stream_cursor('select * from users')
+    connection_mock.cursor.assert_called_once_with()
+
+
+def test_batch_execute(mocker) -> None:
+    execute_batch = mocker.patch(
+        'local_data_api.resources.postgres.psycopg2.extras.execute_batch'
+    )
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    assert (
+        PostgresSQL(connection_mock).batch_execute(
+            "insert into users (name) values (:name) -- 100%",
+            [{'name': 'abc'}, {'name': 'def'}],
+        )
+        == []
+    )
+    execute_batch.assert_called_once_with(
+        cursor_mock,
+        'insert into users (name) values (%(name)s) -- 100%%',
+        [{'name': 'abc'}, {'name': 'def'}],
+        page_size=100,
+    )
+    cursor_mock.close.assert_called_once_with()
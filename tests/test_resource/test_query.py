@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from local_data_api.exceptions import BadRequestException
+from local_data_api.resources.query import (
+    ParsedQuery,
+    QueryCache,
+    get_identifiers,
+    get_statement_keyword,
+    get_written_tables,
+    is_cacheable_query,
+    render_literal,
+    split_statements,
+)
+
+MYSQL = mysql.dialect(paramstyle='named')
+POSTGRESQL = postgresql.dialect(paramstyle='named')
+SQLITE = sqlite.dialect(paramstyle='named')
+
+
+def test_parsed_query():
+    parsed_query = ParsedQuery(
+        "select * from users where id = :id and name = :name", MYSQL
+    )
+    assert parsed_query.bind_names == ['id', 'name']
+    assert parsed_query.fragments == [
+        'select * from users where id = ',
+        ' and name = ',
+        '',
+    ]
+
+
+def test_parsed_query_ignores_casts_and_escapes():
+    parsed_query = ParsedQuery(r"select :id, name::text, '\:escaped'", POSTGRESQL)
+    assert parsed_query.bind_names == ['id']
+    assert parsed_query.fragments == ['select ', ", name::text, ':escaped'"]
+
+
+@pytest.mark.parametrize(
+    'dialect, params, expected',
+    [
+        (MYSQL, {'id': 1, 'name': "O'Brien"}, "values (1, 'O''Brien')"),
+        (MYSQL, {'id': None, 'name': 'a\\b'}, "values (NULL, 'a\\\\b')"),
+        (POSTGRESQL, {'id': 1.5, 'name': True}, "values (1.5, true)"),
+        (SQLITE, {'id': 1, 'name': True, 'unused': 1}, "values (1, 1)"),
+    ],
+)
+def test_render(dialect, params, expected):
+    assert ParsedQuery("values (:id, :name)", dialect).render(params, dialect) == (
+        expected
+    )
+
+
+def test_render_missing_param():
+    with pytest.raises(BadRequestException) as e:
+        ParsedQuery("values (:id, :name)", MYSQL).render({'id': 1}, MYSQL)
+    assert e.value.message == 'Cannot find parameter: name'
+
+
+def test_render_literal():
+    assert render_literal(None, MYSQL) == 'NULL'
+    assert render_literal('abc', MYSQL) == "'abc'"
+    assert render_literal(10, MYSQL) == '10'
+
+
+def test_query_cache():
+    cache = QueryCache(max_size=2)
+    parsed_query = cache.get(MYSQL, 'select :a')
+    assert cache.misses == 1
+    assert cache.hits == 0
+
+    assert cache.get(MYSQL, 'select :a') is parsed_query
+    assert cache.hits == 1
+
+    assert cache.get(POSTGRESQL, 'select :a') is not parsed_query
+    assert cache.misses == 2
+    assert len(cache) == 2
+
+
+def test_query_cache_eviction():
+    cache = QueryCache(max_size=2)
+    first = cache.get(MYSQL, 'select :a')
+    cache.get(MYSQL, 'select :b')
+    cache.get(MYSQL, 'select :a')
+    cache.get(MYSQL, 'select :c')
+    assert len(cache) == 2
+    assert cache.get(MYSQL, 'select :a') is first
+    assert cache.misses == 3
+    cache.get(MYSQL, 'select :b')
+    assert cache.misses == 4
+
+
+def test_query_cache_disabled():
+    cache = QueryCache(max_size=0)
+    cache.get(MYSQL, 'select :a')
+    cache.get(MYSQL, 'select :a')
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_query_cache_clear():
+    cache = QueryCache()
+    cache.get(MYSQL, 'select :a')
+    cache.get(MYSQL, 'select :a')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+@pytest.mark.parametrize(
+    'paramstyle, expected',
+    [
+        ('named', "select :id, name from users where name like 'a%' and id = :id"),
+        (
+            'pyformat',
+            "select %(id)s, name from users where name like 'a%%' and id = %(id)s",
+        ),
+        ('qmark', "select ?, name from users where name like 'a%' and id = ?"),
+        ('format', "select %s, name from users where name like 'a%%' and id = %s"),
+    ],
+)
+def test_to_paramstyle(paramstyle, expected):
+    parsed_query = ParsedQuery(
+        "select :id, name from users where name like 'a%' and id = :id", MYSQL
+    )
+    assert parsed_query.to_paramstyle(paramstyle) == expected
+    assert parsed_query.to_paramstyle(paramstyle) is parsed_query.to_paramstyle(
+        paramstyle
+    )
+
+
+def test_supports_paramstyle():
+    parsed_query = ParsedQuery(r"select :id, '\:name', data ? 'key'", MYSQL)
+    assert parsed_query.fragments == ['select ', ", ':name', data ? 'key'"]
+    assert not parsed_query.supports_paramstyle('named')
+    assert not parsed_query.supports_paramstyle('qmark')
+    assert parsed_query.supports_paramstyle('pyformat')
+    assert parsed_query.supports_paramstyle('format')
+    parsed_query = ParsedQuery("select :id, 'name'", MYSQL)
+    assert parsed_query.supports_paramstyle('named')
+    assert parsed_query.supports_paramstyle('qmark')
+
+
+def test_bind():
+    parsed_query = ParsedQuery("values (:id, :name, :id)", MYSQL)
+    params = {'id': 1, 'name': None, 'unused': 'abc'}
+    assert parsed_query.bind(params, 'qmark') == [1, None, 1]
+    assert parsed_query.bind(params, 'format') == [1, None, 1]
+    assert parsed_query.bind(params, 'named') == {'id': 1, 'name': None}
+    assert parsed_query.bind(params, 'pyformat') == {'id': 1, 'name': None}
+
+
+def test_bind_missing_param():
+    with pytest.raises(BadRequestException) as e:
+        ParsedQuery("values (:id, :name)", MYSQL).bind({'id': 1}, 'qmark')
+    assert e.value.message == 'Cannot find parameter: name'
+
+
+@pytest.mark.parametrize(
+    'sql, expected',
+    [
+        ('select 1', 'SELECT'),
+        ('  Insert into users values (1)', 'INSERT'),
+        ('-- comment\nupdate users set id = 1', 'UPDATE'),
+        ('/* multi\nline */ (select 1)', 'SELECT'),
+        ('', ''),
+    ],
+)
+def test_get_statement_keyword(sql, expected):
+    assert get_statement_keyword(sql) == expected
+    assert ParsedQuery(sql, MYSQL).keyword == expected
+
+
+@pytest.mark.parametrize(
+    'dialect, sql, expected',
+    [
+        (MYSQL, 'select 1; select 2;', ['select 1', 'select 2']),
+        (
+            MYSQL,
+            "insert into t values ('a;b', \"c;\", `d;`, 'e\\';f');;",
+            ["insert into t values ('a;b', \"c;\", `d;`, 'e\\';f')"],
+        ),
+        (MYSQL, '-- a;\n# b;\nselect 1; /* c; */', ['-- a;\n# b;\nselect 1']),
+        (
+            POSTGRESQL,
+            "create function f() returns int as $$ select 1; $$ language sql; "
+            "select $a$;$a$, 'b\\'; select E'c\\';d'",
+            [
+                'create function f() returns int as $$ select 1; $$ language sql',
+                "select $a$;$a$, 'b\\'",
+                "select E'c\\';d'",
+            ],
+        ),
+        (SQLITE, "select ';'; # not a comment", ["select ';'", '# not a comment']),
+        (SQLITE, ' ;  -- nothing', []),
+    ],
+)
+def test_split_statements(dialect, sql, expected):
+    assert split_statements(sql, dialect) == expected
+
+
+def test_get_identifiers():
+    assert get_identifiers('SELECT u.id FROM `Users` u WHERE id = 1') == {
+        'select',
+        'u',
+        'id',
+        'from',
+        'users',
+        'where',
+    }
+
+
+@pytest.mark.parametrize(
+    'sql, expected',
+    [
+        ('select * from users', True),
+        (' (SELECT id FROM users) UNION (SELECT id FROM admins)', True),
+        ('with x as (select 1) select * from x', True),
+        ('select now()', False),
+        ('select * from users where created_at < current_timestamp', False),
+        ('select * from users for update', False),
+        ('with x as (delete from users returning *) select * from x', False),
+        ('insert into users values (1)', False),
+        ('show tables', False),
+    ],
+)
+def test_is_cacheable_query(sql, expected):
+    assert is_cacheable_query(sql) == expected
+
+
+@pytest.mark.parametrize(
+    'sql, expected',
+    [
+        ('select * from users', frozenset()),
+        ('SET NAMES utf8', frozenset()),
+        ('insert into users values (1)', {'users'}),
+        ('INSERT IGNORE INTO db.`Users` (id) VALUES (1)', {'users'}),
+        ('insert or replace into users values (1)', {'users'}),
+        ('replace into users values (1)', {'users'}),
+        ('update "public"."users" set name = 1', {'users'}),
+        ('update low_priority users set name = 1', {'users'}),
+        ('delete from only users where id = 1', {'users'}),
+        ('truncate table users', {'users'}),
+        ('create table if not exists users (id int)', {'users'}),
+        ('drop temporary table users', {'users'}),
+        ('update users, admins set users.name = 1', None),
+        ('update users join admins using (id) set users.name = 1', None),
+        ('delete users from users join admins using (id)', None),
+        ('drop table users, admins', None),
+        ('with x as (delete from users returning *) select * from x', None),
+        ('call procedure()', None),
+    ],
+)
+def test_get_written_tables(sql, expected):
+    assert get_written_tables(sql) == expected
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import json
 import re
+import sqlite3
 from base64 import b64encode
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
@@ -8,22 +10,44 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 import pytest
 from sqlalchemy.dialects import mysql
 
-from local_data_api.exceptions import BadRequestException, InternalServerErrorException
-from local_data_api.models import ColumnMetadata, ExecuteStatementResponse, Field
-from local_data_api.resources import SQLite
+from local_data_api.exceptions import (
+    BadRequestException,
+    InternalServerErrorException,
+    ServiceUnavailableError,
+)
+from local_data_api.models import (
+    ColumnMetadata,
+    ExecuteStatementResponse,
+    Field,
+    RecordsFormatType,
+    UpdateResult,
+)
+from local_data_api.resources import MySQL, SQLite
+from local_data_api.resources.pool import ConnectionPool
 from local_data_api.resources.resource import (
     CONNECTION_POOL,
+    RESOURCE_CLASS,
     RESOURCE_METAS,
+    RESULT_FETCH_SIZE,
+    DumpedRecords,
     Resource,
     ResourceMeta,
     create_resource_arn,
     delete_connection,
+    dump_json,
+    dump_response,
     get_connection,
+    get_connection_pool,
+    get_executor,
     get_resource,
     get_resource_class,
+    load_response,
     register_resource,
     set_connection,
+    warm_up_resource,
 )
+from local_data_api.resources.transaction import TransactionRegistry
+from local_data_api.worker import get_worker_tag
 
 DATABASE_SETTINGS: Dict[str, Dict[str, Union[str, int]]] = {
     'SQLite': {'host': '', 'port': None, 'user_name': None, 'password': None}
@@ -116,6 +140,60 @@ def test_get_resource(secrets, mocker) -> None:
         get_resource(resource_arn, 'dummy', 'transaction', database='test')
 
 
+def test_get_resource_from_pool(clear, secrets, mocker) -> None:
+    resource_arn: str = 'dummy_resource_arn'
+    connection_maker = mocker.Mock(side_effect=lambda *_: mocker.Mock())
+    RESOURCE_METAS[resource_arn] = ResourceMeta(
+        SQLite, connection_maker, 'localhost', 3306, 'test', 'pw'
+    )
+
+    resource = get_resource(resource_arn, 'dummy', database='test')
+    connection = resource.connection
+    connection_maker.assert_called_once_with('test')
+    resource.close()
+    connection.close.assert_not_called()
+
+    assert get_resource(resource_arn, 'dummy', database='test').connection is connection
+    assert connection_maker.call_count == 1
+
+    assert get_resource(resource_arn, 'dummy').connection is not connection
+    assert connection_maker.call_count == 2
+
+
+def test_get_connection_pool(clear, mocker) -> None:
+    resource_arn: str = 'dummy_resource_arn'
+    RESOURCE_METAS[resource_arn] = ResourceMeta(
+        SQLite, mocker.Mock(), 'localhost', 3306, 'test', 'pw'
+    )
+    pool = get_connection_pool(resource_arn, 'test')
+    assert get_connection_pool(resource_arn, 'test') is pool
+    assert get_connection_pool(resource_arn) is not pool
+    assert RESOURCE_METAS[resource_arn].pools == {
+        'test': pool,
+        None: get_connection_pool(resource_arn),
+    }
+
+
+def test_get_executor(clear, mocker) -> None:
+    resource_arn: str = 'dummy_resource_arn'
+    RESOURCE_METAS[resource_arn] = ResourceMeta(
+        SQLite, mocker.Mock(), 'localhost', 3306, 'test', 'pw'
+    )
+    executor = get_executor(resource_arn)
+    assert executor is not None
+    assert get_executor(resource_arn) is executor
+    assert executor.submit(lambda: 1).result() == 1
+    assert get_executor('invalid') is None
+
+    # chunks of streams never wait behind requests waiting for a connection
+    stream_executor = get_executor(resource_arn, stream=True)
+    assert stream_executor is not None
+    assert stream_executor is not executor
+    assert get_executor(resource_arn, stream=True) is stream_executor
+    executor.shutdown()
+    stream_executor.shutdown()
+
+
 def test_get_resource_exception(clear, secrets, mocker) -> None:
     resource_arn: str = 'dummy_resource_arn'
 
@@ -160,6 +238,26 @@ def test_get_resource_exception(clear, secrets, mocker) -> None:
         get_resource(resource_arn, 'dummy')
 
 
+def test_get_resource_class_imports_engine(mocker) -> None:
+    import_module = mocker.patch(
+        'local_data_api.resources.resource.import_module',
+        side_effect=lambda _: RESOURCE_CLASS.__setitem__('MySQL', MySQL),
+    )
+    mocker.patch.dict(RESOURCE_CLASS, clear=True)
+    assert get_resource_class('MySQL') is MySQL
+    assert get_resource_class('MySQL') is MySQL
+    import_module.assert_called_once_with('local_data_api.resources.mysql')
+
+
+def test_warm_up_resource(clear, mocker) -> None:
+    register_resource('arn', 'SQLite', None, None)
+    execute_as_dict = mocker.spy(SQLite, 'execute_as_dict')
+    warm_up_resource('arn')
+    assert execute_as_dict.call_args[0][1:] == ('SELECT 1',)
+    pool = get_connection_pool('arn')
+    assert (pool.size, pool.idle) == (1, 1)
+
+
 def test_get_resource_class_exception(clear) -> None:
     with pytest.raises(Exception):
         get_resource_class('invalid_engine')
@@ -241,6 +339,20 @@ def test_create_query_none_param(clear):
     assert query == "insert into users values (1, NULL)"
 
 
+def test_create_statement(clear):
+    assert DummyResource.create_statement(
+        'insert into users values (:id, :name)', {'id': 1, 'name': 'abc'}
+    ) == ("insert into users values (1, 'abc')",)
+
+
+def test_create_statement_native_binding(clear, mocker):
+    mocker.patch.object(DummyResource, 'NATIVE_BINDING', True)
+    assert DummyResource.create_statement(
+        'insert into users values (:id, :name)', {'id': 1, 'name': 'abc'}
+    ) == ('insert into users values (:id, :name)', {'id': 1, 'name': 'abc'})
+    assert DummyResource.create_statement('select 1', {'id': 1}) == ('select 1',)
+
+
 def test_transaction_id(clear, mocker):
     connection_mock = mocker.Mock()
     dummy = DummyResource(connection_mock, transaction_id='123')
@@ -259,6 +371,7 @@ def test_create_transaction_id(clear):
         r'[abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ/=+]{184}$',
         transaction_id,
     )
+    assert transaction_id.startswith(get_worker_tag())
 
 
 def test_commit(clear, mocker):
@@ -286,7 +399,7 @@ def test_begin(clear, mocker):
     dummy.autocommit_off = mocker.Mock()
     result = dummy.begin()
     assert result == 'abc'
-    set_connection_mock.assert_called_once_with('abc', connection_mock)
+    set_connection_mock.assert_called_once_with('abc', connection_mock, None)
     dummy.autocommit_off.assert_called_once()
 
 
@@ -302,6 +415,95 @@ def test_close(clear, mocker):
     delete_connection_mock.assert_called_once_with('abc')
 
 
+def test_close_with_pool(clear, mocker):
+    connection_mock = mocker.Mock()
+    pool_mock = mocker.Mock()
+    dummy = DummyResource(connection_mock, pool=pool_mock)
+    dummy.close()
+    pool_mock.release.assert_called_once_with(connection_mock)
+    connection_mock.close.assert_not_called()
+
+
+def test_begin_with_pool(clear, mocker):
+    connect_mock = mocker.Mock(side_effect=lambda: mocker.Mock())
+    pool = ConnectionPool(
+        connect_mock,
+        DummyResource.reset_connection,
+        mocker.Mock(),
+        max_size=1,
+        timeout=0,
+    )
+    for _ in range(5):
+        dummy = DummyResource(pool.acquire(), pool=pool)
+        transaction_id = dummy.begin()
+        # the transaction keeps its connection borrowed from the pool
+        assert pool.in_use == 1
+        with pytest.raises(ServiceUnavailableError):
+            pool.acquire()
+
+        resource = DummyResource(
+            get_connection(transaction_id),
+            transaction_id,
+            CONNECTION_POOL.get_pool(transaction_id),
+        )
+        resource.commit()
+        resource.close()
+        assert transaction_id not in CONNECTION_POOL
+        assert pool.idle == 1
+    assert connect_mock.call_count == 1
+    connection = pool.acquire()
+    connection.close.assert_not_called()
+    assert connection.rollback.call_count == 5
+
+
+def test_begin_with_too_many_transactions(clear, mocker):
+    connection_mock = mocker.Mock()
+    pool_mock = mocker.Mock()
+    dummy = DummyResource(connection_mock, pool=pool_mock)
+    mocker.patch(
+        'local_data_api.resources.resource.CONNECTION_POOL',
+        TransactionRegistry(max_count=1),
+    )
+    dummy.begin()
+    other = DummyResource(connection_mock, pool=pool_mock)
+    with pytest.raises(ServiceUnavailableError):
+        other.begin()
+    assert other.transaction_id is None
+    pool_mock.release.assert_not_called()
+
+
+def test_release(clear, mocker):
+    connection_mock = mocker.Mock()
+    CONNECTION_POOL['abc'] = connection_mock
+    get_connection('abc')
+    assert CONNECTION_POOL.in_use == 1
+    DummyResource(connection_mock, 'abc').release()
+    assert CONNECTION_POOL.in_use == 0
+    connection_mock.close.assert_not_called()
+
+    pool_mock = mocker.Mock()
+    DummyResource(connection_mock, pool=pool_mock).release()
+    pool_mock.release.assert_called_once_with(connection_mock)
+
+
+def test_reset_connection(clear, mocker):
+    connection_mock = mocker.Mock()
+    DummyResource.reset_connection(connection_mock)
+    connection_mock.rollback.assert_called_once_with()
+
+
+def test_ping(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    assert DummyResource.ping(connection_mock) is True
+    cursor_mock.execute.assert_called_once_with('SELECT 1')
+    cursor_mock.close.assert_called_once_with()
+
+    connection_mock.cursor.side_effect = Exception('gone away')
+    assert DummyResource.ping(connection_mock) is False
+
+
 def test_close_with_empty_connection_pool(clear, mocker):
     connection_mock = mocker.Mock()
     dummy = DummyResource(connection_mock, 'abc')
@@ -362,12 +564,163 @@ def test_execute_insert_with_params(clear, mocker):
     cursor_mock.close.assert_called_once_with()
 
 
+def test_execute_insert_with_native_binding(clear, mocker):
+    mocker.patch.object(DummyResource, 'NATIVE_BINDING', True)
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ''
+    cursor_mock.rowcount = 1
+    cursor_mock.lastrowid = 1
+    dummy = DummyResource(connection_mock)
+    assert dummy.execute(
+        "insert into users values (:id, :name)", {'id': 1, 'name': 'abc'}
+    ) == ExecuteStatementResponse(
+        numberOfRecordsUpdated=1, generatedFields=[Field(longValue=1)]
+    )
+
+    cursor_mock.execute.assert_called_once_with(
+        "insert into users values (:id, :name)", {'id': 1, 'name': 'abc'}
+    )
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_sql(clear):
+    resource = SQLite(sqlite3.connect(':memory:'))
+    assert resource.execute_sql(
+        "create table users (id integer, name text);"
+        "insert into users values (1, 'a;b'), (2, null);"
+        "-- all users\nselect * from users order by id;"
+    ) == [
+        {'numberOfRecordsUpdated': 0},
+        {'numberOfRecordsUpdated': 2},
+        {
+            'numberOfRecordsUpdated': 0,
+            'resultFrame': {
+                'records': [
+                    {'values': [{'bigIntValue': 1}, {'stringValue': 'a;b'}]},
+                    {'values': [{'bigIntValue': 2}, {'isNull': True}]},
+                ],
+                'resultSetMetadata': {
+                    'columnCount': 2,
+                    'columnMetadata': [
+                        {'label': 'id', 'name': 'id'},
+                        {'label': 'name', 'name': 'name'},
+                    ],
+                },
+            },
+        },
+    ]
+
+
+def test_execute_sql_exception(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.execute.side_effect = [None, Exception('error')]
+    cursor_mock.description = None
+    cursor_mock.rowcount = 1
+    with pytest.raises(BadRequestException) as e:
+        DummyResource(connection_mock).execute_sql('delete from a; delete from b')
+    assert e.value.message == 'error'
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_batch_execute(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ''
+    cursor_mock.rowcount = 1
+    lastrowids = iter([0, 1])
+
+    def execute(*_):
+        cursor_mock.lastrowid = next(lastrowids)
+
+    cursor_mock.execute.side_effect = execute
+    dummy = DummyResource(connection_mock)
+    assert dummy.batch_execute(
+        "insert into users (name) values (:name)", [{'name': 'abc'}, {'name': 'def'}]
+    ) == [UpdateResult(generatedFields=[Field(longValue=1)])]
+    # every set runs on a single cursor
+    cursor_mock.execute.assert_has_calls(
+        [
+            mocker.call("insert into users (name) values ('abc')"),
+            mocker.call("insert into users (name) values ('def')"),
+        ]
+    )
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_batch_execute_exception(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = connection_mock.cursor.return_value
+    cursor_mock.execute.side_effect = Exception('error_message')
+    dummy = DummyResource(connection_mock)
+    with pytest.raises(BadRequestException) as e:
+        dummy.batch_execute("delete from users where id = :id", [{'id': 1}])
+    assert e.value.message == 'error_message'
+    with pytest.raises(BadRequestException) as e:
+        dummy.batch_execute("delete from users where id = :id", [{'name': 'abc'}])
+    assert e.value.message == 'Cannot find parameter: id'
+
+
+def test_batch_execute_executemany(clear, mocker):
+    mocker.patch.object(DummyResource, 'NATIVE_BINDING', True)
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    dummy = DummyResource(connection_mock)
+    assert (
+        dummy.batch_execute(
+            "update users set name = :name where id = :id",
+            [{'id': 1, 'name': 'abc'}, {'id': 2, 'name': 'def'}],
+        )
+        == []
+    )
+    cursor_mock.executemany.assert_called_once_with(
+        "update users set name = :name where id = :id",
+        [{'id': 1, 'name': 'abc'}, {'id': 2, 'name': 'def'}],
+    )
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_batch_execute_executemany_exception(clear, mocker):
+    mocker.patch.object(DummyResource, 'NATIVE_BINDING', True)
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.executemany.side_effect = Exception('error_message')
+    dummy = DummyResource(connection_mock)
+    with pytest.raises(BadRequestException) as e:
+        dummy.batch_execute("delete from users where id = :id", [{'id': 1}])
+    assert e.value.message == 'error_message'
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_batch_execute_native_binding_insert(clear, mocker):
+    mocker.patch.object(DummyResource, 'NATIVE_BINDING', True)
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ''
+    cursor_mock.rowcount = 1
+    cursor_mock.lastrowid = 3
+    dummy = DummyResource(connection_mock)
+    assert dummy.batch_execute(
+        "insert into users (name) values (:name)", [{'name': 'abc'}]
+    ) == [UpdateResult(generatedFields=[Field(longValue=3)])]
+    cursor_mock.executemany.assert_not_called()
+    cursor_mock.execute.assert_called_once_with(
+        "insert into users (name) values (:name)", {'name': 'abc'}
+    )
+
+
 def test_execute_select(clear, mocker):
     connection_mock = mocker.Mock()
     cursor_mock = mocker.Mock()
     connection_mock.cursor.side_effect = [cursor_mock]
     cursor_mock.description = 1, 1, 1, 1, 1, 1, 1
-    cursor_mock.fetchall.side_effect = [((1, 'abc'),)]
+    cursor_mock.fetchmany.side_effect = [((1, 'abc'),), ()]
     dummy = DummyResource(connection_mock, transaction_id='123')
     assert dummy.execute("select * from users",) == ExecuteStatementResponse(
         numberOfRecordsUpdated=0,
@@ -377,6 +730,190 @@ def test_execute_select(clear, mocker):
     cursor_mock.close.assert_called_once_with()
 
 
+def test_execute_stream(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = 1, 1, 1, 1, 1, 1, 1
+    cursor_mock.fetchmany.side_effect = [((1, 'abc'), (2, None)), ((3, b'a'),), ()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    chunks = dummy.execute_stream("select * from users", fetch_size=2)
+    cursor_mock.close.assert_not_called()
+    assert json.loads(''.join(chunks)) == {
+        'numberOfRecordsUpdated': 0,
+        'records': [
+            [{'longValue': 1}, {'stringValue': 'abc'}],
+            [{'longValue': 2}, {'isNull': True}],
+            [{'longValue': 3}, {'blobValue': 'YQ=='}],
+        ],
+    }
+    cursor_mock.fetchmany.assert_called_with(2)
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_as_dict_formatted(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ('id',), ('name',)
+    cursor_mock.fetchmany.side_effect = [((1, 'abc'), (2, None)), ()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    dummy.create_column_metadata_set = mocker.Mock(
+        return_value=[ColumnMetadata(name='id'), ColumnMetadata(name='name')]
+    )
+    assert dummy.execute_as_dict(
+        "select * from users",
+        include_result_metadata=True,
+        format_records_as=RecordsFormatType.JSON,
+    ) == {
+        'numberOfRecordsUpdated': 0,
+        'formattedRecords': '[{"id":1,"name":"abc"},{"id":2,"name":null}]',
+        'columnMetadata': [{'name': 'id'}, {'name': 'name'}],
+    }
+    cursor_mock.close.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    'format_records_as', [RecordsFormatType.NONE, RecordsFormatType.JSON]
+)
+def test_execute_as_dict_result_size_limit(clear, mocker, format_records_as):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = (('name',),)
+    cursor_mock.fetchmany.side_effect = [(('a' * 60,),), (('b' * 60,),), ()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    with pytest.raises(BadRequestException) as e:
+        dummy.execute_as_dict(
+            "select * from users",
+            format_records_as=format_records_as,
+            max_result_size=100,
+        )
+    assert e.value.message == (
+        'Database returned more than the allowed response size limit'
+    )
+    # the rest of the result is not fetched
+    assert cursor_mock.fetchmany.call_count == 2
+    cursor_mock.fetchmany.assert_called_with(RESULT_FETCH_SIZE)
+    cursor_mock.close.assert_called_once_with()
+
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.fetchall.side_effect = [(('a' * 60,), ('b' * 60,))]
+    assert 'numberOfRecordsUpdated' in dummy.execute_as_dict(
+        "select * from users", format_records_as=format_records_as, max_result_size=0
+    )
+
+
+def test_execute_as_dict_dumped_records(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = (('name',),)
+    cursor_mock.fetchmany.side_effect = [(('a',), ('b',)), (('c',),), ()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    response = dummy.execute_as_dict("select * from users")
+    records = [[{'stringValue': value}] for value in 'abc']
+    # the JSON measured for the size limit is reused by the response, and the
+    # records are only kept as JSON
+    assert isinstance(response['records'], DumpedRecords)
+    assert not hasattr(response['records'], '__len__')
+    assert dump_response(response) == dump_json(
+        {'numberOfRecordsUpdated': 0, 'records': records}
+    )
+    assert load_response(response) == {'numberOfRecordsUpdated': 0, 'records': records}
+
+
+def test_dump_response():
+    response = {
+        'numberOfRecordsUpdated': 0,
+        'records': DumpedRecords('"dumped"'),
+        'columnMetadata': [{'name': 'é'}],
+    }
+    assert dump_response(response) == (
+        '{"numberOfRecordsUpdated":0,"records":"dumped","columnMetadata":[{"name":"é"}]}'
+    )
+    assert dump_response({'records': []}) == dump_json({'records': []})
+
+
+def test_execute_stream_formatted(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ('id',), ('name',)
+    cursor_mock.fetchmany.side_effect = [((1, 'a"b'), (2, None)), ((3, b'a'),), ()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    chunks = dummy.execute_stream(
+        "select * from users", fetch_size=2, format_records_as=RecordsFormatType.JSON
+    )
+    response = json.loads(''.join(chunks))
+    assert list(response) == ['numberOfRecordsUpdated', 'formattedRecords']
+    assert json.loads(response['formattedRecords']) == [
+        {'id': 1, 'name': 'a"b'},
+        {'id': 2, 'name': None},
+        {'id': 3, 'name': 'YQ=='},
+    ]
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_stream_close(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = 1, 1, 1, 1, 1, 1, 1
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    chunks = dummy.execute_stream("select * from users", fetch_size=2)
+    assert next(chunks) == '{"numberOfRecordsUpdated":0,"records":['
+    chunks.close()
+    cursor_mock.fetchmany.assert_not_called()
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_stream_with_include_metadata(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = 1, 1, 1, 1, 1, 1, 1
+    cursor_mock.fetchmany.side_effect = [()]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    dummy.create_column_metadata_set = mocker.Mock(
+        return_value=[ColumnMetadata(name='id', schema='test')]
+    )
+    chunks = dummy.execute_stream(
+        "select * from users", include_result_metadata=True, fetch_size=2
+    )
+    assert ''.join(chunks) == (
+        '{"numberOfRecordsUpdated":0,"records":[],'
+        '"columnMetadata":[{"name":"id","schema":"test"}]}'
+    )
+
+
+def test_execute_stream_update(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    connection_mock.cursor.side_effect = [cursor_mock]
+    cursor_mock.description = ''
+    cursor_mock.rowcount = 1
+    cursor_mock.lastrowid = 0
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    assert dummy.execute_stream("update users set name = 'abc'", fetch_size=2) == {
+        'numberOfRecordsUpdated': 1,
+        'generatedFields': [],
+    }
+    cursor_mock.close.assert_called_once_with()
+
+
+def test_execute_stream_exception(clear, mocker):
+    connection_mock = mocker.Mock()
+    cursor_mock = mocker.Mock()
+    cursor_mock.execute.side_effect = Exception('error')
+    connection_mock.cursor.side_effect = [cursor_mock]
+    dummy = DummyResource(connection_mock, transaction_id='123')
+    with pytest.raises(BadRequestException) as e:
+        dummy.execute_stream("select * from users", fetch_size=2)
+    assert e.value.message == 'error'
+    cursor_mock.close.assert_called_once_with()
+
+
 def test_execute_exception_1(clear, mocker):
     connection_mock = mocker.Mock()
     cursor_mock = mocker.Mock()
@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+
+from local_data_api.models import Field, UpdateResult
+from local_data_api.resources.sqlite import SQLite, create_pragma_statements
+
+
+def test_create_pragma_statements():
+    assert create_pragma_statements({}) == [
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',
+    ]
+    assert create_pragma_statements(
+        {'database': 'a.db', 'synchronous': 'OFF', 'cache_size': -2000}
+    ) == [
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = OFF',
+        'PRAGMA cache_size = -2000',
+    ]
+    with pytest.raises(Exception):
+        create_pragma_statements({'journal_mode': 'WAL; DROP TABLE users'})
+
+
+def test_create_connection_maker_file(tmp_path):
+    connect = SQLite.create_connection_maker(
+        engine_kwargs={'database': str(tmp_path / 'local.db'), 'mmap_size': 1048576}
+    )
+    connection = connect()
+    connection.execute('create table users (id integer)')
+    connection.execute('insert into users values (1)')
+    connection.commit()
+
+    other = connect()
+    assert other.execute('select id from users').fetchall() == [(1,)]
+    assert other.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    assert other.execute('PRAGMA synchronous').fetchone() == (1,)
+    assert other.execute('PRAGMA mmap_size').fetchone() == (1048576,)
+    connection.close()
+    other.close()
+
+
+def test_create_connection_maker_temporary_file():
+    connect = SQLite.create_connection_maker()
+    connection = connect()
+    connection.execute('create table users (id integer)')
+    connection.execute('insert into users values (1)')
+    connection.commit()
+    connection.close()
+
+    other = connect()
+    assert other.execute('select id from users').fetchall() == [(1,)]
+    assert other.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    other.close()
+    # each resource has its own database
+    with pytest.raises(sqlite3.OperationalError):
+        SQLite.create_connection_maker()().execute('select id from users')
+
+
+def test_create_connection_maker_concurrent_transaction():
+    connect = SQLite.create_connection_maker()
+    connection = connect()
+    connection.execute('create table users (id integer)')
+    connection.execute('insert into users values (1)')
+    connection.commit()
+
+    connection.execute('insert into users values (2)')
+    assert connection.in_transaction
+    # a read is not blocked by the writing transaction of another connection
+    other = connect()
+    assert other.execute('select id from users').fetchall() == [(1,)]
+    connection.commit()
+    assert other.execute('select id from users').fetchall() == [(1,), (2,)]
+    connection.close()
+    other.close()
+
+
+def test_create_connection_maker_shared_memory():
+    database = 'file:local-data-api-test?mode=memory&cache=shared'
+    connect = SQLite.create_connection_maker(engine_kwargs={'database': database})
+    connection = connect()
+    connection.execute('create table users (id integer)')
+    connection.execute('insert into users values (1)')
+    connection.commit()
+    connection.close()
+
+    # kept by the connection maker after the last pooled connection is closed
+    assert connect().execute('select id from users').fetchall() == [(1,)]
+
+
+def test_create_connection_maker_private_memory():
+    connect = SQLite.create_connection_maker(engine_kwargs={'database': ':memory:'})
+    connect().execute('create table users (id integer)')
+    with pytest.raises(sqlite3.OperationalError):
+        connect().execute('select id from users')
+
+
+def test_batch_execute():
+    resource = SQLite(
+        SQLite.create_connection_maker(engine_kwargs={'database': ':memory:'})()
+    )
+    resource.connection.execute('create table users (id integer primary key, name)')
+    assert resource.batch_execute(
+        'insert into users (name) values (:name)',
+        [{'name': 'abc'}, {'name': 'def'}],
+    ) == [
+        UpdateResult(generatedFields=[Field(longValue=1)]),
+        UpdateResult(generatedFields=[Field(longValue=2)]),
+    ]
+    assert (
+        resource.batch_execute(
+            'update users set name = :name where id = :id',
+            [{'id': 1, 'name': 'ghi'}, {'id': 2, 'name': 'jkl'}],
+        )
+        == []
+    )
+    assert resource.connection.execute('select name from users').fetchall() == [
+        ('ghi',),
+        ('jkl',),
+    ]
+
+
+def test_create_statement_native_binding(mocker):
+    mocker.patch.object(SQLite, 'NATIVE_BINDING', True)
+    assert SQLite.create_statement('select :id', {'id': 1}) == (
+        'select :id',
+        {'id': 1},
+    )
+    # an escaped colon would be sent as a bind parameter
+    assert SQLite.create_statement(r"select :id, '\:name'", {'id': 1}) == (
+        "select 1, ':name'",
+    )
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from local_data_api.exceptions import ServiceUnavailableError
+from local_data_api.resources.transaction import TransactionRegistry
+
+
+def test_add(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    connection = mocker.Mock()
+    registry['abc'] = connection
+    assert 'abc' in registry
+    assert registry['abc'] is connection
+    assert registry.size == 1
+
+    del registry['abc']
+    assert 'abc' not in registry
+    assert len(registry) == 0
+
+
+def test_written_tables(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    assert registry.get_written_tables('abc') == frozenset()
+
+    registry.add_written_tables('abc', frozenset(['users']))
+    registry.add_written_tables('abc', frozenset(['admins']))
+    assert registry.get_written_tables('abc') == {'users', 'admins'}
+
+    registry.add_written_tables('abc', None)
+    registry.add_written_tables('abc', frozenset(['users']))
+    assert registry.get_written_tables('abc') is None
+
+    registry.add_written_tables('def', None)
+    assert registry.get_written_tables('def') == frozenset()
+
+
+def test_add_too_many_transactions(mocker):
+    registry = TransactionRegistry(max_count=1, reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    with pytest.raises(ServiceUnavailableError):
+        registry.add('def', mocker.Mock())
+    assert 'def' not in registry
+
+    del registry['abc']
+    registry.add('def', mocker.Mock())
+    assert 'def' in registry
+
+
+def test_acquire_and_release(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    connection = mocker.Mock()
+    registry.add('abc', connection)
+    assert registry.acquire('abc') is connection
+    assert registry.in_use == 1
+    registry.release('abc')
+    assert registry.in_use == 0
+    registry.release('unknown')
+
+    with pytest.raises(KeyError):
+        registry.acquire('unknown')
+
+
+def test_acquire_waits_for_other_request(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    registry.acquire('abc')
+    acquired = threading.Event()
+
+    def acquire():
+        registry.acquire('abc')
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.05)
+    registry.release('abc')
+    assert acquired.wait(5)
+    thread.join()
+    assert registry.in_use == 1
+
+
+def test_acquire_deleted_while_waiting(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    registry.acquire('abc')
+    timer = threading.Timer(0.05, registry.__delitem__, ['abc'])
+    timer.start()
+    with pytest.raises(KeyError):
+        registry.acquire('abc')
+    timer.join()
+    assert len(registry) == 0
+
+
+def test_acquire_timeout(mocker):
+    registry = TransactionRegistry(reap_interval=0, lock_timeout=0.01)
+    registry.add('abc', mocker.Mock())
+    registry.acquire('abc')
+    with pytest.raises(ServiceUnavailableError):
+        registry.acquire('abc')
+
+
+def test_stripes(mocker):
+    registry = TransactionRegistry(reap_interval=0, stripes=4)
+    for index in range(100):
+        registry.add(str(index), mocker.Mock())
+    assert len(registry) == 100
+    assert all(transactions for _, transactions in registry._stripes)
+    assert all(str(index) in registry for index in range(100))
+
+
+def test_reap(mocker):
+    registry = TransactionRegistry(timeout=0.01, reap_interval=0)
+    idle = mocker.Mock()
+    busy = mocker.Mock()
+    registry.add('idle', idle)
+    registry.add('busy', busy)
+    registry.acquire('busy')
+    mocker.patch(
+        'local_data_api.resources.transaction.time.monotonic',
+        return_value=time.monotonic() + 1,
+    )
+
+    assert registry.reap() == 1
+    idle.rollback.assert_called_once_with()
+    idle.close.assert_called_once_with()
+    busy.close.assert_not_called()
+    assert 'idle' not in registry
+    assert 'busy' in registry
+    assert registry.expired == 1
+
+
+def test_reap_with_pool(mocker):
+    registry = TransactionRegistry(timeout=0.01, reap_interval=0)
+    connection = mocker.Mock()
+    pool = mocker.Mock()
+    registry.add('abc', connection, pool)
+    assert registry.get_pool('abc') is pool
+    mocker.patch(
+        'local_data_api.resources.transaction.time.monotonic',
+        return_value=time.monotonic() + 1,
+    )
+
+    assert registry.reap() == 1
+    pool.release.assert_called_once_with(connection)
+    connection.close.assert_not_called()
+    assert registry.get_pool('abc') is None
+
+
+def test_reap_disabled(mocker):
+    registry = TransactionRegistry(timeout=0, reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    assert registry.reap() == 0
+    assert 'abc' in registry
+
+
+def test_reaper(mocker):
+    registry = TransactionRegistry(timeout=0.01, reap_interval=0.01)
+    reaped = threading.Event()
+    connection = mocker.Mock()
+    connection.close.side_effect = lambda: reaped.set()
+    registry.add('abc', connection)
+    try:
+        assert reaped.wait(5)
+    finally:
+        registry.stop()
+    assert 'abc' not in registry
+    connection.rollback.assert_called_once_with()
+
+
+def test_clear(mocker):
+    registry = TransactionRegistry(reap_interval=0)
+    registry.add('abc', mocker.Mock())
+    registry.expired = 1
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.expired == 0
@@ -66,3 +66,41 @@ def test_setup_postgres_no_jdbc(mocker) -> None:
         'example',
         {},
     )
+
+
+def test_setup_sqlite(mocker) -> None:
+    mock_register_secret = mocker.patch('local_data_api.settings.register_secret')
+    mock_register_resource = mocker.patch('local_data_api.settings.register_resource')
+    mocker.patch.dict(
+        'os.environ',
+        {
+            'ENGINE': 'SQLite',
+            'SQLITE_DATABASE': '/tmp/local.db',
+            'SQLITE_MMAP_SIZE': '268435456',
+        },
+    )
+    setup()
+    mock_register_secret.assert_called_with(
+        'root', 'example', 'arn:aws:secretsmanager:us-east-1:123456789012:secret:dummy'
+    )
+    mock_register_resource.assert_called_with(
+        'arn:aws:rds:us-east-1:123456789012:cluster:dummy',
+        'SQLite',
+        None,
+        None,
+        'root',
+        'example',
+        {'database': '/tmp/local.db', 'mmap_size': '268435456'},
+    )
+
+
+def test_setup_warm_up(mocker) -> None:
+    mocker.patch('local_data_api.settings.register_secret')
+    mocker.patch('local_data_api.settings.register_resource')
+    mocker.patch('local_data_api.settings.WARM_UP', True)
+    mock_warm_up_resource = mocker.patch('local_data_api.settings.warm_up_resource')
+    mocker.patch.dict('os.environ', {'ENGINE': 'SQLite'})
+    setup()
+    mock_warm_up_resource.assert_called_once_with(
+        'arn:aws:rds:us-east-1:123456789012:cluster:dummy'
+    )
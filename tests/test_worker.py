@@ -0,0 +1,156 @@
+import asyncio
+import threading
+
+import pytest
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.testclient import TestClient
+
+from local_data_api.worker import (
+    WorkerRouter,
+    create_worker_tag,
+    find_worker_tag,
+    get_socket_path,
+    get_worker_tag,
+    list_worker_tags,
+    request_worker,
+    serve_forwarded_request,
+    start_worker_server,
+    stop_worker_server,
+)
+
+
+async def echo(scope, receive, send):
+    message = await receive()
+    response = JSONResponse(
+        {'path': scope['path'], 'body': message['body'].decode(), 'worker': 'local'}
+    )
+    await response(scope, receive, send)
+
+
+async def owner(scope, receive, send):
+    message = await receive()
+
+    async def chunks():
+        yield '{"worker":"owner",'
+        yield f'"body":{message["body"].decode()}}}'
+
+    response = StreamingResponse(chunks(), media_type='application/json')
+    await response(scope, receive, send)
+
+
+@pytest.fixture
+def owner_worker(tmp_path):
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    server = None
+
+    async def start():
+        nonlocal server
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: serve_forwarded_request(owner, reader, writer),
+            get_socket_path('Abcd', str(tmp_path)),
+        )
+        started.set()
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop)
+    assert started.wait(5)
+    yield str(tmp_path)
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_create_worker_tag():
+    assert create_worker_tag(0) == 'aaaa'
+    assert create_worker_tag(1) == 'aaab'
+    assert create_worker_tag(52) == 'aaba'
+    assert len({create_worker_tag(pid) for pid in range(1000)}) == 1000
+
+
+def test_get_worker_tag(mocker):
+    mocker.patch('local_data_api.worker.os.getpid', return_value=1)
+    assert get_worker_tag() == 'aaab'
+    mocker.patch('local_data_api.worker.os.getpid', return_value=2)
+    assert get_worker_tag() == 'aaac'
+
+
+def test_find_worker_tag():
+    assert find_worker_tag(b'{"sql": "select 1", "transactionId": "Abcdefg"}') == (
+        'Abcd'
+    )
+    assert find_worker_tag(b'{"transactionId":"Abcdefg"}') == 'Abcd'
+    assert find_worker_tag(b'{"transactionId": ""}') is None
+    assert find_worker_tag(b'{"sql": "select 1"}') is None
+
+
+def test_router_serves_locally(tmp_path):
+    client = TestClient(WorkerRouter(echo, str(tmp_path)))
+    response = client.post('/Execute', json={'sql': 'select 1'})
+    assert response.json() == {
+        'path': '/Execute',
+        'body': '{"sql": "select 1"}',
+        'worker': 'local',
+    }
+
+    body = f'{{"transactionId": "{get_worker_tag()}abc"}}'
+    response = client.post('/Execute', data=body)
+    assert response.json()['worker'] == 'local'
+    assert response.json()['body'] == body
+
+
+def test_router_forwards_to_owner(owner_worker):
+    client = TestClient(WorkerRouter(echo, owner_worker))
+    response = client.post('/Execute', json={'transactionId': 'Abcdefg'})
+    assert response.status_code == 200
+    assert response.json() == {
+        'worker': 'owner',
+        'body': {'transactionId': 'Abcdefg'},
+    }
+
+
+def test_router_unknown_worker(tmp_path):
+    client = TestClient(WorkerRouter(echo, str(tmp_path)))
+    response = client.post('/Execute', json={'transactionId': 'Zzzzefg'})
+    assert response.status_code == 400
+    assert response.json() == {
+        'message': 'Invalid transaction ID',
+        'code': 'BadRequestException',
+    }
+
+
+def test_list_worker_tags(tmp_path):
+    assert list_worker_tags(str(tmp_path / 'none')) == []
+    for worker_tag in ['Bcde', 'Abcd', get_worker_tag()]:
+        open(get_socket_path(worker_tag, str(tmp_path)), 'w').close()
+    (tmp_path / 'other').touch()
+    assert list_worker_tags(str(tmp_path)) == ['Abcd', 'Bcde']
+
+
+def test_request_worker(owner_worker):
+    status, body = asyncio.new_event_loop().run_until_complete(
+        request_worker('Abcd', 'GET', '/metrics', 'scope=worker', owner_worker)
+    )
+    assert status == 200
+    # the owner echoes the empty body of the request
+    assert body == b'{"worker":"owner","body":}'
+
+    with pytest.raises(OSError):
+        asyncio.new_event_loop().run_until_complete(
+            request_worker('Zzzz', 'GET', '/metrics', socket_dir=owner_worker)
+        )
+
+
+def test_start_worker_server(tmp_path):
+    async def run():
+        path = get_socket_path(get_worker_tag(), str(tmp_path))
+        open(path, 'w').close()
+        server = await start_worker_server(owner, str(tmp_path))
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.close()
+        await stop_worker_server(server, str(tmp_path))
+        return path
+
+    path = asyncio.new_event_loop().run_until_complete(run())
+    assert not (tmp_path / path).exists()